@@ -0,0 +1,28 @@
+"""add task keyset indexes
+
+Revision ID: 3f6a2d8e5b14
+Revises: 9c1e4b7d2a31
+Create Date: 2026-10-19 10:41:07.902115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a2d8e5b14'
+down_revision: Union[str, None] = '9c1e4b7d2a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_created_at_id', 'tasks', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tasks_completed_created_at_id', 'tasks', ['completed', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_completed_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_created_at_id', table_name='tasks')
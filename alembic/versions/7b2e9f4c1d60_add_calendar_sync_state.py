@@ -0,0 +1,42 @@
+"""add calendar sync state
+
+Revision ID: 7b2e9f4c1d60
+Revises: 3f6a2d8e5b14
+Create Date: 2026-10-19 14:05:31.552870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e9f4c1d60'
+down_revision: Union[str, None] = '3f6a2d8e5b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('calendar_sync_states',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('calendar_url', sa.String(), nullable=False),
+    sa.Column('sync_token', sa.String(), nullable=True),
+    sa.Column('ctag', sa.String(), nullable=True),
+    sa.Column('etags', sa.JSON(), nullable=True),
+    sa.Column('synced_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_calendar_sync_states_calendar_url'), 'calendar_sync_states', ['calendar_url'], unique=True)
+    op.create_index(op.f('ix_calendar_sync_states_id'), 'calendar_sync_states', ['id'], unique=False)
+    op.add_column('calendar_events', sa.Column('href', sa.String(), nullable=True))
+    op.create_index(op.f('ix_calendar_events_href'), 'calendar_events', ['href'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_calendar_events_href'), table_name='calendar_events')
+    op.drop_column('calendar_events', 'href')
+    op.drop_index(op.f('ix_calendar_sync_states_id'), table_name='calendar_sync_states')
+    op.drop_index(op.f('ix_calendar_sync_states_calendar_url'), table_name='calendar_sync_states')
+    op.drop_table('calendar_sync_states')
@@ -0,0 +1,28 @@
+"""add email uid
+
+Revision ID: 9c1e4b7d2a31
+Revises: 5a8d359076c3
+Create Date: 2026-10-19 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e4b7d2a31'
+down_revision: Union[str, None] = '5a8d359076c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('emails', sa.Column('uid', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_emails_uid'), 'emails', ['uid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_emails_uid'), table_name='emails')
+    op.drop_column('emails', 'uid')
@@ -0,0 +1,30 @@
+"""add calendar event recurrence
+
+Revision ID: a93f0c2b7d18
+Revises: d41c8a7e3f95
+Create Date: 2026-10-19 16:48:12.730519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93f0c2b7d18'
+down_revision: Union[str, None] = 'd41c8a7e3f95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('calendar_events', sa.Column('rrule', sa.String(), nullable=True))
+    op.add_column('calendar_events', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_calendar_events_user_id_updated_at', 'calendar_events', ['user_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_calendar_events_user_id_updated_at', table_name='calendar_events')
+    op.drop_column('calendar_events', 'updated_at')
+    op.drop_column('calendar_events', 'rrule')
@@ -0,0 +1,35 @@
+"""scope email uid per mailbox and uidvalidity
+
+Revision ID: b5d2e8f1c607
+Revises: f2c7a4e8b391
+Create Date: 2026-10-20 11:02:37.514290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e8f1c607'
+down_revision: Union[str, None] = 'f2c7a4e8b391'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('emails', sa.Column('mailbox', sa.String(), nullable=True))
+    op.add_column('emails', sa.Column('uidvalidity', sa.BigInteger(), nullable=True))
+    # Rows stored before this revision keep a NULL mailbox; they no longer conflict with new mail
+    op.drop_index(op.f('ix_emails_uid'), table_name='emails')
+    op.create_index(op.f('ix_emails_uid'), 'emails', ['uid'], unique=False)
+    op.create_index('ix_emails_mailbox_uidvalidity_uid', 'emails', ['mailbox', 'uidvalidity', 'uid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_emails_mailbox_uidvalidity_uid', table_name='emails')
+    op.drop_index(op.f('ix_emails_uid'), table_name='emails')
+    op.create_index(op.f('ix_emails_uid'), 'emails', ['uid'], unique=True)
+    op.drop_column('emails', 'uidvalidity')
+    op.drop_column('emails', 'mailbox')
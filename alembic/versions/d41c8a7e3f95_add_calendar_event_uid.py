@@ -0,0 +1,30 @@
+"""add calendar event uid
+
+Revision ID: d41c8a7e3f95
+Revises: 7b2e9f4c1d60
+Create Date: 2026-10-19 15:22:48.107344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c8a7e3f95'
+down_revision: Union[str, None] = '7b2e9f4c1d60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('calendar_events', sa.Column('uid', sa.String(), nullable=True))
+    op.create_index(op.f('ix_calendar_events_uid'), 'calendar_events', ['uid'], unique=True)
+    op.create_index('ix_calendar_events_user_id_start_time', 'calendar_events', ['user_id', 'start_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_calendar_events_user_id_start_time', table_name='calendar_events')
+    op.drop_index(op.f('ix_calendar_events_uid'), table_name='calendar_events')
+    op.drop_column('calendar_events', 'uid')
@@ -0,0 +1,48 @@
+"""add github activities
+
+Revision ID: e6b3d9a15c42
+Revises: a93f0c2b7d18
+Create Date: 2026-10-19 19:22:47.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b3d9a15c42'
+down_revision: Union[str, None] = 'a93f0c2b7d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('github_activities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=True),
+    sa.Column('repo', sa.String(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('indexed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_github_activities_event_type'), 'github_activities', ['event_type'], unique=False)
+    op.create_index(op.f('ix_github_activities_id'), 'github_activities', ['id'], unique=False)
+    op.create_index(op.f('ix_github_activities_indexed_at'), 'github_activities', ['indexed_at'], unique=False)
+    op.create_index(op.f('ix_github_activities_key'), 'github_activities', ['key'], unique=True)
+    op.create_index(op.f('ix_github_activities_repo'), 'github_activities', ['repo'], unique=False)
+    op.create_index('ix_github_activities_source_received_at', 'github_activities', ['source', 'received_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_github_activities_source_received_at', table_name='github_activities')
+    op.drop_index(op.f('ix_github_activities_repo'), table_name='github_activities')
+    op.drop_index(op.f('ix_github_activities_key'), table_name='github_activities')
+    op.drop_index(op.f('ix_github_activities_indexed_at'), table_name='github_activities')
+    op.drop_index(op.f('ix_github_activities_id'), table_name='github_activities')
+    op.drop_table('github_activities')
@@ -0,0 +1,41 @@
+"""scope calendar event uid per calendar
+
+Revision ID: f2c7a4e8b391
+Revises: e6b3d9a15c42
+Create Date: 2026-10-20 09:14:03.208175
+
+"""
+from typing import Sequence, Union
+from urllib.parse import urlsplit
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c7a4e8b391'
+down_revision: Union[str, None] = 'e6b3d9a15c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('calendar_events', sa.Column('calendar_url', sa.String(), nullable=True))
+    # Synced events live under their calendar's collection path
+    bind = op.get_bind()
+    for (calendar_url,) in bind.execute(sa.text('SELECT calendar_url FROM calendar_sync_states')).fetchall():
+        path = urlsplit(calendar_url).path.rstrip('/') + '/'
+        bind.execute(
+            sa.text('UPDATE calendar_events SET calendar_url = :url WHERE href LIKE :prefix'),
+            {'url': calendar_url, 'prefix': path + '%'}
+        )
+    op.drop_index(op.f('ix_calendar_events_uid'), table_name='calendar_events')
+    op.create_index(op.f('ix_calendar_events_uid'), 'calendar_events', ['uid'], unique=False)
+    op.create_index('ix_calendar_events_calendar_url_uid', 'calendar_events', ['calendar_url', 'uid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_calendar_events_calendar_url_uid', table_name='calendar_events')
+    op.drop_index(op.f('ix_calendar_events_uid'), table_name='calendar_events')
+    op.create_index(op.f('ix_calendar_events_uid'), 'calendar_events', ['uid'], unique=True)
+    op.drop_column('calendar_events', 'calendar_url')
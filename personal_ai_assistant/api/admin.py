@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+import logging
+import os
+
+from personal_ai_assistant.api.dependencies import get_current_user
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils import memory
+from personal_ai_assistant.utils.profiling import MIN_PROFILE_INTERVAL, profiling_status, start_profiling, stop_profiling
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class ProfileRequest(BaseModel):
+    duration: float = Field(30.0, gt=0)
+    format: str = "collapsed"
+    interval: float = Field(0.01, ge=MIN_PROFILE_INTERVAL)
+
+
+class SnapshotRequest(BaseModel):
+    label: str = ""
+    top: int = 20
+
+
+async def require_admin(user=Depends(get_current_user)):
+    # Anyone can register, so being logged in is not enough to profile the process or read its heap
+    if user.username not in settings.admin_usernames:
+        logger.warning(f"{user.username} was refused access to the admin API")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Administrator access required")
+    return user
+
+
+@router.post("/profile/start")
+async def start_profile(request: ProfileRequest, user=Depends(require_admin)):
+    try:
+        session = start_profiling(request.duration, request.format, request.interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(f"{user.username} started a {session['duration']}s profile of pid {session['pid']}")
+    return session
+
+
+@router.post("/profile/stop")
+async def stop_profile(user=Depends(require_admin)):
+    session = stop_profiling()
+    if session is None:
+        raise HTTPException(status_code=404, detail="No profiling session is running")
+    return session
+
+
+@router.get("/profile/status")
+async def profile_status(user=Depends(require_admin)):
+    return profiling_status()
+
+
+@router.get("/profile/files/{name}")
+async def download_profile(name: str, user=Depends(require_admin)):
+    path = os.path.join(settings.profile_dir, name)
+    if os.path.basename(name) != name or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=name)
+
+
+@router.post("/profile/workers/start")
+async def start_worker_profile(request: ProfileRequest, user=Depends(require_admin)):
+    """Ask every Celery worker to profile itself; see celery_app.start_profiler."""
+    from personal_ai_assistant.celery_app import app as celery_app
+    try:
+        replies = celery_app.control.broadcast(
+            "start_profiler",
+            arguments={"duration": request.duration, "fmt": request.format, "interval": request.interval},
+            reply=True,
+            timeout=2.0,
+        )
+    except Exception as e:
+        logger.error(f"Error broadcasting profiler start: {str(e)}")
+        raise HTTPException(status_code=502, detail="Could not reach Celery workers")
+    return {"workers": replies}
+
+
+@router.get("/memory")
+async def memory_report(user=Depends(require_admin)):
+    return memory.memory_report()
+
+
+@router.post("/memory/tracing/start")
+async def start_memory_tracing(frames: int = None, user=Depends(require_admin)):
+    return {"started": memory.start_tracing(frames)}
+
+
+@router.post("/memory/tracing/stop")
+async def stop_memory_tracing(user=Depends(require_admin)):
+    memory.stop_tracing()
+    return {"stopped": True}
+
+
+# Snapshotting and diffing walk every traced block, so they run in the threadpool
+@router.post("/memory/snapshots")
+def take_memory_snapshot(request: SnapshotRequest, user=Depends(require_admin)):
+    try:
+        return memory.take_snapshot(request.label, request.top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/memory/snapshots")
+async def list_memory_snapshots(user=Depends(require_admin)):
+    return memory.list_snapshots()
+
+
+@router.get("/memory/diff")
+def diff_memory_snapshots(old: int, new: int, top: int = 20, user=Depends(require_admin)):
+    try:
+        return memory.diff_snapshots(old, new, top)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
@@ -8,6 +8,7 @@ from personal_ai_assistant.auth.auth_manager import AuthManager
 from personal_ai_assistant.config.config import settings
 from personal_ai_assistant.api.dependencies import get_auth_manager
 from personal_ai_assistant.models.user import User
+from personal_ai_assistant.utils.exceptions import ServiceBusyError
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -32,7 +33,7 @@ async def register_user(
     auth_manager: AuthManager = Depends(get_auth_manager)
 ):
     try:
-        created_user = auth_manager.create_user(user.username, user.email, user.password)
+        created_user = await auth_manager.create_user(user.username, user.email, user.password)
         if not created_user:
             logger.warning(f"User creation failed for username: {user.username}")
             raise HTTPException(
@@ -41,6 +42,9 @@ async def register_user(
             )
         logger.info(f"User created successfully: {user.username}")
         return {"message": "User created successfully"}
+    except ServiceBusyError as e:
+        logger.warning(f"Registration rejected for {user.username}: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error during user registration: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -53,7 +57,7 @@ async def login(
     auth_manager: AuthManager = Depends(get_auth_manager)
 ):
     try:
-        user = auth_manager.authenticate_user(form_data.username, form_data.password)
+        user = await auth_manager.authenticate_user(form_data.username, form_data.password)
         if not user:
             logger.warning(f"Failed login attempt for username: {form_data.username}")
             raise HTTPException(
@@ -81,6 +85,9 @@ async def login(
     except ValidationError as ve:
         logger.error(f"Validation error during login: {str(ve)}")
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(ve))
+    except ServiceBusyError as e:
+        logger.warning(f"Login rejected for {form_data.username}: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Unexpected error during login: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
@@ -96,7 +103,7 @@ async def get_user_info(
     auth_manager: AuthManager = Depends(get_auth_manager)
 ):
     try:
-        current_user = auth_manager.get_current_user(token)
+        current_user = await auth_manager.get_current_user(token)
         if not current_user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 import logging
+from personal_ai_assistant.api.dependencies import get_async_db, get_current_user
+from personal_ai_assistant.calendar.availability import Busy, UserIntervals, availability_index
 from personal_ai_assistant.calendar.caldav_client import CalDAVClient
+from personal_ai_assistant.calendar.sync import utc_naive
 from personal_ai_assistant.config import settings
 
 router = APIRouter()
@@ -18,6 +23,28 @@ class CalendarEvent(BaseModel):
     description: Optional[str] = None
 
 
+class Period(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class BusyEvent(BaseModel):
+    event_id: int
+    title: str
+    start: datetime
+    end: datetime
+
+
+class FreeBusyResponse(BaseModel):
+    busy: List[Period]
+    free: List[Period]
+
+
+class Conflict(BaseModel):
+    first: BusyEvent
+    second: BusyEvent
+
+
 def get_caldav_client():
     return CalDAVClient(settings.CALDAV_URL, settings.CALDAV_USERNAME, settings.CALDAV_PASSWORD)
 
@@ -49,3 +76,47 @@ async def create_calendar_event(
     except Exception as e:
         logger.error(f"Error creating calendar event: {str(e)}")
         raise HTTPException(status_code=500, detail="Error creating calendar event")
+
+
+async def get_user_intervals(user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)) -> UserIntervals:
+    return await availability_index.for_user(db, user.id)
+
+
+def _window(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    start, end = utc_naive(start), utc_naive(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    return start, end
+
+
+def _busy_event(event: Busy) -> BusyEvent:
+    return BusyEvent(event_id=event.event_id, title=event.title, start=event.start, end=event.end)
+
+
+@router.get("/freebusy", response_model=FreeBusyResponse)
+async def get_free_busy(
+    start: datetime,
+    end: datetime,
+    min_duration: int = Query(0, ge=0, description="Shortest free slot to report, in minutes"),
+    intervals: UserIntervals = Depends(get_user_intervals)
+):
+    start, end = _window(start, end)
+    return FreeBusyResponse(
+        busy=[Period(start=begin, end=finish) for begin, finish in intervals.busy(start, end)],
+        free=[Period(start=begin, end=finish)
+              for begin, finish in intervals.free(start, end, timedelta(minutes=min_duration))]
+    )
+
+
+@router.get("/conflicts", response_model=List[Conflict])
+async def get_conflicts(start: datetime, end: datetime, intervals: UserIntervals = Depends(get_user_intervals)):
+    start, end = _window(start, end)
+    return [Conflict(first=_busy_event(first), second=_busy_event(second))
+            for first, second in intervals.conflicts(start, end)]
+
+
+@router.get("/busy", response_model=List[BusyEvent])
+async def get_busy_events(start: datetime, end: datetime, intervals: UserIntervals = Depends(get_user_intervals)):
+    """Events, with recurring ones expanded, that overlap [start, end); use it to check a proposed slot."""
+    start, end = _window(start, end)
+    return [_busy_event(event) for event in intervals.overlapping(start, end)]
@@ -18,7 +18,7 @@ from personal_ai_assistant.llm.llama_cpp_interface import LlamaCppInterface
 from personal_ai_assistant.config import settings
 from personal_ai_assistant.database.db_manager import SessionLocal, DatabaseManager
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="v1/auth/token")
 
 
 @lru_cache()
@@ -55,7 +55,11 @@ def get_email_client():
         imap_server=settings.email_host,
         smtp_server=settings.smtp_host,
         username=settings.email_username,
-        password=settings.email_password.get_secret_value()
+        password=settings.email_password.get_secret_value(),
+        use_ssl=settings.email_use_ssl,
+        smtp_use_tls=settings.smtp_use_tls,
+        imap_port=settings.email_imap_port,
+        smtp_port=settings.smtp_port
     )
 
 
@@ -76,7 +80,7 @@ def get_web_scraper():
 
 @lru_cache()
 def get_github_client():
-    return GitHubClient(settings.GITHUB_TOKEN)
+    return GitHubClient(settings.github_token.get_secret_value())
 
 
 @lru_cache()
@@ -106,3 +110,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), auth_manager: AuthManager = Depends(get_auth_manager)):
+    """Dependency resolving the bearer token to the logged-in user."""
+    return await auth_manager.get_current_user(token)
+
+
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with get_db_manager().get_async_db() as db:
+        yield db
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
-from personal_ai_assistant.github.github_client import GitHubClient
+from typing import Optional
+from personal_ai_assistant.api.dependencies import get_github_client
 from personal_ai_assistant.config import settings
+from personal_ai_assistant.github.activity import verify_signature
+from personal_ai_assistant.github.github_client import GitHubClient
+import json
 import logging
 
 router = APIRouter()
@@ -9,10 +13,6 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 logger = logging.getLogger(__name__)
 
 
-def get_github_client():
-    return GitHubClient(settings.GITHUB_TOKEN)
-
-
 @router.get("/repos")
 async def get_github_repos(
     username: str,
@@ -41,3 +41,45 @@ async def get_github_issues(
     except Exception as e:
         logger.error(f"Error fetching GitHub issues for repo {repo_full_name}: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching GitHub issues")
+
+
+@router.get("/overview")
+async def get_github_overview(
+    username: str,
+    token: str = Depends(oauth2_scheme),
+    github_client: GitHubClient = Depends(get_github_client)
+):
+    try:
+        overview = await github_client.get_repositories_overview(username)
+        logger.info(f"Successfully fetched GitHub overview for user: {username}")
+        return {"repositories": overview}
+    except Exception as e:
+        logger.error(f"Error fetching GitHub overview for user {username}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error fetching GitHub overview")
+
+
+@router.post("/webhook", status_code=202)
+async def receive_github_webhook(
+    request: Request,
+    x_github_event: str = Header(...),
+    x_github_delivery: str = Header(...),
+    x_hub_signature_256: Optional[str] = Header(None)
+):
+    """Verify a GitHub webhook delivery and queue it for processing."""
+    if settings.github_webhook_secret is None:
+        raise HTTPException(status_code=503, detail="GitHub webhooks are not configured")
+    body = await request.body()
+    if not verify_signature(settings.github_webhook_secret.get_secret_value(), body, x_hub_signature_256):
+        logger.warning(f"Rejected GitHub webhook delivery {x_github_delivery} with a bad signature")
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    if x_github_event == "ping":
+        return {"status": "pong"}
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook payload must be JSON")
+
+    from personal_ai_assistant.tasks.github_tasks import process_github_webhook
+    process_github_webhook.delay(x_github_delivery, x_github_event, payload)
+    logger.info(f"Queued GitHub {x_github_event} delivery {x_github_delivery}")
+    return {"status": "queued"}
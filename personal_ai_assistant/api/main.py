@@ -1,13 +1,14 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from personal_ai_assistant.api import auth, tasks, email, calendar, text_processing, github, update, backup, web, vectordb
+from fastapi.responses import JSONResponse, Response
+from personal_ai_assistant.api import auth, tasks, email, calendar, text_processing, github, update, backup, web, vectordb, admin
+from personal_ai_assistant.api.middleware import LoggingMiddleware, MetricsMiddleware, ProfilingMiddleware
+from personal_ai_assistant.config import settings
 from personal_ai_assistant.database.base import Base, engine
+from personal_ai_assistant.utils.logging_config import setup_logging
+from personal_ai_assistant.utils.metrics import render_metrics
 import logging
-import sys
 import traceback
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
 
 Base.metadata.create_all(bind=engine)
 
@@ -23,13 +24,7 @@ app.add_middleware(
 )
 
 # Setup logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+setup_logging(log_level=logging.DEBUG if settings.debug else logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Include routers
@@ -43,6 +38,7 @@ app.include_router(update.router, prefix="/v1/update", tags=["update"])
 app.include_router(backup.router, prefix="/v1/backup", tags=["backup"])
 app.include_router(web.router, prefix="/v1/web", tags=["web"])
 app.include_router(vectordb.router, prefix="/v1/vectordb", tags=["vectordb"])
+app.include_router(admin.router, prefix="/v1/admin", tags=["admin"])
 
 @app.get("/")
 async def root():
@@ -54,29 +50,15 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.info(f"Request: {request.method} {request.url}")
-        try:
-            response = await call_next(request)
-            if response.status_code >= 400:
-                logger.error(f"Response status: {response.status_code}")
-                body = b""
-                async for chunk in response.body_iterator:
-                    body += chunk
-                logger.error(f"Response body: {body.decode()}")
-                # Create a new response with the logged body to avoid Content-Length mismatch
-                return Response(content=body, status_code=response.status_code, headers=dict(response.headers))
-            else:
-                logger.info(f"Response status: {response.status_code}")
-            return response
-        except Exception as e:
-            error_msg = f"Exception during request processing: {str(e)}"
-            logger.error(error_msg)
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            return JSONResponse(status_code=500, content={"message": "Internal Server Error", "detail": str(e)})
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
+app.add_middleware(ProfilingMiddleware)
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -84,6 +66,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"message": exc.detail},
+        headers=getattr(exc, "headers", None),
     )
 
 @app.exception_handler(Exception)
@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import secrets
+import time
+import traceback
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils.logging_config import SamplingFilter
+from personal_ai_assistant.utils.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from personal_ai_assistant.utils.profiling import request_profiler
+
+logger = logging.getLogger(__name__)
+
+# Successful-request lines are the hottest log call in the app, so they get their own sampled logger
+access_logger = logging.getLogger("personal_ai_assistant.api.access")
+access_logger.addFilter(SamplingFilter(settings.log_access_sample_rate))
+
+
+class LoggingMiddleware:
+    """Pure ASGI request logger.
+
+    Responses stream through untouched; for error responses only the first
+    ``log_error_body_limit`` bytes of the body are copied for the log line.
+    """
+
+    def __init__(self, app, body_limit: int = None):
+        self.app = app
+        self.body_limit = settings.log_error_body_limit if body_limit is None else body_limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = None
+        body_prefix = bytearray()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and status_code >= 400:
+                remaining = self.body_limit - len(body_prefix)
+                if remaining > 0:
+                    body_prefix.extend(message.get("body", b"")[:remaining])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            logger.error(f"Exception during request processing {scope['method']} {scope['path']}: {str(e)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            if status_code is not None:
+                raise
+            body = json.dumps({"message": "Internal Server Error", "detail": str(e)}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        if status_code is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if status_code >= 400:
+            level = logging.ERROR if status_code >= 500 else logging.WARNING
+            logger.log(
+                level,
+                f"{scope['method']} {scope['path']} -> {status_code} in {elapsed_ms:.1f}ms: "
+                f"{body_prefix.decode(errors='replace')}"
+            )
+        elif access_logger.isEnabledFor(logging.INFO):
+            access_logger.info(f"{scope['method']} {scope['path']} -> {status_code} in {elapsed_ms:.1f}ms")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Label by route template, not raw path, so IDs in URLs don't explode cardinality
+            route = scope.get("route")
+            route_path = getattr(route, "path", "<unmatched>")
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_path, str(status_code)).observe(
+                time.perf_counter() - start
+            )
+
+
+class ProfilingMiddleware:
+    """Profile a single request when it carries ``X-Profile: <profile_request_token>``.
+
+    The pstats file name is returned in the ``X-Profile-Output`` response
+    header and can be fetched through the admin API.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        token = settings.profile_request_token
+        if scope["type"] != "http" or not token:
+            await self.app(scope, receive, send)
+            return
+        header = next((value for name, value in scope["headers"] if name == b"x-profile"), None)
+        if header is None or not secrets.compare_digest(header, token.encode()):
+            await self.app(scope, receive, send)
+            return
+
+        started = request_profiler.try_start()
+        if started is None:
+            await self.app(scope, receive, send)
+            return
+        profiler, path = started
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-output", os.path.basename(path).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_profiler.finish(profiler, path)
+            logger.info(f"Profiled {scope['method']} {scope['path']} to {path}")
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import List
-from personal_ai_assistant.tasks.task_manager import TaskManager
-from personal_ai_assistant.api.dependencies import get_db
+from typing import List, Optional
+from personal_ai_assistant.tasks.task_manager import TaskManager, encode_task_cursor
+from personal_ai_assistant.api.dependencies import get_async_db
 import logging
 
 router = APIRouter()
@@ -24,7 +24,16 @@ class TaskResponse(BaseModel):
     completed: bool
 
 
-def get_task_manager(db: Session = Depends(get_db)):
+class TaskListItem(BaseModel):
+    id: Optional[int]
+    title: Optional[str]
+    description: Optional[str]
+    created_at: Optional[str]
+    completed: Optional[bool]
+    completed_at: Optional[str]
+
+
+def get_task_manager(db: AsyncSession = Depends(get_async_db)):
     return TaskManager(db)
 
 
@@ -43,15 +52,27 @@ async def create_task(
         raise HTTPException(status_code=500, detail="Error creating task")
 
 
-@router.get("", response_model=List[TaskResponse])
+@router.get("", response_model=List[TaskListItem], response_model_exclude_unset=True)
 async def get_tasks(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    completed: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated task fields to return"),
     token: str = Depends(oauth2_scheme),
     task_manager: TaskManager = Depends(get_task_manager)
 ):
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
     try:
-        tasks = await task_manager.get_all_tasks()
+        tasks = await task_manager.get_all_tasks(limit=limit, cursor=cursor, completed=completed, fields=field_list)
+        if len(tasks) == limit:
+            response.headers["X-Next-Cursor"] = encode_task_cursor(tasks[-1])
         logger.info(f"Successfully fetched {len(tasks)} tasks")
+        if field_list:
+            return [task.to_dict(field_list) for task in tasks]
         return [TaskResponse(**task.to_dict()) for task in tasks]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching tasks: {str(e)}")
         raise HTTPException(status_code=500, detail="Error fetching tasks")
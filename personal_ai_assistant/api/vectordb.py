@@ -4,7 +4,6 @@ from pydantic import BaseModel
 from typing import Optional, List
 import logging
 import traceback
-import sys
 import io
 from PyPDF2 import PdfReader
 
@@ -14,14 +13,7 @@ from personal_ai_assistant.config import settings
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-# Configure logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
 class VectorDBDocument(BaseModel):
     collection_name: str
@@ -42,10 +34,8 @@ async def upload_to_vectordb(
     token: str = Depends(oauth2_scheme),
     chroma_db: ChromaDBManager = Depends(get_chroma_db)
 ):
-    logger.debug("Entering upload_to_vectordb route")
     try:
         logger.info(f"Received file upload request: {file.filename}")
-        logger.debug(f"Token: {token[:10]}...")  # Log part of the token for debugging
         
         contents = await file.read()
         logger.info(f"File contents read, size: {len(contents)} bytes")
@@ -53,8 +43,6 @@ async def upload_to_vectordb(
         collection_name = "default_collection"
         
         logger.info(f"Attempting to add document to collection: {collection_name}")
-        logger.debug(f"ChromaDBManager instance: {chroma_db}")
-        logger.debug(f"Collection name: {collection_name}")
         
         # Extract text from PDF
         pdf_reader = PdfReader(io.BytesIO(contents))
@@ -82,21 +70,8 @@ async def query_vectordb(
     query: VectorDBQuery,
     chroma_db: ChromaDBManager = Depends(get_chroma_db)
 ):
-    logger.debug("Entering query_vectordb route")
     try:
         logger.info(f"Received query request for collection: {query.collection_name}")
-        logger.debug(f"Query text: {query.query_text}")
-        logger.debug(f"Number of results requested: {query.n_results}")
-        
-        logger.debug(f"ChromaDBManager instance: {chroma_db}")
-        
-        # Log available collections
-        try:
-            collections = chroma_db.list_collections()
-            logger.debug(f"Available collections: {collections}")
-        except Exception as e:
-            logger.error(f"Error listing collections: {str(e)}")
-            collections = []
         
         try:
             collection = chroma_db.get_or_create_collection(query.collection_name)
@@ -107,7 +82,6 @@ async def query_vectordb(
         logger.info(f"Querying collection: {query.collection_name}")
         results = chroma_db.query(query.collection_name, [query.query_text], query.n_results)
         
-        logger.debug(f"Query results: {results}")
         logger.info(f"Query returned {len(results['documents'][0]) if results['documents'] else 0} results")
         
         # Add some stats to the response
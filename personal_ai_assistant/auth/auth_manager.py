@@ -2,43 +2,95 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional
+import time
 from personal_ai_assistant.models.user import User
 from personal_ai_assistant.utils.encryption import EncryptionManager
 from personal_ai_assistant.database.db_manager import DatabaseManager
 from personal_ai_assistant.config import settings
-from sqlalchemy.orm import Session
+from personal_ai_assistant.utils.cache import LocalCache
+from sqlalchemy import select
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="v1/auth/token")
 
 
+class UserSnapshot(NamedTuple):
+    """Immutable copy of the user fields needed by authenticated requests."""
+    id: int
+    username: str
+    email: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(id=user.id, username=user.username, email=user.email, is_active=user.is_active)
+
+
 class AuthManager:
     def __init__(self, db_manager: DatabaseManager, encryption_manager: EncryptionManager):
         self.db_manager = db_manager
         self.encryption_manager = encryption_manager
+        # token -> (generation, UserSnapshot); skips the JWT decode and user lookup on repeat requests
+        self._user_cache = LocalCache(settings.auth_user_cache_maxsize)
+        # Bumped on every user change so cached snapshots of that user stop matching
+        self._user_generations: Dict[str, int] = {}
+
 
+    async def _get_user_by_username(self, db, username: str):
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
 
-    def authenticate_user(self, username: str, password: str):
-        with self.db_manager.get_db() as db:
-            user = db.query(User).filter(User.username == username).first()
+
+    async def authenticate_user(self, username: str, password: str):
+        async with self.db_manager.get_async_db() as db:
+            user = await self._get_user_by_username(db, username)
             if not user:
                 return False
-            if not self.encryption_manager.verify_password(password, user.hashed_password):
+            if not await self.encryption_manager.verify_password_async(password, user.hashed_password):
                 return False
             return user
 
 
-    def create_user(self, username: str, email: str, password: str):
-        with self.db_manager.get_db() as db:
-            existing_user = db.query(User).filter(User.username == username).first()
+    async def create_user(self, username: str, email: str, password: str):
+        async with self.db_manager.get_async_db() as db:
+            existing_user = await self._get_user_by_username(db, username)
             if existing_user:
                 return None
-            hashed_password = self.encryption_manager.hash_password(password)
+            hashed_password = await self.encryption_manager.hash_password_async(password)
             new_user = User(username=username, email=email, hashed_password=hashed_password)
             db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
+            await db.commit()
+            await db.refresh(new_user)
             return new_user
 
+    async def update_user(self, username: str, email: Optional[str] = None, password: Optional[str] = None):
+        async with self.db_manager.get_async_db() as db:
+            user = await self._get_user_by_username(db, username)
+            if not user:
+                return None
+            if email is not None:
+                user.email = email
+            if password is not None:
+                user.hashed_password = await self.encryption_manager.hash_password_async(password)
+            await db.commit()
+            await db.refresh(user)
+        self.invalidate_user(username)
+        return user
+
+    async def deactivate_user(self, username: str) -> bool:
+        async with self.db_manager.get_async_db() as db:
+            user = await self._get_user_by_username(db, username)
+            if not user:
+                return False
+            user.is_active = False
+            await db.commit()
+        self.invalidate_user(username)
+        return True
+
+    def invalidate_user(self, username: str):
+        """Drop cached sessions of a user in this process; other workers expire theirs within the cache TTL."""
+        self._user_generations[username] = self._user_generations.get(username, 0) + 1
+
 
     def create_access_token(self, data: dict, expires_delta: timedelta = None) -> str:
         to_encode = data.copy()
@@ -50,8 +102,14 @@ class AuthManager:
         encoded_jwt = jwt.encode(to_encode, str(settings.secret_key), algorithm=settings.algorithm)
         return str(encoded_jwt)  # Ensure the return value is a string
 
+    async def get_current_user(self, token: str = Depends(oauth2_scheme)) -> UserSnapshot:
+        cached = self._user_cache.get(token, None)
+        if cached is not None:
+            generation, user = cached
+            if generation == self._user_generations.get(user.username, 0):
+                return user
+            self._user_cache.delete(token)
 
-    def get_current_user(self, token: str = Depends(oauth2_scheme)):
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -64,8 +122,17 @@ class AuthManager:
                 raise credentials_exception
         except JWTError:
             raise credentials_exception
-        with self.db_manager.get_db() as db:
-            user = db.query(User).filter(User.username == username).first()
-            if user is None:
+        generation = self._user_generations.get(username, 0)
+        async with self.db_manager.get_async_db() as db:
+            user = await self._get_user_by_username(db, username)
+            if user is None or not user.is_active:
                 raise credentials_exception
-            return user
+            snapshot = UserSnapshot.from_user(user)
+
+        # Never serve a token from cache past its own expiry
+        ttl = settings.auth_user_cache_ttl
+        if payload.get("exp") is not None:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            self._user_cache.set(token, (generation, snapshot), ttl)
+        return snapshot
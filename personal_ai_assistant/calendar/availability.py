@@ -0,0 +1,195 @@
+"""Free/busy and conflict queries over synced calendar events.
+
+Each user's one-off events are held in arrays sorted by start time, next to
+a running maximum of their end times. An overlap query bisects both arrays
+to the slice of events that can intersect the window, so its cost follows
+the number of matches rather than the size of the calendar. Recurring
+events are kept apart and expanded one calendar year at a time through a
+bounded cache.
+
+The index for a user is rebuilt when their row count or latest
+``updated_at`` in ``calendar_events`` changes; only rows updated since the
+last build are read back unless rows were deleted.
+"""
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from dateutil.rrule import rrulestr
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.models.calendar_event import CalendarEvent
+
+
+class Busy(NamedTuple):
+    start: datetime
+    end: datetime
+    event_id: int
+    title: str
+
+
+class EventRow(NamedTuple):
+    id: int
+    title: str
+    start: datetime
+    end: datetime
+    rrule: Optional[str]
+
+
+@lru_cache(maxsize=settings.calendar_recurrence_cache_size)
+def occurrences_in_year(rule: str, dtstart: datetime, year: int) -> Tuple[datetime, ...]:
+    """Start times of a recurring event that fall in ``year``, as naive UTC."""
+    window_start, window_end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    if dtstart >= window_end:
+        return ()
+    try:
+        # UNTIL is usually given in UTC, which dateutil only accepts with an aware DTSTART
+        parsed = rrulestr(rule, dtstart=dtstart.replace(tzinfo=timezone.utc))
+        aware = True
+    except ValueError:
+        parsed = rrulestr(rule, dtstart=dtstart)
+        aware = False
+    if aware:
+        window_start, window_end = window_start.replace(tzinfo=timezone.utc), window_end.replace(tzinfo=timezone.utc)
+    starts = parsed.between(window_start, window_end, inc=True)
+    return tuple(start.replace(tzinfo=None) for start in starts if start < window_end)
+
+
+def expand(event: EventRow, start: datetime, end: datetime) -> List[Busy]:
+    """Occurrences of a recurring event overlapping [start, end)."""
+    duration = event.end - event.start
+    earliest = start - duration
+    occurrences = []
+    for year in range(max(earliest.year, event.start.year), end.year + 1):
+        for occurrence in occurrences_in_year(event.rrule, event.start, year):
+            if occurrence < end and occurrence + duration > start:
+                occurrences.append(Busy(occurrence, occurrence + duration, event.id, event.title))
+    return occurrences
+
+
+class UserIntervals:
+    """Immutable interval index over one user's events."""
+
+    def __init__(self, rows: Iterable[EventRow]):
+        single, self.recurring = [], []
+        for row in rows:
+            if row.rrule:
+                self.recurring.append(row)
+            else:
+                single.append(Busy(row.start, row.end, row.id, row.title))
+        single.sort()
+        self.events = single
+        self.starts = [event.start for event in single]
+        # Non-decreasing, so bisect finds the first event that may still be running at a given time
+        self.max_ends = list(accumulate((event.end for event in single), max))
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Busy]:
+        """Events and occurrences intersecting [start, end), ordered by start."""
+        first = bisect_right(self.max_ends, start)
+        last = bisect_left(self.starts, end)
+        found = [event for event in self.events[first:last] if event.end > start]
+        if self.recurring:
+            expanded = sorted(occurrence for event in self.recurring for occurrence in expand(event, start, end))
+            found = list(heapq.merge(found, expanded))
+        return found
+
+    def busy(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Merged busy periods within [start, end)."""
+        periods = []
+        for event in self.overlapping(start, end):
+            begin, finish = max(event.start, start), min(event.end, end)
+            if periods and begin <= periods[-1][1]:
+                if finish > periods[-1][1]:
+                    periods[-1] = (periods[-1][0], finish)
+            else:
+                periods.append((begin, finish))
+        return periods
+
+    def free(self, start: datetime, end: datetime,
+             min_duration: timedelta = timedelta(0)) -> List[Tuple[datetime, datetime]]:
+        """Gaps of at least ``min_duration`` between busy periods within [start, end)."""
+        slots, cursor = [], start
+        for begin, finish in self.busy(start, end) + [(end, end)]:
+            if begin - cursor >= min_duration and begin > cursor:
+                slots.append((cursor, begin))
+            cursor = max(cursor, finish)
+        return slots
+
+    def conflicts(self, start: datetime, end: datetime) -> List[Tuple[Busy, Busy]]:
+        """Pairs of events that overlap each other within [start, end)."""
+        pairs, active = [], []
+        for position, event in enumerate(self.overlapping(start, end)):
+            # active is a heap by end time; drop events that finished before this one starts
+            while active and active[0][0] <= event.start:
+                heapq.heappop(active)
+            pairs.extend((other, event) for _, _, other in sorted(active))
+            heapq.heappush(active, (event.end, position, event))
+        return pairs
+
+
+class IndexEntry(NamedTuple):
+    fingerprint: Tuple[int, Optional[datetime]]
+    rows: Dict[int, EventRow]
+    intervals: UserIntervals
+
+
+def _row(event) -> EventRow:
+    return EventRow(event.id, event.title or "", event.start_time, event.end_time or event.start_time, event.rrule)
+
+
+class AvailabilityIndex:
+    """Per-user interval indexes, kept in step with ``calendar_events``."""
+
+    COLUMNS = (CalendarEvent.id, CalendarEvent.title, CalendarEvent.start_time, CalendarEvent.end_time,
+               CalendarEvent.rrule)
+
+    def __init__(self):
+        self._entries: Dict[Optional[int], IndexEntry] = {}
+        self.full_loads = 0
+        self.incremental_loads = 0
+
+    def invalidate(self, user_id: Optional[int] = None):
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+
+    async def for_user(self, db: AsyncSession, user_id: int) -> UserIntervals:
+        owned = CalendarEvent.user_id == user_id
+        fingerprint = tuple((await db.execute(
+            select(func.count(CalendarEvent.id), func.max(CalendarEvent.updated_at))
+            .where(owned, CalendarEvent.start_time.isnot(None))
+        )).one())
+        entry = self._entries.get(user_id)
+        if entry is not None and entry.fingerprint == fingerprint:
+            return entry.intervals
+
+        rows = None
+        if entry is not None and entry.fingerprint[1] is not None:
+            # Ties on updated_at are read again rather than missed
+            changed = await db.execute(
+                select(*self.COLUMNS)
+                .where(owned, CalendarEvent.start_time.isnot(None),
+                       CalendarEvent.updated_at >= entry.fingerprint[1])
+            )
+            rows = dict(entry.rows)
+            rows.update((row.id, _row(row)) for row in changed)
+            if len(rows) != fingerprint[0]:
+                # Something was deleted; only a full read can tell what
+                rows = None
+            else:
+                self.incremental_loads += 1
+        if rows is None:
+            result = await db.execute(select(*self.COLUMNS).where(owned, CalendarEvent.start_time.isnot(None)))
+            rows = {row.id: _row(row) for row in result}
+            self.full_loads += 1
+
+        intervals = UserIntervals(rows.values())
+        self._entries[user_id] = IndexEntry(fingerprint, rows, intervals)
+        return intervals
+
+
+availability_index = AvailabilityIndex()
@@ -1,8 +1,141 @@
 import caldav
-from typing import List, Dict, Any
+import requests
+from caldav.lib.error import AuthorizationError, NotFoundError, ReportError
+from typing import List, Dict, Any, Awaitable, Callable, NamedTuple, Optional, Tuple
 import asyncio
-from functools import lru_cache
+import heapq
+import logging
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from urllib.parse import unquote, urljoin
+from personal_ai_assistant.calendar.sync import (
+    ETAG_PROPFIND, SyncCollection, SyncResult, SyncState, event_fields, multiget_body, parse_etags, parse_multiget,
+    parse_sync_collection, sync_collection_body, utc_naive
+)
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils.metrics import track_call
+
+logger = logging.getLogger(__name__)
+
+DAV = "{DAV:}"
+CALDAV = "{urn:ietf:params:xml:ns:caldav}"
+CALSERVER = "{http://calendarserver.org/ns/}"
+
+# Everything the listing needs from every calendar in the home, in one round trip
+CALENDAR_LIST_PROPFIND = """<?xml version="1.0" encoding="utf-8"?>
+<d:propfind xmlns:d="DAV:" xmlns:cs="http://calendarserver.org/ns/">
+  <d:prop><d:resourcetype/><d:displayname/><cs:getctag/><d:sync-token/></d:prop>
+</d:propfind>"""
+
+
+class CalendarInfo(NamedTuple):
+    name: str
+    url: str
+    ctag: Optional[str]
+    sync_token: Optional[str]
+
+
+class CalendarListing(NamedTuple):
+    home_url: str
+    calendars: Dict[str, CalendarInfo]
+    expires_at: float
+
+
+def parse_calendar_list(home_url: str, body) -> Dict[str, CalendarInfo]:
+    """Pick the calendar collections out of a Depth: 1 PROPFIND multistatus on the calendar home."""
+    root = ET.fromstring(body.encode() if isinstance(body, str) else body)
+    calendars = {}
+    for response in root.iter(f"{DAV}response"):
+        props = {}
+        for propstat in response.iter(f"{DAV}propstat"):
+            if " 200 " in (propstat.findtext(f"{DAV}status") or ""):
+                props.update((child.tag, child) for child in propstat.find(f"{DAV}prop"))
+        resourcetype = props.get(f"{DAV}resourcetype")
+        if resourcetype is None or resourcetype.find(f"{CALDAV}calendar") is None:
+            continue
+        url = urljoin(home_url, response.findtext(f"{DAV}href").strip())
+        display_name = props.get(f"{DAV}displayname")
+        name = (display_name.text or "").strip() if display_name is not None else ""
+        name = name or unquote(url.rstrip("/").rsplit("/", 1)[-1])
+        ctag, sync_token = props.get(f"{CALSERVER}getctag"), props.get(f"{DAV}sync-token")
+        calendars[name] = CalendarInfo(
+            name, url,
+            ctag.text if ctag is not None else None,
+            sync_token.text if sync_token is not None else None,
+        )
+    return calendars
+
+
+class CalendarListCache:
+    """Calendar listings per account, shared by every CalDAVClient in the process.
+
+    Fresh entries are served without a request. Once an entry expires, the
+    next caller re-reads the calendar home with a single PROPFIND (principal
+    discovery is not repeated) and compares ctags; concurrent callers on the
+    same event loop wait on that one request.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], CalendarListing] = {}
+        self._inflight: Dict[Tuple[Any, ...], asyncio.Task] = {}
+        self.hits = 0
+        self.unchanged = 0
+        self.changed = 0
+
+    def invalidate(self, key: Optional[Tuple[str, str]] = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get_or_fetch(
+        self,
+        key: Tuple[str, str],
+        fetch: Callable[[Optional[CalendarListing]], Awaitable[CalendarListing]],
+        refresh: bool = False
+    ) -> CalendarListing:
+        entry = self._entries.get(key)
+        if entry is not None and not refresh and entry.expires_at > time.monotonic():
+            self.hits += 1
+            return entry
+        loop = asyncio.get_running_loop()
+        # Tasks belong to one loop, and each Celery task run brings its own
+        flight_key = (key, loop)
+        task = self._inflight.get(flight_key)
+        if task is None:
+            task = loop.create_task(self._revalidate(key, entry, fetch))
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        # Shielded so one caller being cancelled does not fail the others
+        return await asyncio.shield(task)
+
+    async def _revalidate(self, key, previous: Optional[CalendarListing], fetch) -> CalendarListing:
+        listing = await fetch(previous)
+        changed = [
+            name for name, info in listing.calendars.items()
+            if previous is None or name not in previous.calendars or previous.calendars[name].ctag != info.ctag
+        ]
+        if previous is not None and not changed and listing.calendars.keys() == previous.calendars.keys():
+            self.unchanged += 1
+        else:
+            self.changed += 1
+            logger.debug(f"Calendars changed for {key[1]}@{key[0]}: {changed}")
+        self._entries[key] = listing
+        return listing
+
+
+calendar_cache = CalendarListCache(settings.caldav_calendar_cache_ttl)
+
+# caldav is blocking; every call runs here, so the pool size caps concurrent requests per process
+caldav_executor = ThreadPoolExecutor(max_workers=settings.caldav_max_parallel_requests, thread_name_prefix="caldav")
+
+
+def event_sort_key(event: Dict[str, Any]) -> datetime:
+    return utc_naive(event['start'])
 
 
 class CalDAVClient:
@@ -14,47 +147,194 @@ class CalDAVClient:
 
     async def connect(self):
         self.client = caldav.DAVClient(url=self.url, username=self.username, password=self.password)
-        self.principal = self.client.principal()
+        # One keep-alive pool shared by every calendar, large enough that parallel fetches reuse connections
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=settings.caldav_max_parallel_requests)
+        self.client.session.mount("http://", adapter)
+        self.client.session.mount("https://", adapter)
 
-    @lru_cache(maxsize=32)
-    async def get_calendars(self) -> List[Dict[str, Any]]:
-        if not self.client:
-            await self.connect()
-        calendars = await asyncio.to_thread(self.principal.calendars)
-        return [{'name': cal.name, 'url': cal.url} for cal in calendars]
+    @property
+    def _cache_key(self) -> Tuple[str, str]:
+        return (self.url, self.username)
 
-    async def get_events(self, calendar_name: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    @track_call("caldav", "list_calendars")
+    def _list_calendars(self, previous: Optional[CalendarListing]) -> CalendarListing:
+        if previous is not None:
+            home_url = previous.home_url
+        else:
+            home_url = str(self.client.principal().calendar_home_set.url)
+        response = self.client.propfind(home_url, CALENDAR_LIST_PROPFIND, depth=1)
+        return CalendarListing(
+            home_url, parse_calendar_list(home_url, response.raw), time.monotonic() + calendar_cache.ttl
+        )
+
+    async def _calendar_listing(self, refresh: bool = False) -> CalendarListing:
         if not self.client:
             await self.connect()
-        calendars = await self.get_calendars()
-        calendar = next((cal for cal in calendars if cal['name'] == calendar_name), None)
-        if not calendar:
-            raise ValueError(f"Calendar '{calendar_name}' not found")
+        return await calendar_cache.get_or_fetch(
+            self._cache_key,
+            lambda previous: self._run(self._list_calendars, previous),
+            refresh
+        )
 
-        cal = self.client.calendar(url=calendar['url'])
-        events = await asyncio.to_thread(cal.date_search, start, end)
-        return [
-            {
-                'id': event.id,
-                'summary': event.instance.vevent.summary.value,
-                'start': event.instance.vevent.dtstart.value,
-                'end': event.instance.vevent.dtend.value,
-                'description': event.instance.vevent.description.value if hasattr(event.instance.vevent, 'description') else '',
-                'location': event.instance.vevent.location.value if hasattr(event.instance.vevent, 'location') else ''
-            }
-            for event in events
-        ]
+    async def get_calendars(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        listing = await self._calendar_listing(refresh)
+        return [{'name': cal.name, 'url': cal.url, 'ctag': cal.ctag} for cal in listing.calendars.values()]
 
-    async def create_event(self, calendar_name: str, summary: str, start: datetime, end: datetime, description: str = '', location: str = '') -> Dict[str, Any]:
-        if not self.client:
-            await self.connect()
-        calendars = await self.get_calendars()
-        calendar = next((cal for cal in calendars if cal['name'] == calendar_name), None)
-        if not calendar:
+    async def _calendar_info(self, calendar_name: str) -> CalendarInfo:
+        listing = await self._calendar_listing()
+        info = listing.calendars.get(calendar_name)
+        if info is None:
+            # It may have been created since the listing was cached
+            info = (await self._calendar_listing(refresh=True)).calendars.get(calendar_name)
+        if info is None:
             raise ValueError(f"Calendar '{calendar_name}' not found")
+        return info
+
+    async def _calendar(self, calendar_name: str):
+        info = await self._calendar_info(calendar_name)
+        return self.client.calendar(url=info.url)
+
+    async def _run(self, func, *args, **kwargs):
+        try:
+            return await asyncio.get_running_loop().run_in_executor(caldav_executor, partial(func, *args, **kwargs))
+        except NotFoundError:
+            # Most likely a cached calendar URL that has gone; rediscover on the next call
+            calendar_cache.invalidate(self._cache_key)
+            raise
+
+    async def _gather(self, func: Callable[[Any], Awaitable[Any]], items: List[Any],
+                      max_parallel: Optional[int] = None) -> List[Any]:
+        semaphore = asyncio.Semaphore(max_parallel or settings.caldav_max_parallel_requests)
+
+        async def bounded(item):
+            async with semaphore:
+                return await func(item)
+
+        return await asyncio.gather(*(bounded(item) for item in items))
+
+    @staticmethod
+    def _search(cal, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        # Parse in the worker thread too, not on the event loop
+        return [{**event_fields(event.instance.vevent), 'id': event.id} for event in cal.date_search(start, end)]
+
+    @track_call("caldav")
+    async def get_events(self, calendar_name: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        cal = await self._calendar(calendar_name)
+        return await self._run(self._search, cal, start, end)
+
+    async def get_events_from_calendars(self, start: datetime, end: datetime,
+                                        calendar_names: Optional[List[str]] = None,
+                                        max_parallel: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Events from several calendars (all by default), fetched concurrently and merged by start time.
+
+        Each event carries the name of its calendar under ``'calendar'``.
+        """
+        if calendar_names is None:
+            calendar_names = list((await self._calendar_listing()).calendars)
+
+        async def fetch(name):
+            events = await self.get_events(name, start, end)
+            for event in events:
+                event['calendar'] = name
+            return sorted(events, key=event_sort_key)
+
+        per_calendar = await self._gather(fetch, calendar_names, max_parallel)
+        return list(heapq.merge(*per_calendar, key=event_sort_key))
+
+    async def sync_calendar(self, calendar_name: str, state: Optional[SyncState] = None) -> SyncResult:
+        """Fetch what changed in a calendar since ``state``, the state returned by the previous sync.
+
+        Uses the calendar listing for the ctag/sync-token check, so pass a
+        fresh listing (``get_calendars(refresh=True)``) before a sync run.
+        """
+        info = await self._calendar_info(calendar_name)
+        return await self._run(self._sync, info, state)
+
+    async def sync_calendars(self, states: Dict[str, SyncState],
+                             calendar_names: Optional[List[str]] = None) -> Dict[str, SyncResult]:
+        """Sync every calendar (or just ``calendar_names``); ``states`` and the result are keyed by calendar URL."""
+        listing = await self._calendar_listing(refresh=True)
+        calendars = [info for name, info in listing.calendars.items() if calendar_names is None or name in calendar_names]
+        results = await self._gather(lambda info: self._run(self._sync, info, states.get(info.url)), calendars)
+        return {info.url: result for info, result in zip(calendars, results)}
+
+    @track_call("caldav", "sync_calendar")
+    def _sync(self, info: CalendarInfo, state: Optional[SyncState]) -> SyncResult:
+        state = state or SyncState(None, None, {})
+        if (info.sync_token and info.sync_token == state.sync_token) or (info.ctag and info.ctag == state.ctag):
+            return SyncResult(state, {}, [])
 
-        cal = self.client.calendar(url=calendar['url'])
-        event = await asyncio.to_thread(
+        collection, incremental = None, False
+        if info.sync_token is not None:
+            if state.sync_token:
+                collection = self._sync_collection(info.url, state.sync_token)
+                incremental = collection is not None
+            if collection is None:
+                # No token yet, or the server no longer accepts it: list everything, ETags still
+                # spare the resources that did not change
+                collection = self._sync_collection(info.url, None)
+
+        if incremental:
+            deleted = collection.deleted
+            etags = {href: etag for href, etag in state.etags.items() if href not in deleted}
+            etags.update(collection.etags)
+        else:
+            if collection is None:
+                etags = parse_etags(info.url, self.client.propfind(info.url, ETAG_PROPFIND, depth=1).raw)
+            else:
+                etags = dict(collection.etags)
+            deleted = [href for href in state.etags if href not in etags]
+
+        stale = [href for href, etag in etags.items() if etag is None or state.etags.get(href) != etag]
+        resources = self._multiget(info.url, stale)
+        for href in stale:
+            if href not in resources:
+                # Deleted between the listing and the multiget
+                etags.pop(href)
+                deleted.append(href)
+        etags.update((href, etag) for href, (etag, _) in resources.items() if etag is not None)
+
+        logger.debug(f"Synced {info.name}: {len(resources)} changed, {len(deleted)} deleted")
+        return SyncResult(
+            SyncState(collection.sync_token if collection else None, info.ctag, etags),
+            {href: data for href, (_, data) in resources.items()},
+            deleted
+        )
+
+    def _sync_collection(self, url: str, token: Optional[str]) -> Optional[SyncCollection]:
+        """Run a sync-collection REPORT to completion, or return None if the server rejects it."""
+        etags, deleted = {}, []
+        while True:
+            try:
+                response = self.client.report(url, sync_collection_body(token), depth=1)
+            except AuthorizationError:
+                # caldav raises this for every 403, including an invalid sync token
+                return None
+            if response.status >= 400:
+                return None
+            page = parse_sync_collection(url, response.raw)
+            for href in page.deleted:
+                etags.pop(href, None)
+            deleted += page.deleted
+            etags.update(page.etags)
+            token = page.sync_token
+            if not page.truncated:
+                return SyncCollection(token, etags, deleted, False)
+
+    def _multiget(self, url: str, hrefs: List[str]) -> Dict[str, Tuple[Optional[str], str]]:
+        resources = {}
+        batch_size = settings.caldav_multiget_batch_size
+        for start in range(0, len(hrefs), batch_size):
+            response = self.client.report(url, multiget_body(hrefs[start:start + batch_size]), depth=1)
+            if response.status >= 400:
+                raise ReportError(f"calendar-multiget on {url} failed with {response.status}")
+            resources.update(parse_multiget(url, response.raw))
+        return resources
+
+    @track_call("caldav")
+    async def create_event(self, calendar_name: str, summary: str, start: datetime, end: datetime, description: str = '', location: str = '') -> Dict[str, Any]:
+        cal = await self._calendar(calendar_name)
+        event = await self._run(
             cal.save_event,
             summary=summary,
             dtstart=start,
@@ -71,17 +351,11 @@ class CalDAVClient:
             'location': location
         }
 
+    @track_call("caldav")
     async def update_event(self, calendar_name: str, event_id: str, summary: str, start: datetime, end: datetime, description: str = '', location: str = '') -> Dict[str, Any]:
-        if not self.client:
-            await self.connect()
-        calendars = await self.get_calendars()
-        calendar = next((cal for cal in calendars if cal['name'] == calendar_name), None)
-        if not calendar:
-            raise ValueError(f"Calendar '{calendar_name}' not found")
-
-        cal = self.client.calendar(url=calendar['url'])
-        event = await asyncio.to_thread(cal.event, event_id)
-        await asyncio.to_thread(
+        cal = await self._calendar(calendar_name)
+        event = await self._run(cal.event, event_id)
+        await self._run(
             event.load,
             summary=summary,
             dtstart=start,
@@ -89,7 +363,7 @@ class CalDAVClient:
             description=description,
             location=location
         )
-        await asyncio.to_thread(event.save)
+        await self._run(event.save)
         return {
             'id': event_id,
             'summary': summary,
@@ -99,14 +373,8 @@ class CalDAVClient:
             'location': location
         }
 
+    @track_call("caldav")
     async def delete_event(self, calendar_name: str, event_id: str):
-        if not self.client:
-            await self.connect()
-        calendars = await self.get_calendars()
-        calendar = next((cal for cal in calendars if cal['name'] == calendar_name), None)
-        if not calendar:
-            raise ValueError(f"Calendar '{calendar_name}' not found")
-
-        cal = self.client.calendar(url=calendar['url'])
-        event = await asyncio.to_thread(cal.event, event_id)
-        await asyncio.to_thread(event.delete)
+        cal = await self._calendar(calendar_name)
+        event = await self._run(cal.event, event_id)
+        await self._run(event.delete)
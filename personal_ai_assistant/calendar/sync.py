@@ -0,0 +1,255 @@
+"""Incremental calendar sync: protocol parsing and the local sync state.
+
+Each calendar keeps the sync token, ctag and per-resource ETags from its
+last sync. A sync asks the server only for what changed since then
+(RFC 6578 ``sync-collection``), or diffs ETags from a Depth: 1 PROPFIND on
+servers without sync support, and downloads just the changed resources
+with ``calendar-multiget``.
+"""
+import xml.etree.ElementTree as ET
+from datetime import datetime, time, timezone
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from xml.sax.saxutils import escape
+import vobject
+from sqlalchemy import delete, func, select
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.database.bulk import dialect_insert
+from personal_ai_assistant.models.calendar_event import CalendarEvent
+from personal_ai_assistant.models.calendar_sync_state import CalendarSyncState
+
+DAV = "{DAV:}"
+CALDAV = "{urn:ietf:params:xml:ns:caldav}"
+
+SYNC_COLLECTION_REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<d:sync-collection xmlns:d="DAV:">
+  <d:sync-token>{token}</d:sync-token><d:sync-level>1</d:sync-level><d:prop><d:getetag/></d:prop>
+</d:sync-collection>"""
+
+ETAG_PROPFIND = """<?xml version="1.0" encoding="utf-8"?>
+<d:propfind xmlns:d="DAV:"><d:prop><d:resourcetype/><d:getetag/></d:prop></d:propfind>"""
+
+MULTIGET_REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<c:calendar-multiget xmlns:d="DAV:" xmlns:c="urn:ietf:params:xml:ns:caldav">
+  <d:prop><d:getetag/><c:calendar-data/></d:prop>{hrefs}
+</c:calendar-multiget>"""
+
+
+class SyncState(NamedTuple):
+    sync_token: Optional[str]
+    ctag: Optional[str]
+    etags: Dict[str, str]
+
+
+class SyncResult(NamedTuple):
+    state: SyncState
+    # href -> iCalendar text of every resource added or modified since the previous state
+    changed: Dict[str, str]
+    deleted: List[str]
+
+
+class SyncCollection(NamedTuple):
+    sync_token: Optional[str]
+    etags: Dict[str, Optional[str]]
+    deleted: List[str]
+    truncated: bool
+
+
+def _path(base_url: str, href: str) -> str:
+    # Servers may answer with absolute URLs or paths; keep paths so both compare equal
+    return urlsplit(urljoin(base_url, href.strip())).path
+
+
+def iter_responses(root: ET.Element) -> Iterator[Tuple[str, Optional[str], Dict[str, ET.Element]]]:
+    """Yield (href, response status, properties found with 200) for each response in a multistatus."""
+    for response in root.iter(f"{DAV}response"):
+        props = {}
+        for propstat in response.iter(f"{DAV}propstat"):
+            if " 200 " in (propstat.findtext(f"{DAV}status") or ""):
+                props.update((child.tag, child) for child in propstat.find(f"{DAV}prop"))
+        yield response.findtext(f"{DAV}href"), response.findtext(f"{DAV}status"), props
+
+
+def _root(body) -> ET.Element:
+    return ET.fromstring(body.encode() if isinstance(body, str) else body)
+
+
+def _text(props: Dict[str, ET.Element], tag: str) -> Optional[str]:
+    element = props.get(tag)
+    return element.text if element is not None else None
+
+
+def parse_sync_collection(calendar_url: str, body) -> SyncCollection:
+    root = _root(body)
+    collection = _path(calendar_url, calendar_url)
+    etags, deleted, truncated = {}, [], False
+    for href, status, props in iter_responses(root):
+        path = _path(calendar_url, href)
+        if path == collection:
+            # The request URI itself only appears to say the result was truncated (507)
+            truncated = truncated or " 507 " in (status or "")
+        elif " 404 " in (status or ""):
+            deleted.append(path)
+        elif props:
+            etags[path] = _text(props, f"{DAV}getetag")
+    return SyncCollection(root.findtext(f"{DAV}sync-token"), etags, deleted, truncated)
+
+
+def parse_etags(calendar_url: str, body) -> Dict[str, Optional[str]]:
+    """Map resource path to ETag from a Depth: 1 PROPFIND, skipping the collection itself."""
+    collection = _path(calendar_url, calendar_url)
+    etags = {}
+    for href, _, props in iter_responses(_root(body)):
+        path = _path(calendar_url, href)
+        resourcetype = props.get(f"{DAV}resourcetype")
+        if path == collection or (resourcetype is not None and len(resourcetype)):
+            continue
+        etags[path] = _text(props, f"{DAV}getetag")
+    return etags
+
+
+def parse_multiget(calendar_url: str, body) -> Dict[str, Tuple[Optional[str], str]]:
+    """Map resource path to (ETag, iCalendar text); resources the server no longer has are left out."""
+    resources = {}
+    for href, _, props in iter_responses(_root(body)):
+        data = _text(props, f"{CALDAV}calendar-data")
+        if data is not None:
+            resources[_path(calendar_url, href)] = (_text(props, f"{DAV}getetag"), data)
+    return resources
+
+
+def multiget_body(hrefs: Iterable[str]) -> str:
+    return MULTIGET_REPORT.format(hrefs="".join(f"<d:href>{escape(href)}</d:href>" for href in hrefs))
+
+
+def sync_collection_body(token: Optional[str]) -> str:
+    return SYNC_COLLECTION_REPORT.format(token=escape(token or ""))
+
+
+def event_fields(vevent) -> Dict[str, Any]:
+    start = vevent.dtstart.value
+    if hasattr(vevent, 'dtend'):
+        end = vevent.dtend.value
+    elif hasattr(vevent, 'duration'):
+        end = start + vevent.duration.value
+    else:
+        end = start
+    return {
+        'id': vevent.uid.value if hasattr(vevent, 'uid') else None,
+        'summary': vevent.summary.value if hasattr(vevent, 'summary') else '',
+        'start': start,
+        'end': end,
+        'description': vevent.description.value if hasattr(vevent, 'description') else '',
+        'location': vevent.location.value if hasattr(vevent, 'location') else '',
+        'rrule': vevent.rrule.value if hasattr(vevent, 'rrule') else None
+    }
+
+
+def parse_event(ical: str) -> Optional[Dict[str, Any]]:
+    """Fields of the master VEVENT in a calendar resource, or None if it holds no event."""
+    calendar = vobject.readOne(ical)
+    for vevent in getattr(calendar, 'vevent_list', []):
+        # Overridden occurrences carry a RECURRENCE-ID; the master event does not
+        if not hasattr(vevent, 'recurrence_id'):
+            return event_fields(vevent)
+    return None
+
+
+def utc_naive(value) -> datetime:
+    """Naive UTC datetime for an iCalendar date or datetime, so events from any source compare."""
+    if not isinstance(value, datetime):
+        # All-day events carry plain dates
+        value = datetime.combine(value, time())
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def load_sync_states(db) -> Dict[str, SyncState]:
+    return {
+        row.calendar_url: SyncState(row.sync_token, row.ctag, row.etags or {})
+        for row in db.execute(select(CalendarSyncState)).scalars()
+    }
+
+
+def event_document(event: Dict[str, Any]) -> str:
+    return (f"Summary: {event['summary']}\nStart: {event['start']}\nEnd: {event['end']}\n"
+            f"Description: {event['description']}")
+
+
+def apply_sync_result(db, chroma_db, calendar_url: str, result: SyncResult, user_id: int) -> int:
+    """Apply a calendar's changes for ``user_id`` to the database and the vector store, committing once.
+
+    Changed events are upserted by calendar and UID and removed ones
+    deleted, in batches of ``calendar_sync_batch_size`` rows, so a run costs
+    a handful of statements however many events changed. The vector store is updated
+    before the commit: if it fails, the rows and sync state roll back and
+    the next run fetches the same changes again.
+    """
+    rows, events, now = {}, {}, datetime.utcnow()
+    for href, ical in result.changed.items():
+        event = parse_event(ical)
+        if event is None:
+            continue
+        events[href] = event
+        uid = event['id'] or href
+        # Keyed by UID: ON CONFLICT cannot touch the same row twice in one statement
+        rows[uid] = {
+            "uid": uid,
+            "calendar_url": calendar_url,
+            "href": href,
+            "title": event['summary'],
+            "description": event['description'],
+            "start_time": utc_naive(event['start']),
+            "end_time": utc_naive(event['end']),
+            "rrule": event['rrule'],
+            "user_id": user_id,
+            "updated_at": now,
+        }
+    rows = list(rows.values())
+    batch_size = settings.calendar_sync_batch_size
+
+    for start in range(0, len(result.deleted), batch_size):
+        db.execute(
+            delete(CalendarEvent)
+            .where(CalendarEvent.href.in_(result.deleted[start:start + batch_size]))
+            .execution_options(synchronize_session=False)
+        )
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        # A resource rewritten with a new UID would otherwise leave its old row behind
+        db.execute(
+            delete(CalendarEvent)
+            .where(CalendarEvent.href.in_([row["href"] for row in batch]),
+                   CalendarEvent.uid.notin_([row["uid"] for row in batch]))
+            .execution_options(synchronize_session=False)
+        )
+        insert = dialect_insert(db, CalendarEvent.__table__).values(batch)
+        updates = {column: insert.excluded[column] for column in batch[0]
+                   if column not in ("uid", "calendar_url", "user_id")}
+        # An update never takes away the owner of an existing event
+        updates["user_id"] = func.coalesce(insert.excluded.user_id, CalendarEvent.__table__.c.user_id)
+        db.execute(insert.on_conflict_do_update(index_elements=["calendar_url", "uid"], set_=updates))
+
+    state = db.execute(
+        select(CalendarSyncState).where(CalendarSyncState.calendar_url == calendar_url)
+    ).scalar_one_or_none()
+    if state is None:
+        state = CalendarSyncState(calendar_url=calendar_url)
+        db.add(state)
+    state.sync_token = result.state.sync_token
+    state.ctag = result.state.ctag
+    state.etags = result.state.etags
+    state.synced_at = datetime.now(timezone.utc)
+
+    if events:
+        chroma_db.upsert_documents(
+            "calendar_events",
+            [event_document(event) for event in events.values()],
+            [{'summary': event['summary'], 'start': str(event['start'])} for event in events.values()],
+            list(events)
+        )
+    if result.deleted:
+        chroma_db.delete_documents_by_ids("calendar_events", result.deleted)
+    db.commit()
+    return len(rows) + len(result.deleted)
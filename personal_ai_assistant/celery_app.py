@@ -1,7 +1,14 @@
 import os
 from celery import Celery
 from celery.schedules import crontab
+import time
+from celery.signals import task_postrun, task_prerun, worker_process_init, worker_ready
+from celery.worker.control import control_command
 from personal_ai_assistant.config import settings
+from personal_ai_assistant.database.engine import dispose_engines
+from personal_ai_assistant.utils.metrics import CELERY_TASK_DURATION, start_metrics_server
+from personal_ai_assistant.utils import memory
+from personal_ai_assistant.utils.profiling import start_profiling, stop_profiling
 
 # Create a directory for Celery Beat
 celery_beat_dir = '/tmp/celery_beat'
@@ -23,34 +30,112 @@ app.conf.update(
 
 app.conf.beat_schedule = {
     'check-emails-every-5-minutes': {
-        'task': 'personal_ai_assistant.tasks.check_and_process_new_emails',
+        'task': 'personal_ai_assistant.tasks.email_tasks.check_and_process_new_emails',
         'schedule': 300.0,
     },
     'sync-calendar-daily': {
-        'task': 'personal_ai_assistant.tasks.sync_calendar_events',
+        'task': 'personal_ai_assistant.tasks.calendar_tasks.sync_calendar_events',
         'schedule': crontab(hour=0, minute=0),  # Run daily at midnight
     },
+    'reconcile-github-activity-hourly': {
+        'task': 'personal_ai_assistant.tasks.github_tasks.reconcile_github_activity',
+        'schedule': crontab(minute=30),  # Only polls when webhook deliveries have stopped
+    },
     'clean-up-old-data-weekly': {
-        'task': 'personal_ai_assistant.tasks.clean_up_old_data',
+        'task': 'personal_ai_assistant.tasks.email_tasks.clean_up_old_emails',
         'schedule': crontab(day_of_week=0, hour=1, minute=0),  # Run weekly on Sunday at 1 AM
     },
     'update-task-statuses-hourly': {
-        'task': 'personal_ai_assistant.tasks.update_task_statuses',
+        'task': 'personal_ai_assistant.tasks.general_tasks.update_task_statuses',
         'schedule': crontab(minute=0),  # Run every hour
     },
     'generate-daily-summary': {
-        'task': 'personal_ai_assistant.tasks.generate_daily_summary',
+        'task': 'personal_ai_assistant.tasks.general_tasks.generate_daily_summary',
         'schedule': crontab(hour=23, minute=55),  # Run daily at 23:55
     },
     'check-for-updates-daily': {
-        'task': 'personal_ai_assistant.tasks.check_for_updates',
+        'task': 'personal_ai_assistant.tasks.general_tasks.check_for_updates',
         'schedule': crontab(hour=0, minute=0),  # Run daily at midnight
     },
     'create-periodic-backup': {
-        'task': 'personal_ai_assistant.tasks.create_periodic_backup',
+        'task': 'personal_ai_assistant.tasks.general_tasks.create_periodic_backup',
         'schedule': crontab(hour=2, minute=0),  # Run daily at 2 AM
     },
 }
 
+
+@worker_process_init.connect
+def reset_database_pools(**kwargs):
+    # Pooled connections inherited from the parent must not be shared across forked workers
+    dispose_engines(close=False)
+
+
+_task_started_at = {}
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, **kwargs):
+    _task_started_at[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started_at = _task_started_at.pop(task_id, None)
+    if started_at is not None and task is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started_at)
+
+
+@worker_ready.connect
+def serve_worker_metrics(**kwargs):
+    # Set PROMETHEUS_MULTIPROC_DIR so this endpoint aggregates the prefork children
+    if settings.celery_metrics_port:
+        start_metrics_server(settings.celery_metrics_port)
+
+
+# Remote control commands run in the worker's main process. With the prefork pool that
+# process only supervises children, so profile task code under --pool=threads or solo.
+@control_command(
+    args=[('duration', float), ('fmt', str), ('interval', float)],
+    signature='[duration [fmt [interval]]]',
+)
+def start_profiler(state, duration=30.0, fmt='collapsed', interval=0.01):
+    """Start the sampling profiler in this worker."""
+    try:
+        return {'ok': start_profiling(duration, fmt, interval)}
+    except (ValueError, RuntimeError) as e:
+        return {'error': str(e)}
+
+
+@control_command()
+def stop_profiler(state):
+    """Stop the sampling profiler in this worker and write its output."""
+    session = stop_profiling()
+    if session is None:
+        return {'error': 'No profiling session is running'}
+    return {'ok': session}
+
+
+@control_command()
+def memory_report(state):
+    """Report RSS, tracemalloc totals and model footprints of this worker."""
+    return {'ok': memory.memory_report()}
+
+
+@control_command(args=[('label', str), ('top', int)], signature='[label [top]]')
+def memory_snapshot(state, label='', top=20):
+    """Take a tracemalloc snapshot in this worker, starting tracing if needed."""
+    memory.start_tracing()
+    return {'ok': memory.take_snapshot(label, top)}
+
+
+@control_command(args=[('old', int), ('new', int), ('top', int)], signature='<old> <new> [top]')
+def memory_diff(state, old, new, top=20):
+    """Diff two snapshots previously taken in this worker."""
+    try:
+        return {'ok': memory.diff_snapshots(old, new, top)}
+    except KeyError as e:
+        return {'error': str(e.args[0])}
+
+
 if __name__ == '__main__':
     app.start()
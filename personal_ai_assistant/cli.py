@@ -21,6 +21,7 @@ from personal_ai_assistant.utils.logging_config import setup_logging
 from personal_ai_assistant.utils.exceptions import MyPIAException
 from personal_ai_assistant.utils.cache import invalidate_cache
 from personal_ai_assistant.utils.profiling import cpu_profile, memory_profile_decorator
+from personal_ai_assistant.utils.memory import MemoryWatcher
 from personal_ai_assistant.updater.update_manager import UpdateManager
 from personal_ai_assistant.utils.backup_manager import BackupManager
 from personal_ai_assistant.auth.auth_manager import AuthManager
@@ -60,7 +61,8 @@ except Exception as e:
 embedding_model = SentenceTransformerEmbeddings(settings.embedding_model)
 chroma_db = ChromaDBManager(settings.chroma_db_path)
 email_client = EmailClient(settings.email_host, settings.smtp_host, settings.email_username,
-                           settings.email_password.get_secret_value())
+                           settings.email_password.get_secret_value(), settings.email_use_ssl, settings.smtp_use_tls,
+                           imap_port=settings.email_imap_port, smtp_port=settings.smtp_port)
 caldav_client = CalDAVClient(settings.caldav_url, settings.caldav_username, settings.caldav_password.get_secret_value())
 task_manager = TaskManager()
 web_processor = WebScraper()
@@ -100,7 +102,7 @@ def ensure_model_exists(model_path, repo_id, filename, cache_dir):
 @click.pass_context
 def cli(ctx, username, password, offline, profile, profile_output):
     """Personal AI Assistant CLI"""
-    if not auth_manager.authenticate_user(username, password):
+    if not asyncio.run(auth_manager.authenticate_user(username, password)):
         console.print("[bold red]Authentication failed[/bold red]")
         ctx.abort()
     ctx.ensure_object(dict)
@@ -317,7 +319,7 @@ def similarity(ctx, text1: str, text2: str):
 @click.pass_context
 def cli(ctx, username, password, offline, profile, profile_output):
     """Personal AI Assistant CLI"""
-    if not auth_manager.authenticate_user(username, password):
+    if not asyncio.run(auth_manager.authenticate_user(username, password)):
         console.print("[bold red]Authentication failed[/bold red]")
         ctx.abort()
     ctx.ensure_object(dict)
@@ -674,8 +676,9 @@ def forward_email(ctx, original_uid: int, to: str, body: str):
 @cli.command()
 @click.argument('collection_name')
 @click.option('--interval', default=60, help='Interval in seconds between email checks')
+@click.option('--memory-interval', default=0, help='Log RSS and top allocation growth every N seconds (0 disables)')
 @profile_command
-def watch_emails(ctx, collection_name: str, interval: int):
+def watch_emails(ctx, collection_name: str, interval: int, memory_interval: int):
     """Watch for new emails and ingest them into the vector database in real-time"""
     if ctx.obj['offline']:
         console.print("[yellow]Warning: Running in offline mode, but watching for new emails is not supported.[/yellow]")
@@ -697,10 +700,16 @@ def watch_emails(ctx, collection_name: str, interval: int):
     console.print(f"[bold blue]Watching for new emails every {interval} seconds...[/bold blue]")
     console.print("[bold yellow]Press Ctrl+C to stop watching.[/bold yellow]")
 
+    watcher = MemoryWatcher(memory_interval) if memory_interval else None
+    if watcher:
+        watcher.start()
     try:
         asyncio.run(email_client.watch_for_new_emails(ingest_email, interval))
     except KeyboardInterrupt:
         console.print("[bold red]Stopped watching for new emails.[/bold red]")
+    finally:
+        if watcher:
+            watcher.stop()
 
 
 @cli.command()
@@ -785,6 +794,187 @@ def clear_cache(pattern: str):
     console.print(f"Cache entries matching '{pattern}' have been cleared.")
 
 
+@cli.group()
+def profiler():
+    """Sample a running API server or Celery workers"""
+    pass
+
+
+@profiler.command(name='api')
+@click.option('--url', default='http://localhost:8000', help='Base URL of the running API')
+@click.option('--duration', default=30.0, help='Seconds to sample for')
+@click.option('--format', 'fmt', type=click.Choice(['collapsed', 'pstats']), default='collapsed', help='Output format')
+@click.option('--output', type=click.Path(), help='Where to save the profile (defaults to the server-side file name)')
+@click.pass_context
+def profile_api(ctx, url: str, duration: float, fmt: str, output: str):
+    """Profile a running API server without restarting it"""
+    import requests
+    import time
+    token = auth_manager.create_access_token({"sub": ctx.obj['username']})
+    headers = {"Authorization": f"Bearer {token}"}
+    response = requests.post(f"{url}/v1/admin/profile/start", json={"duration": duration, "format": fmt}, headers=headers)
+    response.raise_for_status()
+    session = response.json()
+    console.print(f"Sampling pid {session['pid']} for {session['duration']}s...")
+    time.sleep(session['duration'] + 1)
+    name = os.path.basename(session['output'])
+    response = requests.get(f"{url}/v1/admin/profile/files/{name}", headers=headers)
+    response.raise_for_status()
+    output = output or name
+    with open(output, 'wb') as f:
+        f.write(response.content)
+    console.print(f"[bold green]Profile saved:[/bold green] {output}")
+
+
+@profiler.command(name='worker')
+@click.option('--duration', default=30.0, help='Seconds to sample for')
+@click.option('--format', 'fmt', type=click.Choice(['collapsed', 'pstats']), default='collapsed', help='Output format')
+def profile_worker(duration: float, fmt: str):
+    """Profile running Celery workers; output is written on each worker host"""
+    from personal_ai_assistant.celery_app import app as celery_app
+    replies = celery_app.control.broadcast(
+        'start_profiler', arguments={'duration': duration, 'fmt': fmt}, reply=True, timeout=2.0
+    )
+    if not replies:
+        console.print("[yellow]No workers replied[/yellow]")
+    for reply in replies:
+        for worker, result in reply.items():
+            if 'ok' in result:
+                console.print(f"{worker}: writing {result['ok']['output']} after {result['ok']['duration']}s")
+            else:
+                console.print(f"[bold red]{worker}:[/bold red] {result['error']}")
+
+
+@cli.group()
+def memory():
+    """Inspect memory of a running API server or Celery workers"""
+    pass
+
+
+def _memory_call(ctx, target: str, url: str, method: str, path: str, command: str, **arguments):
+    """Run a memory command against the API (via the admin router) or every Celery worker."""
+    if target == 'worker':
+        from personal_ai_assistant.celery_app import app as celery_app
+        replies = celery_app.control.broadcast(command, arguments=arguments, reply=True, timeout=5.0)
+        return {worker: result for reply in replies for worker, result in reply.items()}
+    import requests
+    token = auth_manager.create_access_token({"sub": ctx.obj['username']})
+    kwargs = {'json': arguments} if method == 'POST' else {'params': arguments}
+    response = requests.request(method, f"{url}/v1/admin{path}", headers={"Authorization": f"Bearer {token}"}, **kwargs)
+    response.raise_for_status()
+    return {'api': {'ok': response.json()}}
+
+
+def _print_memory_result(results: Dict[str, Any]):
+    for name, result in results.items():
+        if 'error' in result:
+            console.print(f"[bold red]{name}:[/bold red] {result['error']}")
+            continue
+        data = result['ok']
+        if 'rss_bytes' in data:
+            console.print(f"[bold]{name}[/bold] pid {data.get('pid')}: RSS {data['rss_bytes'] / 2**20:.1f} MiB")
+        for model, info in data.get('models', {}).items():
+            console.print(f"  {model}: {info}")
+        if data.get('top'):
+            table = Table("Allocation site", "Size (KiB)", "Change (KiB)", title=f"{name} snapshot {data.get('id', '')}")
+            for row in data['top']:
+                change = row.get('size_diff_bytes')
+                table.add_row(row['site'], f"{row['size_bytes'] / 1024:.1f}", "" if change is None else f"{change / 1024:+.1f}")
+            console.print(table)
+
+
+memory_target = click.option('--target', type=click.Choice(['api', 'worker']), default='api', help='Process to inspect')
+memory_url = click.option('--url', default='http://localhost:8000', help='Base URL of the running API')
+
+
+@memory.command(name='report')
+@memory_target
+@memory_url
+@click.pass_context
+def memory_report(ctx, target: str, url: str):
+    """Show RSS and model memory"""
+    _print_memory_result(_memory_call(ctx, target, url, 'GET', '/memory', 'memory_report'))
+
+
+@memory.command(name='snapshot')
+@click.option('--label', default='', help='Label stored with the snapshot')
+@memory_target
+@memory_url
+@click.pass_context
+def memory_snapshot(ctx, label: str, target: str, url: str):
+    """Take a tracemalloc snapshot, starting tracing if needed"""
+    if target == 'api':
+        _memory_call(ctx, target, url, 'POST', '/memory/tracing/start', 'memory_snapshot')
+    _print_memory_result(_memory_call(ctx, target, url, 'POST', '/memory/snapshots', 'memory_snapshot', label=label))
+
+
+@memory.command(name='diff')
+@click.argument('old', type=int)
+@click.argument('new', type=int)
+@memory_target
+@memory_url
+@click.pass_context
+def memory_diff(ctx, old: int, new: int, target: str, url: str):
+    """Compare two snapshots by allocation site"""
+    _print_memory_result(_memory_call(ctx, target, url, 'GET', '/memory/diff', 'memory_diff', old=old, new=new))
+
+
+@cli.group()
+def calendar():
+    """Free/busy and conflict queries over synced calendar events"""
+    pass
+
+
+async def _user_intervals(username: str):
+    from sqlalchemy import select
+    from personal_ai_assistant.calendar.availability import availability_index
+    from personal_ai_assistant.models.user import User
+    async with db_manager.get_async_db() as db:
+        user_id = (await db.execute(select(User.id).where(User.username == username))).scalar_one()
+        return await availability_index.for_user(db, user_id)
+
+
+calendar_start = click.argument('start', type=click.DateTime())
+calendar_end = click.argument('end', type=click.DateTime())
+
+
+@calendar.command(name='free')
+@calendar_start
+@calendar_end
+@click.option('--min-duration', default=30, help='Shortest free slot to show, in minutes')
+@click.pass_context
+def calendar_free(ctx, start, end, min_duration: int):
+    """Show busy periods and free slots between START and END (UTC)"""
+    from datetime import timedelta
+    intervals = asyncio.run(_user_intervals(ctx.obj['username']))
+    table = Table("Start", "End", "Status", title=f"Availability {start:%Y-%m-%d %H:%M} - {end:%Y-%m-%d %H:%M}")
+    periods = [(begin, finish, "[red]busy[/red]") for begin, finish in intervals.busy(start, end)]
+    periods += [(begin, finish, "[green]free[/green]")
+                for begin, finish in intervals.free(start, end, timedelta(minutes=min_duration))]
+    for begin, finish, status in sorted(periods):
+        table.add_row(f"{begin:%Y-%m-%d %H:%M}", f"{finish:%Y-%m-%d %H:%M}", status)
+    console.print(table)
+
+
+@calendar.command(name='conflicts')
+@calendar_start
+@calendar_end
+@click.pass_context
+def calendar_conflicts(ctx, start, end):
+    """List events that overlap each other between START and END (UTC)"""
+    intervals = asyncio.run(_user_intervals(ctx.obj['username']))
+    conflicts = intervals.conflicts(start, end)
+    if not conflicts:
+        console.print("No conflicts.")
+        return
+    table = Table("First", "Second", "Overlap", title=f"{len(conflicts)} conflicts")
+    for first, second in conflicts:
+        overlap = min(first.end, second.end) - second.start
+        table.add_row(f"{first.start:%Y-%m-%d %H:%M} {first.title}", f"{second.start:%Y-%m-%d %H:%M} {second.title}",
+                      str(overlap))
+    console.print(table)
+
+
 @cli.command()
 @click.option('--check-only', is_flag=True, help="Only check for updates without applying them")
 @profile_command
@@ -918,7 +1108,9 @@ email_client = EmailClient(
     settings.email_password.get_secret_value(),
     settings.email_use_ssl,
     settings.smtp_use_tls,
-    text_processor=text_processor
+    text_processor=text_processor,
+    imap_port=settings.email_imap_port,
+    smtp_port=settings.smtp_port
 )
 caldav_client = CalDAVClient(
     settings.caldav_url,
@@ -980,7 +1172,9 @@ email_client = EmailClient(
     settings.email_password.get_secret_value(),
     settings.email_use_ssl,
     settings.smtp_use_tls,
-    text_processor=text_processor
+    text_processor=text_processor,
+    imap_port=settings.email_imap_port,
+    smtp_port=settings.smtp_port
 )
 caldav_client = CalDAVClient(
     settings.caldav_url,
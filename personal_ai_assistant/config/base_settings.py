@@ -1,30 +1,77 @@
 from pydantic import BaseSettings, SecretStr
-from typing import Optional
+from typing import List, Optional
 
 
 class BaseSettings(BaseSettings):
     app_name: str = "Personal AI Assistant"
     debug: bool = False
+    log_access_sample_rate: float = 1.0
+    log_error_body_limit: int = 2048
+    profile_dir: str = "/tmp/mypia-profiles"
+    profile_max_duration: float = 300.0
+    profile_request_token: Optional[str] = None
+    admin_usernames: List[str] = []
+    tracemalloc_frames: int = 1
+    memory_snapshot_limit: int = 5
     version: str = "0.1.0"
     update_url: str = "https://api.mypia.com/updates"
     model_dir: str = "/app/models"
     static_dir: str = "/app/static"
     database_url: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    sqlite_mmap_size: int = 268435456
     chroma_db_host: str = "chroma"
     chroma_db_port: int = 8000
     redis_url: str
+    celery_metrics_port: int = 0
+    cache_serializer: str = "pickle"
+    cache_local_maxsize: int = 1024
+    cache_local_ttl: float = 60.0
+    cache_lock_timeout: float = 10.0
     llm_model_path: str
     embedding_model: str
     email_host: str
     email_username: str
     email_password: SecretStr
     email_use_ssl: bool
+    email_imap_port: Optional[int] = None
     smtp_host: str
     smtp_use_tls: bool
+    smtp_port: int = 587
     caldav_url: str
     caldav_username: str
     caldav_password: SecretStr
+    caldav_user_id: int = 1
+    caldav_calendar_cache_ttl: float = 300.0
+    caldav_multiget_batch_size: int = 100
+    caldav_max_parallel_requests: int = 4
+    calendar_sync_batch_size: int = 500
+    calendar_recurrence_cache_size: int = 4096
     github_token: SecretStr
+    github_api_url: str = "https://api.github.com"
+    github_cache_dir: str = "/tmp/mypia-github-cache"
+    github_max_connections: int = 10
+    github_timeout: float = 30.0
+    github_requests_per_second: float = 5.0
+    github_burst: int = 10
+    github_background_reserve: int = 500
+    github_max_retries: int = 3
+    github_max_rate_limit_wait: float = 60.0
+    github_graphql_repos_per_page: int = 50
+    github_graphql_items_per_page: int = 50
+    github_graphql_batch_size: int = 25
+    github_log_spool_size: int = 8 * 1024 * 1024
+    github_log_context_lines: int = 5
+    github_log_max_windows: int = 20
+    github_log_prompt_chars: int = 8000
+    github_webhook_secret: Optional[SecretStr] = None
+    github_webhook_stale_after: float = 3600.0
+    github_index_batch_size: int = 100
+    github_index_delay: float = 10.0
     encryption_password: SecretStr
     backup_dir: str
     enable_multi_user: bool = False
@@ -33,6 +80,13 @@ class BaseSettings(BaseSettings):
     secret_key: Optional[str] = None
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    auth_user_cache_ttl: float = 60.0
+    auth_user_cache_maxsize: int = 1024
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
+    email_retention_days: int = 30
+    email_retention_batch_size: int = 500
+    email_ingest_batch_size: int = 100
 
     class Config:
         env_file = ".env"
@@ -1,4 +1,5 @@
-from .db_manager import DatabaseManager, get_db
+from .db_manager import DatabaseManager, get_db, get_async_db
 from .base import Base
+from .engine import get_engine, get_async_engine, get_pool_stats
 
-__all__ = ['DatabaseManager', 'get_db', 'Base']
+__all__ = ['DatabaseManager', 'get_db', 'get_async_db', 'Base', 'get_engine', 'get_async_engine', 'get_pool_stats']
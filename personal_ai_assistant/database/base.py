@@ -1,12 +1,12 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from personal_ai_assistant.config import settings
+from personal_ai_assistant.database.engine import get_engine
 from sqlalchemy.ext.declarative import declarative_base
 
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = get_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
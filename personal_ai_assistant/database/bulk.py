@@ -0,0 +1,14 @@
+from sqlalchemy.orm import Session
+from personal_ai_assistant.utils.exceptions import DatabaseError
+
+
+def dialect_insert(session: Session, table):
+    """Return an INSERT construct supporting ON CONFLICT for the session's dialect."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise DatabaseError(f"Bulk upserts are not supported for dialect: {dialect}")
+    return insert(table)
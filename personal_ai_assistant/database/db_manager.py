@@ -1,16 +1,32 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from contextlib import contextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import contextmanager, asynccontextmanager
+from typing import Any, Dict
 from personal_ai_assistant.config import settings
+from personal_ai_assistant.database.engine import get_engine, get_async_engine, get_pool_stats
 
-engine = create_engine(settings.database_url)
+engine = get_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 class DatabaseManager:
     def __init__(self, database_url: str):
-        self.engine = create_engine(database_url)
+        self.database_url = database_url
+        self.engine = get_engine(database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self._async_session_factory = None
+
+    @property
+    def AsyncSessionLocal(self):
+        # Built lazily so sync-only processes never need the async driver installed
+        if self._async_session_factory is None:
+            self._async_session_factory = sessionmaker(
+                bind=get_async_engine(self.database_url),
+                class_=AsyncSession,
+                autoflush=False,
+                expire_on_commit=False
+            )
+        return self._async_session_factory
 
     @contextmanager
     def get_db(self):
@@ -20,6 +36,15 @@ class DatabaseManager:
         finally:
             db.close()
 
+    @asynccontextmanager
+    async def get_async_db(self):
+        async with self.AsyncSessionLocal() as db:
+            yield db
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return get_pool_stats(self.database_url)
+
 
 db_manager = DatabaseManager(settings.database_url)
 get_db = db_manager.get_db
+get_async_db = db_manager.get_async_db
@@ -0,0 +1,125 @@
+import threading
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url, URL
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool, QueuePool
+from personal_ai_assistant.config import settings
+
+_engines: Dict[str, Engine] = {}
+_async_engines: Dict[str, AsyncEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.close()
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _create_engine(database_url: str) -> Engine:
+    url = make_url(database_url)
+    pool_options = _pool_options()
+    if url.get_backend_name() != "sqlite":
+        return create_engine(database_url, **pool_options)
+
+    if url.database in (None, "", ":memory:"):
+        # In-memory databases live and die with a single connection; keep SQLAlchemy's default pool
+        return create_engine(database_url, connect_args={"check_same_thread": False})
+
+    engine = create_engine(
+        database_url,
+        poolclass=QueuePool,
+        connect_args={"check_same_thread": False},
+        **pool_options
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def get_engine(database_url: Optional[str] = None) -> Engine:
+    """Return the process-wide engine for database_url, creating it on first use."""
+    database_url = database_url or settings.database_url
+    engine = _engines.get(database_url)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(database_url)
+            if engine is None:
+                engine = _engines[database_url] = _create_engine(database_url)
+    return engine
+
+
+def _async_url(database_url: str) -> URL:
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+asyncpg")
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    raise ValueError(f"No async driver configured for database backend: {backend}")
+
+
+def _create_async_engine(database_url: str) -> AsyncEngine:
+    url = _async_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return create_async_engine(url, **_pool_options())
+
+    if url.database in (None, "", ":memory:"):
+        return create_async_engine(url)
+
+    # aiosqlite connections each own a thread tied to the creating event loop; opening a
+    # file-backed SQLite connection is cheap, so don't keep them pooled across loops
+    engine = create_async_engine(url, poolclass=NullPool)
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def get_async_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """Return the process-wide async engine (asyncpg / aiosqlite) for database_url."""
+    database_url = database_url or settings.database_url
+    engine = _async_engines.get(database_url)
+    if engine is None:
+        with _engines_lock:
+            engine = _async_engines.get(database_url)
+            if engine is None:
+                engine = _async_engines[database_url] = _create_async_engine(database_url)
+    return engine
+
+
+def get_pool_stats(database_url: Optional[str] = None) -> Dict[str, Any]:
+    pool = get_engine(database_url).pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    return stats
+
+
+def dispose_engines(close: bool = True):
+    """Drop pooled connections, e.g. in a freshly forked worker process.
+
+    Pass close=False after a fork so connections inherited from the parent
+    are abandoned rather than closed underneath it.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose(close=close)
+        # Async pools belong to the event loop that created them; let the new process build its own
+        _async_engines.clear()
@@ -2,10 +2,12 @@
 from personal_ai_assistant.models.user import User
 from personal_ai_assistant.models.task import Task
 from personal_ai_assistant.models.calendar_event import CalendarEvent
+from personal_ai_assistant.models.calendar_sync_state import CalendarSyncState
+from personal_ai_assistant.models.github_activity import GitHubActivity
 from personal_ai_assistant.models.user_preference import UserPreference
 from personal_ai_assistant.models.note import Note
 from personal_ai_assistant.models.contact import Contact
 from personal_ai_assistant.models.email import Email
 from personal_ai_assistant.models.document import Document
 
-__all__ = ['User', 'Task', 'CalendarEvent', 'UserPreference', 'Note', 'Contact', 'Email', 'Document']
+__all__ = ['User', 'Task', 'CalendarEvent', 'CalendarSyncState', 'GitHubActivity', 'UserPreference', 'Note', 'Contact', 'Email', 'Document']
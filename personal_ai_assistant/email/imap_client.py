@@ -1,100 +1,159 @@
 from aioimaplib import aioimaplib
-from email import message_from_bytes
-from email.header import decode_header
+import asyncio
+import contextlib
+import inspect
+import re
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any
-import email.utils
-import smtplib
+from email.utils import formatdate, make_msgid
+from typing import Any, Callable, Dict, List, Optional
+import aiosmtplib
+from personal_ai_assistant.email.parser import parse_email
+from personal_ai_assistant.utils.exceptions import APIError
+from personal_ai_assistant.utils.metrics import track_call
+
+INBOX = 'INBOX'
+UIDVALIDITY = re.compile(r"\[UIDVALIDITY (\d+)\]")
 
 
 class EmailClient:
-    def __init__(self, imap_server: str, smtp_server: str, username: str, password: str):
+    def __init__(self, imap_server: str, smtp_server: str, username: str, password: str,
+                 use_ssl: bool = True, smtp_use_tls: bool = True, text_processor=None,
+                 imap_port: Optional[int] = None, smtp_port: int = 587, imap_factory=None):
         self.imap_server = imap_server
         self.smtp_server = smtp_server
         self.username = username
         self.password = password
+        self.use_ssl = use_ssl
+        self.smtp_use_tls = smtp_use_tls
+        self.text_processor = text_processor
+        self.imap_port = imap_port or (993 if use_ssl else 143)
+        self.smtp_port = smtp_port
+        # Builds the IMAP connection from (host, port); overridable so tests can inject a client
+        self.imap_factory = imap_factory or (aioimaplib.IMAP4_SSL if use_ssl else aioimaplib.IMAP4)
+        # UIDVALIDITY of INBOX as of the last SELECT; UIDs are only meaningful together with it
+        self.uidvalidity: Optional[int] = None
 
-    async def fetch_emails(self, limit: int = 10) -> List[Dict[str, Any]]:
-        imap_client = aioimaplib.IMAP4_SSL(self.imap_server)
+    def _connect(self):
+        return self.imap_factory(self.imap_server, self.imap_port)
+
+    async def _open_inbox(self):
+        imap_client = self._connect()
         await imap_client.wait_hello_from_server()
-        await imap_client.login(self.username, self.password)
-        await imap_client.select('INBOX')
-        _, message_numbers = await imap_client.search('ALL')
-        message_numbers = message_numbers[0].split()
+        response = await imap_client.login(self.username, self.password)
+        if response.result != 'OK':
+            raise APIError(f"IMAP login failed: {response.lines}")
+        response = await imap_client.select(INBOX)
+        self.uidvalidity = next((int(match.group(1)) for line in response.lines
+                                 for match in [UIDVALIDITY.search(str(line))] if match), None)
+        return imap_client
+
+    @staticmethod
+    async def _search_uids(imap_client, *criteria: str) -> List[int]:
+        response = await imap_client.uid_search(*criteria)
+        if response.result != 'OK':
+            raise APIError(f"IMAP search failed: {response.lines}")
+        return [int(uid) for uid in response.lines[0].split()]
+
+    @staticmethod
+    async def _fetch_by_uid(imap_client, uids: List[int]) -> List[Dict[str, Any]]:
         emails = []
-        for num in message_numbers[-limit:]:
-            _, msg_data = await imap_client.fetch(num, '(RFC822)')
-            for response_part in msg_data:
-                if isinstance(response_part, tuple):
-                    msg = message_from_bytes(response_part[1])
-                    subject, encoding = decode_header(msg['Subject'])[0]
-                    if isinstance(subject, bytes):
-                        subject = subject.decode(encoding or 'utf-8')
-                    sender = msg['From']
-                    date = email.utils.parsedate_to_datetime(msg['Date'])
-                    body = ""
-                    if msg.is_multipart():
-                        for part in msg.walk():
-                            if part.get_content_type() == "text/plain":
-                                body = part.get_payload(decode=True).decode()
-                                break
-                    else:
-                        body = msg.get_payload(decode=True).decode()
-                    emails.append({
-                        'subject': subject,
-                        'from': sender,
-                        'date': date,
-                        'body': body,
-                        'uid': num.decode()
-                    })
+        for uid in uids:
+            response = await imap_client.uid('fetch', str(uid), '(RFC822)')
+            # aioimaplib hands literals back as bytearrays between the FETCH header and trailer lines
+            for line in response.lines:
+                if isinstance(line, bytearray):
+                    emails.append(parse_email(bytes(line), uid))
+        return emails
+
+    @track_call("imap")
+    async def fetch_emails(self, limit: int = 10) -> List[Dict[str, Any]]:
+        imap_client = await self._open_inbox()
+        uids = await self._search_uids(imap_client, 'ALL')
+        emails = await self._fetch_by_uid(imap_client, uids[-limit:])
         await imap_client.logout()
         return emails
 
+    @track_call("smtp")
     async def send_email(self, to: str, subject: str, body: str):
         msg = MIMEMultipart()
         msg['From'] = self.username
         msg['To'] = to
         msg['Subject'] = subject
+        msg['Date'] = formatdate(localtime=True)
+        msg['Message-ID'] = make_msgid()
         msg.attach(MIMEText(body, 'plain'))
 
-        with smtplib.SMTP(self.smtp_server, 587) as server:
-            server.starttls()
-            server.login(self.username, self.password)
-            server.send_message(msg)
+        await aiosmtplib.send(
+            msg,
+            hostname=self.smtp_server,
+            port=self.smtp_port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.smtp_use_tls
+        )
 
-    async def fetch_new_emails(self, last_uid: int = 0) -> List[Dict[str, Any]]:
-        imap_client = aioimaplib.IMAP4_SSL(self.imap_server)
-        await imap_client.wait_hello_from_server()
-        await imap_client.login(self.username, self.password)
-        await imap_client.select('INBOX')
-        _, message_numbers = await imap_client.search(f'UID {last_uid+1}:*')
-        message_numbers = message_numbers[0].split()
-        new_emails = []
-        for num in message_numbers:
-            _, msg_data = await imap_client.fetch(num, '(RFC822)')
-            for response_part in msg_data:
-                if isinstance(response_part, tuple):
-                    email_message = message_from_bytes(response_part[1])
-                    subject, encoding = decode_header(email_message['Subject'])[0]
-                    if isinstance(subject, bytes):
-                        subject = subject.decode(encoding or 'utf-8')
-                    sender = email_message['From']
-                    date = email.utils.parsedate_to_datetime(email_message['Date'])
-                    body = ""
-                    if email_message.is_multipart():
-                        for part in email_message.walk():
-                            if part.get_content_type() == "text/plain":
-                                body = part.get_payload(decode=True).decode()
-                                break
-                    else:
-                        body = email_message.get_payload(decode=True).decode()
-                    new_emails.append({
-                        'subject': subject,
-                        'from': sender,
-                        'date': date,
-                        'body': body,
-                        'uid': int(num.decode())
-                    })
+    @track_call("imap")
+    async def fetch_new_emails(self, last_uid: int = 0, uidvalidity: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Emails above ``last_uid``, each tagged with its mailbox and UIDVALIDITY.
+
+        ``last_uid`` is read against ``uidvalidity`` when given; if the server
+        has since reset UIDVALIDITY, the old UIDs mean nothing and every
+        message is returned.
+        """
+        imap_client = await self._open_inbox()
+        if uidvalidity is not None and uidvalidity != self.uidvalidity:
+            last_uid = 0
+        # "n:*" always matches the highest UID, even when it is below n
+        uids = [uid for uid in await self._search_uids(imap_client, f'UID {last_uid + 1}:*') if uid > last_uid]
+        new_emails = await self._fetch_by_uid(imap_client, uids)
         await imap_client.logout()
+        for email in new_emails:
+            email['mailbox'], email['uidvalidity'] = INBOX, self.uidvalidity
         return new_emails
+
+    async def get_latest_uid(self) -> int:
+        imap_client = await self._open_inbox()
+        uids = await self._search_uids(imap_client, 'ALL')
+        await imap_client.logout()
+        return max(uids, default=0)
+
+    async def watch_for_new_emails(self, callback: Callable[[Dict[str, Any]], Any], interval: float = 60):
+        """Pass each email arriving from now on to ``callback`` (plain or async) until cancelled.
+
+        Waits in IMAP IDLE when the server supports it, renewing it every
+        ``interval`` seconds, and otherwise polls every ``interval`` seconds.
+        """
+        imap_client = await self._open_inbox()
+        try:
+            last_uid = max(await self._search_uids(imap_client, 'ALL'), default=0)
+            use_idle = imap_client.has_capability('IDLE')
+            while True:
+                if use_idle:
+                    await self._idle(imap_client, interval)
+                else:
+                    await asyncio.sleep(interval)
+                    await imap_client.noop()
+                uids = [uid for uid in await self._search_uids(imap_client, f'UID {last_uid + 1}:*') if uid > last_uid]
+                for email in await self._fetch_by_uid(imap_client, uids):
+                    result = callback(email)
+                    if inspect.isawaitable(result):
+                        await result
+                last_uid = max(uids, default=last_uid)
+        finally:
+            with contextlib.suppress(Exception):
+                await imap_client.logout()
+
+    @staticmethod
+    async def _idle(imap_client, timeout: float):
+        """Wait until the server reports a mailbox change or ``timeout`` seconds pass."""
+        try:
+            idle = await imap_client.idle_start(timeout=timeout)
+            # idle_start ends the wait itself once timeout passes
+            with contextlib.suppress(asyncio.TimeoutError):
+                await imap_client.wait_server_push(timeout=timeout + 5)
+        finally:
+            # Also when cancelled, so the connection can still log out
+            if imap_client.has_pending_idle():
+                imap_client.idle_done()
+        await asyncio.wait_for(idle, timeout=10)
@@ -0,0 +1,29 @@
+from email import message_from_bytes
+from email.header import decode_header
+from typing import Any, Dict
+import email.utils
+
+
+def parse_email(raw_message: bytes, uid: Any) -> Dict[str, Any]:
+    """Turn a raw RFC822 message into the dict shape used throughout the app."""
+    msg = message_from_bytes(raw_message)
+    subject, encoding = decode_header(msg['Subject'])[0]
+    if isinstance(subject, bytes):
+        subject = subject.decode(encoding or 'utf-8')
+    date = email.utils.parsedate_to_datetime(msg['Date']) if msg['Date'] else None
+    body = ""
+    if msg.is_multipart():
+        for part in msg.walk():
+            if part.get_content_type() == "text/plain":
+                body = part.get_payload(decode=True).decode()
+                break
+    else:
+        body = msg.get_payload(decode=True).decode()
+    return {
+        'subject': subject,
+        'from': msg['From'],
+        'to': msg['To'],
+        'date': date,
+        'body': body,
+        'uid': uid
+    }
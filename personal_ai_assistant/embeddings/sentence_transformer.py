@@ -1,5 +1,6 @@
 from sentence_transformers import SentenceTransformer
 from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils.memory import register_memory_reporter
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,6 +8,12 @@ logger = logging.getLogger(__name__)
 
 class SentenceTransformerEmbeddings:
     def __init__(self, model_name: str = settings.embedding_model):
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
+        register_memory_reporter("sentence_transformer", self, SentenceTransformerEmbeddings._memory_report)
+
+    def _memory_report(self):
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return {"model": self.model_name, "tensor_bytes": sum(t.numel() * t.element_size() for t in tensors)}
 
     # ... (rest of the code remains unchanged)
@@ -0,0 +1,82 @@
+"""Finding failures in GitHub Actions log archives without loading them.
+
+A run's logs arrive as a zip of one text file per job step. Entries are
+decompressed as streams and read line by line; only a few lines of context
+around each line matching a failure signature are kept, in windows of
+bounded size, so memory stays flat however large the logs are.
+"""
+import io
+import re
+import zipfile
+from collections import deque
+from typing import IO, Iterable, Iterator, List, NamedTuple
+
+FAILURE_SIGNATURES = re.compile(
+    r"##\[error\]|Traceback \(most recent call last\)|\b(?:[A-Z]\w*Error|Exception)\b:|\bFAILED\b"
+    r"|\berror(?:\[\w+\])?:|npm ERR!|\bFAIL\b|Process completed with exit code [1-9]"
+)
+# Runner lines start with an ISO timestamp that adds nothing to the excerpt
+TIMESTAMP = re.compile(r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?Z ")
+MAX_LINE_LENGTH = 2000
+
+
+class ErrorWindow(NamedTuple):
+    file: str
+    line: int
+    text: str
+
+
+def scan_lines(lines: Iterable[str], file: str, context: int, max_windows: int) -> List[ErrorWindow]:
+    """Windows of ``context`` lines around each failure line; overlapping windows are merged.
+
+    A window holds at most ``2 * context + 1`` lines, so a long run of failure
+    lines is split into several windows instead of growing one without bound.
+    """
+    windows: List[ErrorWindow] = []
+    max_lines = 2 * context + 1
+    before = deque(maxlen=context)
+    current, first_line, remaining = None, 0, 0
+    for number, line in enumerate(lines, 1):
+        line = TIMESTAMP.sub("", line.rstrip("\r\n"))[:MAX_LINE_LENGTH]
+        if FAILURE_SIGNATURES.search(line):
+            if current is None:
+                if len(windows) == max_windows:
+                    break
+                current, first_line = list(before), number - len(before)
+            current.append(line)
+            remaining = context
+        elif current is not None:
+            current.append(line)
+            remaining -= 1
+        if current is not None and (remaining == 0 or len(current) >= max_lines):
+            windows.append(ErrorWindow(file, first_line, "\n".join(current)))
+            current = None
+            before.clear()
+        elif current is None:
+            before.append(line)
+    if current is not None:
+        windows.append(ErrorWindow(file, first_line, "\n".join(current)))
+    return windows
+
+
+def _entry_lines(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> Iterator[str]:
+    with archive.open(info) as raw:
+        text = io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+        # Bounded reads, so a single enormous line cannot be pulled into memory at once
+        yield from iter(lambda: text.readline(MAX_LINE_LENGTH), "")
+
+
+def scan_archive(fileobj: IO[bytes], context: int, max_windows: int) -> List[ErrorWindow]:
+    """Error windows from every step log in a run's log archive, at most ``max_windows`` in all."""
+    windows: List[ErrorWindow] = []
+    with zipfile.ZipFile(fileobj) as archive:
+        entries = [info for info in archive.infolist() if not info.is_dir()]
+        # The archive holds each job's log both whole at the top level and split into steps;
+        # read only one copy, preferring the steps for their more specific names
+        steps = [info for info in entries if "/" in info.filename]
+        for info in steps or entries:
+            if len(windows) >= max_windows:
+                break
+            windows.extend(scan_lines(_entry_lines(archive, info), info.filename, context,
+                                      max_windows - len(windows)))
+    return windows
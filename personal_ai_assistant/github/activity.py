@@ -0,0 +1,128 @@
+"""Recording GitHub activity and indexing it into the vector store.
+
+Webhook deliveries and polled events are stored through the same path:
+rows are keyed by delivery id or event id, so redeliveries and overlapping
+polls are dropped on insert, and rows not yet in the vector store are
+indexed in batches.
+"""
+import hashlib
+import hmac
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, select, update
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.database.bulk import dialect_insert
+from personal_ai_assistant.github.github_client import GitHubClient, parse_timestamp
+from personal_ai_assistant.github.scheduler import BACKGROUND, github_priority
+from personal_ai_assistant.models.github_activity import GitHubActivity
+from personal_ai_assistant.vector_db.chroma_db import ChromaDBManager
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "github_activities"
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Check an X-Hub-Signature-256 header against the raw request body."""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature[len("sha256="):], expected)
+
+
+def activity_from_webhook(delivery_id: str, event: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    # Named like the Events API types ("pull_request" -> "PullRequestEvent") so both sources read alike
+    event_type = "".join(part.title() for part in event.split("_")) + "Event"
+    created_at = None
+    for key in ("pull_request", "issue", "comment", "release", "head_commit"):
+        obj = payload.get(key) or {}
+        created_at = obj.get("updated_at") or obj.get("timestamp")
+        if created_at:
+            break
+    return {
+        "key": f"delivery:{delivery_id}",
+        "source": "webhook",
+        "event_type": event_type,
+        "repo": (payload.get("repository") or {}).get("full_name"),
+        "payload": payload,
+        "created_at": parse_timestamp(created_at) if created_at else datetime.utcnow(),
+    }
+
+
+def activity_from_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """A row for an event as returned by GitHubClient.get_user_activities."""
+    return {
+        "key": f"event:{event['id']}",
+        "source": "poll",
+        "event_type": event["type"],
+        "repo": event["repo"]["name"],
+        "payload": event["payload"],
+        "created_at": event["created_at"],
+    }
+
+
+def record_activities(db, rows: List[Dict[str, Any]]) -> int:
+    """Insert activity rows, skipping keys already stored; returns how many were new."""
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    rows = [{**row, "received_at": now} for row in rows]
+    result = db.execute(dialect_insert(db, GitHubActivity.__table__).values(rows)
+                        .on_conflict_do_nothing(index_elements=["key"]))
+    db.commit()
+    return result.rowcount
+
+
+def activity_document(activity: GitHubActivity) -> str:
+    return f"Type: {activity.event_type}\nRepo: {activity.repo}\nDetails: {activity.payload}"
+
+
+def index_pending_activities(db, chroma_db: ChromaDBManager, batch_size: Optional[int] = None) -> int:
+    """Add activities not yet in the vector store, one upsert and commit per batch."""
+    batch_size = batch_size or settings.github_index_batch_size
+    indexed = 0
+    while True:
+        batch = db.execute(
+            select(GitHubActivity).where(GitHubActivity.indexed_at.is_(None))
+            .order_by(GitHubActivity.id).limit(batch_size)
+        ).scalars().all()
+        if not batch:
+            return indexed
+        # Upserts keyed by activity key, so a batch indexed twice by concurrent runs stays one document each
+        chroma_db.upsert_documents(
+            COLLECTION,
+            [activity_document(activity) for activity in batch],
+            [{"type": activity.event_type or "", "repo": activity.repo or "", "created_at": str(activity.created_at)}
+             for activity in batch],
+            [activity.key for activity in batch]
+        )
+        db.execute(update(GitHubActivity).where(GitHubActivity.id.in_([a.id for a in batch]))
+                   .values(indexed_at=datetime.utcnow()))
+        db.commit()
+        indexed += len(batch)
+
+
+def webhooks_active(db, now: Optional[datetime] = None) -> bool:
+    """Whether a webhook delivery arrived recently enough that polling can be skipped."""
+    last_delivery = db.execute(
+        select(func.max(GitHubActivity.received_at)).where(GitHubActivity.source == "webhook")
+    ).scalar()
+    now = now or datetime.utcnow()
+    return last_delivery is not None and now - last_delivery < timedelta(seconds=settings.github_webhook_stale_after)
+
+
+async def poll_activities(db, github_client: GitHubClient, chroma_db: ChromaDBManager, force: bool = False) -> int:
+    """Reconcile by polling the Events API, unless webhooks are delivering; returns the new row count."""
+    if not force and webhooks_active(db):
+        logger.debug("GitHub webhooks are active; skipping activity poll")
+        return 0
+    # Webhook rows are keyed by delivery id, which the Events API never returns, so resuming from the
+    # latest polled event alone would insert and index everything the webhooks already delivered again
+    since = db.execute(select(func.max(GitHubActivity.created_at))).scalar()
+    with github_priority(BACKGROUND):
+        events = await github_client.get_user_activities(since=since)
+    recorded = record_activities(db, [activity_from_event(event) for event in events])
+    index_pending_activities(db, chroma_db)
+    logger.info(f"Polled {len(events)} GitHub events, {recorded} new")
+    return recorded
@@ -1,74 +1,390 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+import httpx
+from personal_ai_assistant.github.action_logs import ErrorWindow, scan_archive
+from personal_ai_assistant.github.graphql import ISSUES, OVERVIEW_QUERY, PULL_REQUESTS, Pending, items_query, next_cursor
+from personal_ai_assistant.github.response_cache import CachedResponse, ResponseCache
+from personal_ai_assistant.github.scheduler import scheduler_for
 from personal_ai_assistant.llm.text_processor import TextProcessor
-from github import Github
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils.exceptions import APIError
+from personal_ai_assistant.utils.metrics import track_call
+
+logger = logging.getLogger(__name__)
+
+NEXT_LINK = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """GitHub timestamps as naive UTC datetimes."""
+    if value is None:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def format_timestamp(value: datetime) -> str:
+    return naive_utc(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _issue_dict(issue: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": issue["title"],
+        "number": issue["number"],
+        "state": issue["state"],
+        "created_at": parse_timestamp(issue["created_at"]),
+        "updated_at": parse_timestamp(issue["updated_at"]),
+        "url": issue["html_url"]
+    }
+
+
+def _repo_node_dict(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": node["name"],
+        "description": node["description"],
+        "url": node["url"],
+        "stars": node["stargazerCount"],
+        "forks": node["forkCount"]
+    }
+
+
+def _item_node_dict(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": node["title"],
+        "number": node["number"],
+        # REST reports merged pull requests as closed
+        "state": "closed" if node["state"] == "MERGED" else node["state"].lower(),
+        "created_at": parse_timestamp(node["createdAt"]),
+        "updated_at": parse_timestamp(node["updatedAt"]),
+        "url": node["url"]
+    }
+
+
+ITEM_KEYS = {ISSUES: "issues", PULL_REQUESTS: "pull_requests"}
+
+FAILED_CONCLUSIONS = ("failure", "timed_out", "startup_failure")
 
 
 class GitHubClient:
-    def __init__(self, github_token: str, text_processor: TextProcessor = None):
+    """Async GitHub REST client.
+
+    Requests share one pooled httpx client per event loop. GET responses are
+    cached on disk with their ETag/Last-Modified, and repeated requests are
+    sent conditionally; GitHub answers unchanged resources with a 304, which
+    does not count against the rate limit. All requests are paced by the
+    token's shared RequestScheduler.
+    """
+
+    def __init__(self, github_token: str, text_processor: TextProcessor = None, base_url: str = None,
+                 cache_dir: str = None):
         self.github_token = github_token
         self.text_processor = text_processor
-        self.github = Github(self.github_token)
+        self.base_url = (base_url or settings.github_api_url).rstrip("/")
+        # GitHub Enterprise serves REST under /api/v3 and GraphQL at /api/graphql
+        api_root = self.base_url[:-len("/v3")] if self.base_url.endswith("/api/v3") else self.base_url
+        self.graphql_url = f"{api_root}/graphql"
+        self.cache = ResponseCache(cache_dir or settings.github_cache_dir)
+        # Responses depend on who asks; keep each token's cache entries apart without storing the token
+        self._cache_namespace = hashlib.sha256((github_token or "").encode()).hexdigest()[:16]
+        self.scheduler = scheduler_for(self._cache_namespace)
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop = None
 
-    def get_user_repos(self, username: str) -> List[Dict[str, Any]]:
-        user = self.github.get_user(username)
-        return [
-            {
-                "name": repo.name,
-                "description": repo.description,
-                "url": repo.html_url,
-                "stars": repo.stargazers_count,
-                "forks": repo.forks_count
-            }
-            for repo in user.get_repos()
-        ]
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # An httpx client's connections belong to the loop that opened them
+        if self._http is None or self._http_loop is not loop:
+            headers = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+            if self.github_token:
+                headers["Authorization"] = f"Bearer {self.github_token}"
+            limits = httpx.Limits(max_connections=settings.github_max_connections,
+                                  max_keepalive_connections=settings.github_max_connections)
+            self._http = httpx.AsyncClient(base_url=self.base_url, headers=headers, limits=limits,
+                                           timeout=settings.github_timeout)
+            self._http_loop = loop
+        return self._http
 
-    def get_repo_issues(self, repo_full_name: str) -> List[Dict[str, Any]]:
-        repo = self.github.get_repo(repo_full_name)
-        return [
-            {
-                "title": issue.title,
-                "number": issue.number,
-                "state": issue.state,
-                "created_at": issue.created_at,
-                "updated_at": issue.updated_at,
-                "url": issue.html_url
-            }
-            for issue in repo.get_issues(state="all")
-        ]
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response):
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise APIError(f"GitHub {response.request.method} {response.request.url.path} "
+                           f"failed with {response.status_code}: {message}")
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, or None if it was not rate limited."""
+        if response.status_code not in (403, 429):
+            return None
+        if "Retry-After" in response.headers:
+            return float(response.headers["Retry-After"])
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            return max(0.0, float(response.headers.get("X-RateLimit-Reset", 0)) - time.time())
+        if response.status_code == 429 or "rate limit" in response.text.lower():
+            # Secondary limits without Retry-After: GitHub asks for at least a minute
+            return 60.0
+        return None
+
+    async def _send(self, request: httpx.Request, resource: str = "core") -> httpx.Response:
+        for attempt in range(settings.github_max_retries + 1):
+            await self.scheduler.acquire(resource=resource)
+            response = await self._client().send(request)
+            self.scheduler.update(response.headers)
+            retry_after = self._retry_after(response)
+            if retry_after is None:
+                break
+            self.scheduler.backoff(retry_after)
+            # Long waits are left to the scheduler to enforce; this caller gets the error now
+            if attempt == settings.github_max_retries or retry_after > settings.github_max_rate_limit_wait:
+                break
+        return response
+
+    async def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Optional[str]]:
+        """GET a resource, conditionally if it was fetched before; returns (body, Link header)."""
+        request = self._client().build_request("GET", url, params=params)
+        key = f"{self._cache_namespace} {request.url}"
+        return await self.scheduler.coalesce(key, lambda: self._fetch(request, key))
+
+    async def _fetch(self, request: httpx.Request, key: str) -> Tuple[Any, Optional[str]]:
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            if cached.etag:
+                request.headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request.headers["If-Modified-Since"] = cached.last_modified
+        response = await self._send(request)
+        if response.status_code == 304 and cached is not None:
+            return cached.body, cached.link
+        self._raise_for_status(response)
+        body, link = response.json(), response.headers.get("Link")
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if etag or last_modified:
+            await asyncio.to_thread(self.cache.set, key, CachedResponse(etag, last_modified, link, body))
+        return body, link
+
+    async def _paginate(self, url: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        params = {"per_page": 100, **(params or {})}
+        while url:
+            items, link = await self._get(url, params)
+            for item in items:
+                yield item
+            match = NEXT_LINK.search(link or "")
+            # The next link already carries every query parameter
+            url, params = (match.group(1), None) if match else (None, None)
+
+    async def _download(self, url: str, fileobj):
+        """Stream a (possibly redirected) download into ``fileobj``."""
+        await self.scheduler.acquire()
+        # httpx drops the Authorization header when a redirect leaves the API host
+        async with self._client().stream("GET", url, follow_redirects=True) as response:
+            self.scheduler.update((response.history[0] if response.history else response).headers)
+            if response.status_code >= 400:
+                await response.aread()
+                self._raise_for_status(response)
+            async for chunk in response.aiter_bytes():
+                fileobj.write(chunk)
+
+    async def _post(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._send(self._client().build_request("POST", url, json=payload))
+        self._raise_for_status(response)
+        return response.json()
+
+    async def _graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        request = self._client().build_request("POST", self.graphql_url, json={"query": query, "variables": variables})
+        response = await self._send(request, resource="graphql")
+        self._raise_for_status(response)
+        payload = response.json()
+        errors = payload.get("errors") or []
+        if payload.get("data") is None:
+            raise APIError(f"GitHub GraphQL query failed: {'; '.join(e.get('message', '') for e in errors)}")
+        for error in errors:
+            # Partial results, e.g. one aliased repository that does not exist
+            logger.warning(f"GitHub GraphQL error: {error.get('message')}")
+        return payload["data"]
+
+    @staticmethod
+    def _add_items(entry: Dict[str, Any], full_name: str, kind: str, connection: Dict[str, Any],
+                   pending: List[Pending]):
+        entry[ITEM_KEYS[kind]].extend(_item_node_dict(node) for node in connection["nodes"])
+        cursor = next_cursor(connection)
+        if cursor is not None:
+            pending.append((full_name, kind, cursor))
+
+    async def _fetch_pending(self, results: Dict[str, Dict[str, Any]], pending: List[Pending]):
+        """Read the remaining pages of many repositories' connections, a batch of them per query."""
+        while pending:
+            batch = pending[:settings.github_graphql_batch_size]
+            pending = pending[settings.github_graphql_batch_size:]
+            query, variables = items_query(batch, page_size=100)
+            data = await self._graphql(query, variables)
+            for i, (full_name, kind, _) in enumerate(batch):
+                repository = data.get(f"r{i}")
+                if repository is not None:
+                    self._add_items(results[full_name], full_name, kind, repository["items"], pending)
 
-    def create_issue(self, repo_full_name: str, title: str, body: str) -> Dict[str, Any]:
-        repo = self.github.get_repo(repo_full_name)
-        issue = repo.create_issue(title=title, body=body)
-        return {
-            "title": issue.title,
-            "number": issue.number,
-            "state": issue.state,
-            "created_at": issue.created_at,
-            "updated_at": issue.updated_at,
-            "url": issue.html_url
-        }
-
-    def get_pull_requests(self, repo_full_name: str) -> List[Dict[str, Any]]:
-        repo = self.github.get_repo(repo_full_name)
+    @track_call("github")
+    async def get_repositories_overview(self, username: str) -> Dict[str, Dict[str, Any]]:
+        """Repositories of ``username`` with their open issues and pull requests, keyed by full name.
+
+        Each value holds the ``get_user_repos`` dict under "repo" and lists in
+        the ``get_repo_issues`` shape under "issues" and "pull_requests";
+        unlike the REST listing, "issues" holds no pull requests. Reads
+        everything through GraphQL, a page of repositories per query.
+        """
+        overview, pending, cursor = {}, [], None
+        while True:
+            data = await self._graphql(OVERVIEW_QUERY, {
+                "login": username, "cursor": cursor,
+                "repos": settings.github_graphql_repos_per_page, "items": settings.github_graphql_items_per_page,
+            })
+            if data["user"] is None:
+                raise APIError(f"GitHub user {username} not found")
+            repositories = data["user"]["repositories"]
+            for node in repositories["nodes"]:
+                full_name = node["nameWithOwner"]
+                entry = overview[full_name] = {"repo": _repo_node_dict(node), "issues": [], "pull_requests": []}
+                for kind in (ISSUES, PULL_REQUESTS):
+                    self._add_items(entry, full_name, kind, node[kind], pending)
+            cursor = next_cursor(repositories)
+            if cursor is None:
+                break
+        await self._fetch_pending(overview, pending)
+        return overview
+
+    @track_call("github")
+    async def get_open_items(self, repo_full_names: List[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """Open issues and pull requests of many repositories, keyed by full name, through GraphQL."""
+        results = {name: {"issues": [], "pull_requests": []} for name in repo_full_names}
+        await self._fetch_pending(results, [(name, kind, None) for name in results for kind in (ISSUES, PULL_REQUESTS)])
+        return results
+
+    @track_call("github")
+    async def get_user_repos(self, username: str) -> List[Dict[str, Any]]:
         return [
             {
-                "title": pr.title,
-                "number": pr.number,
-                "state": pr.state,
-                "created_at": pr.created_at,
-                "updated_at": pr.updated_at,
-                "url": pr.html_url
+                "name": repo["name"],
+                "description": repo["description"],
+                "url": repo["html_url"],
+                "stars": repo["stargazers_count"],
+                "forks": repo["forks_count"]
             }
-            for pr in repo.get_pulls(state="all")
+            async for repo in self._paginate(f"/users/{username}/repos")
         ]
 
+    @track_call("github")
+    async def get_repo_issues(self, repo_full_name: str, since: Optional[datetime] = None,
+                              state: str = "all") -> List[Dict[str, Any]]:
+        """Issues (including pull requests, as GitHub lists them) updated at or after ``since``."""
+        params = {"state": state, "sort": "updated", "direction": "desc"}
+        if since is not None:
+            params["since"] = format_timestamp(since)
+        return [_issue_dict(issue) async for issue in self._paginate(f"/repos/{repo_full_name}/issues", params)]
+
+    @track_call("github")
+    async def create_issue(self, repo_full_name: str, title: str, body: str) -> Dict[str, Any]:
+        issue = await self._post(f"/repos/{repo_full_name}/issues", {"title": title, "body": body})
+        return _issue_dict(issue)
+
+    @track_call("github")
+    async def get_pull_requests(self, repo_full_name: str, since: Optional[datetime] = None,
+                                state: str = "all") -> List[Dict[str, Any]]:
+        """Pull requests updated at or after ``since``.
+
+        The pulls endpoint has no ``since`` filter, so pages are read newest
+        update first and the walk stops at the first older pull request.
+        """
+        since = format_timestamp(since) if since is not None else None
+        pulls = []
+        params = {"state": state, "sort": "updated", "direction": "desc"}
+        async for pr in self._paginate(f"/repos/{repo_full_name}/pulls", params):
+            # Both sides are fixed-width UTC timestamps, so they compare as strings
+            if since is not None and pr["updated_at"] < since:
+                break
+            pulls.append(_issue_dict(pr))
+        return pulls
+
+    @track_call("github")
+    async def create_pull_request(self, repo_full_name: str, title: str, body: str, base: str,
+                                  head: str) -> Dict[str, Any]:
+        pr = await self._post(f"/repos/{repo_full_name}/pulls",
+                              {"title": title, "body": body, "base": base, "head": head})
+        return _issue_dict(pr)
+
+    @track_call("github")
+    async def get_user_activities(self, since: Optional[datetime] = None,
+                                  username: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Public events of ``username`` (the token's user by default) newer than ``since``, newest first."""
+        if username is None:
+            username = (await self._get("/user"))[0]["login"]
+        since = naive_utc(since) if since is not None else None
+        activities = []
+        async for event in self._paginate(f"/users/{username}/events"):
+            created_at = parse_timestamp(event["created_at"])
+            if since is not None and created_at <= since:
+                break
+            activities.append({**event, "created_at": created_at})
+        return activities
+
     async def review_pr(self, repo_name: str, pr_number: int) -> Dict[str, Any]:
         # Implementation for reviewing a PR
         pass
 
+    @track_call("github")
     async def parse_action_logs(self, repo_name: str, pr_number: int) -> Dict[str, Any]:
-        # Implementation for parsing action logs
-        pass
+        """Failure excerpts from the failed workflow runs of a pull request's head commit.
+
+        Each run's log archive is streamed to a spooled temporary file and
+        scanned one entry and line at a time; only the error windows are kept,
+        and only those are passed to the text processor for an explanation.
+        """
+        pull, _ = await self._get(f"/repos/{repo_name}/pulls/{pr_number}")
+        head_sha = pull["head"]["sha"]
+        listing, _ = await self._get(f"/repos/{repo_name}/actions/runs", {"head_sha": head_sha, "per_page": 100})
+        runs = []
+        for run in listing["workflow_runs"]:
+            if run.get("conclusion") not in FAILED_CONCLUSIONS:
+                continue
+            with tempfile.SpooledTemporaryFile(max_size=settings.github_log_spool_size) as spool:
+                await self._download(f"/repos/{repo_name}/actions/runs/{run['id']}/logs", spool)
+                spool.seek(0)
+                windows = await asyncio.to_thread(scan_archive, spool, settings.github_log_context_lines,
+                                                  settings.github_log_max_windows)
+            runs.append({
+                "id": run["id"],
+                "name": run["name"],
+                "conclusion": run["conclusion"],
+                "url": run["html_url"],
+                "errors": [window._asdict() for window in windows],
+                "analysis": await self._explain_failure(run["name"], windows)
+            })
+        return {"repo": repo_name, "pr_number": pr_number, "head_sha": head_sha, "runs": runs}
+
+    async def _explain_failure(self, run_name: str, windows: List[ErrorWindow]) -> Optional[str]:
+        if self.text_processor is None or not windows:
+            return None
+        excerpts = "\n\n".join(f"--- {window.file}, line {window.line} ---\n{window.text}" for window in windows)
+        prompt = (f"The GitHub Actions workflow '{run_name}' failed. Explain the likely cause of the failure "
+                  f"from these log excerpts:\n\n{excerpts[:settings.github_log_prompt_chars]}")
+        return await self.text_processor.generate_text(prompt, max_length=200)
 
     async def suggest_fixes(self, repo_name: str, pr_number: int) -> Dict[str, Any]:
         # Implementation for suggesting fixes
@@ -0,0 +1,50 @@
+"""GraphQL queries for reading many repositories in few round trips.
+
+The overview query lists a user's repositories a page at a time together
+with the first page of each one's open issues and pull requests. Whatever
+is left over is fetched by ``items_query``, which reads the next page of
+many repositories' connections at once through aliased ``repository``
+fields.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+ISSUES = "issues"
+PULL_REQUESTS = "pullRequests"
+
+ITEM_SELECTION = "nodes { title number state createdAt updatedAt url } pageInfo { hasNextPage endCursor }"
+ITEM_ARGUMENTS = "states: OPEN, orderBy: {field: UPDATED_AT, direction: DESC}"
+
+OVERVIEW_QUERY = f"""
+query Overview($login: String!, $cursor: String, $repos: Int!, $items: Int!) {{
+  user(login: $login) {{
+    repositories(first: $repos, after: $cursor, ownerAffiliations: OWNER, orderBy: {{field: NAME, direction: ASC}}) {{
+      pageInfo {{ hasNextPage endCursor }}
+      nodes {{
+        name nameWithOwner description url stargazerCount forkCount
+        issues(first: $items, {ITEM_ARGUMENTS}) {{ {ITEM_SELECTION} }}
+        pullRequests(first: $items, {ITEM_ARGUMENTS}) {{ {ITEM_SELECTION} }}
+      }}
+    }}
+  }}
+}}
+"""
+
+# (repository full name, ISSUES or PULL_REQUESTS, cursor to continue after)
+Pending = Tuple[str, str, Optional[str]]
+
+
+def items_query(pending: List[Pending], page_size: int) -> Tuple[str, Dict[str, Any]]:
+    """One query reading the next page of every pending connection; field ``r<i>`` answers ``pending[i]``."""
+    definitions, fields, variables = [], [], {}
+    for i, (full_name, kind, cursor) in enumerate(pending):
+        owner, name = full_name.split("/", 1)
+        definitions.append(f"$o{i}: String!, $n{i}: String!, $c{i}: String")
+        fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ "
+                      f"items: {kind}(first: {page_size}, after: $c{i}, {ITEM_ARGUMENTS}) {{ {ITEM_SELECTION} }} }}")
+        variables.update({f"o{i}": owner, f"n{i}": name, f"c{i}": cursor})
+    return f"query Items({', '.join(definitions)}) {{ {' '.join(fields)} }}", variables
+
+
+def next_cursor(connection: Dict[str, Any]) -> Optional[str]:
+    page_info = connection["pageInfo"]
+    return page_info["endCursor"] if page_info["hasNextPage"] else None
@@ -0,0 +1,51 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    link: Optional[str]
+    body: Any
+
+
+class ResponseCache:
+    """Validators and bodies of GET responses on disk, one JSON file per request.
+
+    Entries are only used to make requests conditional: a 304 answer means
+    the stored body is still current. Files are replaced atomically, so
+    several processes can share the directory.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key)) as f:
+                return CachedResponse(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable GitHub cache entry: {str(e)}")
+            return None
+
+    def set(self, key: str, entry: CachedResponse):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry._asdict(), f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,192 @@
+"""Pacing of GitHub API requests against the token's rate limit.
+
+Every GitHubClient using the same token shares one RequestScheduler, so a
+background sync and PR automation running side by side draw on a single
+budget. Requests take a slot from a token bucket whose refill rate spreads
+the remaining ``X-RateLimit-*`` budget over the time left until the reset,
+capped at ``github_requests_per_second``. Waiting requests are served
+interactive first. Only background requests are paced by the budget, and
+they leave the last ``github_background_reserve`` calls of a window to
+interactive ones, which are limited by the rate cap alone.
+Identical GETs in flight on the same event loop share one response.
+"""
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, NamedTuple, Optional
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils.exceptions import APIError
+from personal_ai_assistant.utils.metrics import GITHUB_RATE_LIMIT_REMAINING, GITHUB_REQUESTS_COALESCED
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority = contextvars.ContextVar("github_priority", default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def github_priority(priority: int):
+    """Run the GitHub requests made inside the block at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class Budget(NamedTuple):
+    limit: int
+    remaining: int
+    reset: float
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "loop", "future")
+
+    def __init__(self, priority: int, seq: int, loop: asyncio.AbstractEventLoop):
+        self.priority = priority
+        self.seq = seq
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = None
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class RequestScheduler:
+    # Waiters may sit on different event loops (e.g. Celery tasks each calling asyncio.run),
+    # so shared state is guarded by a thread lock and wake-ups go through call_soon_threadsafe.
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None, reserve: Optional[int] = None):
+        self.rate = rate or settings.github_requests_per_second
+        self.burst = burst or settings.github_burst
+        self.reserve = settings.github_background_reserve if reserve is None else reserve
+        self.budgets: Dict[str, Budget] = {}
+        self.paused_until = 0.0
+        self._tokens = float(self.burst)
+        self._updated = time.time()
+        self._lock = threading.Lock()
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._inflight: Dict[Any, asyncio.Task] = {}
+
+    def _fill_rate(self, priority: int, budget: Optional[Budget], now: float) -> float:
+        if priority == INTERACTIVE or budget is None or budget.reset <= now:
+            return self.rate
+        return min(self.rate, max(budget.remaining - self.reserve, 1) / (budget.reset - now))
+
+    def _delay(self, priority: int, resource: str, now: float) -> float:
+        """Seconds until a request may be sent; takes the slot when it is 0."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        budget = self.budgets.get(resource)
+        if budget is not None and budget.reset > now:
+            if budget.remaining <= 0:
+                return budget.reset - now
+            if priority != INTERACTIVE and budget.remaining <= self.reserve:
+                return budget.reset - now
+        rate = self._fill_rate(priority, budget, now)
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / rate
+
+    def _wake_head(self):
+        if self._waiters and self._waiters[0].future is not None:
+            head = self._waiters[0]
+            head.loop.call_soon_threadsafe(_wake, head.future)
+
+    async def acquire(self, priority: Optional[int] = None, resource: str = "core"):
+        """Wait for a request slot; waiters are served by priority, then arrival."""
+        priority = current_priority() if priority is None else priority
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            waiter = _Waiter(priority, next(self._seq), loop)
+            heapq.heappush(self._waiters, waiter)
+        try:
+            while True:
+                with self._lock:
+                    delay = None
+                    if self._waiters[0] is waiter:
+                        delay = self._delay(priority, resource, time.time())
+                        if delay == 0:
+                            heapq.heappop(self._waiters)
+                            self._wake_head()
+                            return
+                        if priority == INTERACTIVE and delay > settings.github_max_rate_limit_wait:
+                            raise APIError(f"GitHub rate limit exhausted for another {delay:.0f}s")
+                    waiter.future = loop.create_future()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(waiter.future, delay)
+        except BaseException:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                    self._wake_head()
+            raise
+
+    def update(self, headers: Mapping[str, str]):
+        """Record the budget reported in a response's X-RateLimit-* headers."""
+        try:
+            budget = Budget(int(headers["X-RateLimit-Limit"]), int(headers["X-RateLimit-Remaining"]),
+                            float(headers["X-RateLimit-Reset"]))
+        except (KeyError, ValueError):
+            return
+        resource = headers.get("X-RateLimit-Resource", "core")
+        with self._lock:
+            previous = self.budgets.get(resource)
+            # Responses can arrive out of order; within a window the lowest count is the latest
+            if previous is None or budget.reset != previous.reset or budget.remaining < previous.remaining:
+                self.budgets[resource] = budget
+        GITHUB_RATE_LIMIT_REMAINING.labels(resource).set(self.budgets[resource].remaining)
+
+    def backoff(self, seconds: float):
+        """Hold all requests for ``seconds``, e.g. after a secondary rate limit."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+        logger.warning(f"GitHub rate limited; pausing requests for {seconds:.0f}s")
+
+    async def coalesce(self, key: Any, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fetch`` once for identical ``key``s that are in flight at the same time."""
+        loop = asyncio.get_running_loop()
+        key = (loop, current_priority(), key)
+        task = self._inflight.get(key)
+        if task is not None:
+            GITHUB_REQUESTS_COALESCED.inc()
+        else:
+            task = self._inflight[key] = loop.create_task(fetch())
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller giving up does not cancel the request for the others
+        return await asyncio.shield(task)
+
+
+_schedulers: Dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def scheduler_for(namespace: str) -> RequestScheduler:
+    """The scheduler shared by all clients of one token."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(namespace)
+        if scheduler is None:
+            scheduler = _schedulers[namespace] = RequestScheduler()
+        return scheduler
@@ -1,15 +1,31 @@
 import os
+import time
 from llama_cpp import Llama
+from personal_ai_assistant.utils.memory import register_memory_reporter
+from personal_ai_assistant.utils.metrics import observe_llm_generation
 
 
 class LlamaCppInterface:
-    def __init__(self, model_path: str):
-        if not os.path.exists(model_path):
+    def __init__(self, model_path: str, llm=None):
+        # llm lets callers supply an already-loaded (or stand-in) model
+        if llm is None and not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found at {model_path}")
-        self.llm = Llama(model_path=model_path)
+        self.model_path = model_path
+        self.llm = llm if llm is not None else Llama(model_path=model_path)
+        register_memory_reporter("llama", self, LlamaCppInterface._memory_report)
+
+    def _memory_report(self):
+        # Weights are mmapped, so they only count towards RSS once pages are touched
+        model_bytes = os.path.getsize(self.model_path) if os.path.exists(self.model_path) else 0
+        return {"model_path": self.model_path, "model_file_bytes": model_bytes, "n_ctx": self.llm.n_ctx()}
 
     async def generate(self, prompt: str, max_tokens: int = 100) -> str:
+        start = time.perf_counter()
         output = self.llm(prompt, max_tokens=max_tokens)
+        usage = output.get('usage', {})
+        observe_llm_generation(
+            time.perf_counter() - start, usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+        )
         return output['choices'][0]['text']
 
     # Add other methods as needed
@@ -1,6 +1,8 @@
 from .user import User
 from .task import Task
 from .calendar_event import CalendarEvent
+from .calendar_sync_state import CalendarSyncState
+from .github_activity import GitHubActivity
 from .user_preference import UserPreference
 from .note import Note
 from .contact import Contact
@@ -12,6 +14,8 @@ __all__ = [
     'User',
     'Task',
     'CalendarEvent',
+    'CalendarSyncState',
+    'GitHubActivity',
     'UserPreference',
     'Note',
     'Contact',
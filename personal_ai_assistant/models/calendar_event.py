@@ -1,16 +1,34 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from personal_ai_assistant.database.base import Base
+from datetime import datetime
 
 
 class CalendarEvent(Base):
     __tablename__ = "calendar_events"
+    __table_args__ = (
+        # Range queries over one user's events
+        Index("ix_calendar_events_user_id_start_time", "user_id", "start_time"),
+        # Lets the availability index find what changed since it was built
+        Index("ix_calendar_events_user_id_updated_at", "user_id", "updated_at"),
+        # Sync upserts on it; an invite copied into a second calendar is a separate event there
+        Index("ix_calendar_events_calendar_url_uid", "calendar_url", "uid", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    # iCalendar UID, unique within a calendar
+    uid = Column(String, index=True)
+    # URL of the CalDAV calendar the event was synced from
+    calendar_url = Column(String)
+    # Path of the CalDAV resource the event was synced from
+    href = Column(String, index=True)
     title = Column(String, index=True)
     description = Column(String)
     start_time = Column(DateTime)
     end_time = Column(DateTime)
+    # RFC 5545 RRULE value for recurring events; start/end are then the first occurrence
+    rrule = Column(String)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = Column(Integer, ForeignKey("users.id"))
 
     user = relationship("User", back_populates="calendar_events")
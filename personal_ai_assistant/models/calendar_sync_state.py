@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from personal_ai_assistant.database.base import Base
+
+
+class CalendarSyncState(Base):
+    __tablename__ = "calendar_sync_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    calendar_url = Column(String, unique=True, index=True, nullable=False)
+    sync_token = Column(String)
+    ctag = Column(String)
+    # Resource path -> ETag as of the last sync
+    etags = Column(JSON)
+    synced_at = Column(DateTime(timezone=True))
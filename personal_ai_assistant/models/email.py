@@ -1,12 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from personal_ai_assistant.database.base import Base
 
 
 class Email(Base):
     __tablename__ = "emails"
+    __table_args__ = (
+        # IMAP UIDs are only unique within one mailbox and UIDVALIDITY
+        Index("ix_emails_mailbox_uidvalidity_uid", "mailbox", "uidvalidity", "uid", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    mailbox = Column(String)
+    uidvalidity = Column(BigInteger)
+    uid = Column(Integer, index=True)
     subject = Column(String, index=True)
     body = Column(String)
     sender = Column(String)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from personal_ai_assistant.database.base import Base
+from datetime import datetime
+
+
+class GitHubActivity(Base):
+    __tablename__ = "github_activities"
+    __table_args__ = (
+        # Latest delivery or polled event per source
+        Index("ix_github_activities_source_received_at", "source", "received_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # "delivery:<X-GitHub-Delivery>" for webhooks, "event:<id>" for polled events; ingestion dedupes on it
+    key = Column(String, unique=True, index=True, nullable=False)
+    # "webhook" or "poll"
+    source = Column(String, nullable=False)
+    event_type = Column(String, index=True)
+    repo = Column(String, index=True)
+    payload = Column(JSON)
+    created_at = Column(DateTime)
+    received_at = Column(DateTime, default=datetime.utcnow)
+    # Set once the activity is in the vector store
+    indexed_at = Column(DateTime, index=True)
@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from personal_ai_assistant.database.base import Base
 from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
 
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id), optionally filtered by completion state
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_completed_created_at_id", "completed", "created_at", "id"),
+    )
+
+    FIELDS = ("id", "title", "description", "created_at", "completed", "completed_at")
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -13,12 +21,12 @@ class Task(Base):
     completed = Column(Boolean, default=False)
     completed_at = Column(DateTime, nullable=True)
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "completed": self.completed,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None
-        }
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        # Only touch the requested attributes so column-projected rows never trigger a lazy load
+        result = {}
+        for field in fields or self.FIELDS:
+            value = getattr(self, field)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            result[field] = value
+        return result
@@ -1,11 +1,22 @@
 import spacy
 from typing import List, Dict
 from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils.memory import register_memory_reporter
 
 
 class SpacyProcessor:
     def __init__(self, model_name: str = settings.spacy_model):
+        self.model_name = model_name
         self.nlp = spacy.load(model_name)
+        register_memory_reporter("spacy", self, SpacyProcessor._memory_report)
+
+    def _memory_report(self):
+        return {
+            "model": self.model_name,
+            "pipeline": self.nlp.pipe_names,
+            "vocab_size": len(self.nlp.vocab),
+            "vectors_bytes": self.nlp.vocab.vectors.data.nbytes,
+        }
 
     def process_text(self, text: str) -> Dict:
         doc = self.nlp(text)
@@ -3,6 +3,8 @@ from personal_ai_assistant.database.db_manager import DatabaseManager
 from personal_ai_assistant.vector_db.chroma_db import ChromaDBManager
 from personal_ai_assistant.email.imap_client import EmailClient
 from personal_ai_assistant.calendar.caldav_client import CalDAVClient
+from personal_ai_assistant.calendar.sync import apply_sync_result, load_sync_states
+from personal_ai_assistant.github.activity import poll_activities
 from personal_ai_assistant.github.github_client import GitHubClient
 from personal_ai_assistant.config import settings
 
@@ -12,7 +14,9 @@ class SyncManager:
         self.db_manager = db_manager
         self.chroma_db = chroma_db
         self.email_client = EmailClient(settings.email_host, settings.smtp_host,
-                                        settings.email_username, settings.email_password.get_secret_value())
+                                        settings.email_username, settings.email_password.get_secret_value(),
+                                        settings.email_use_ssl, settings.smtp_use_tls,
+                                        imap_port=settings.email_imap_port, smtp_port=settings.smtp_port)
         self.caldav_client = CalDAVClient(settings.caldav_url, settings.caldav_username,
                                           settings.caldav_password.get_secret_value())
         self.github_client = GitHubClient(settings.github_token.get_secret_value())
@@ -43,37 +47,17 @@ class SyncManager:
         self.db_manager.update_last_synced_email_uid(new_emails[-1]['uid'] if new_emails else last_synced_uid)
 
     async def sync_calendar(self):
-        """Synchronize calendar events."""
-        last_synced_date = self.db_manager.get_last_synced_calendar_date()
-        new_events = await self.caldav_client.get_events("default", start=last_synced_date)
-        for event in new_events:
-            self.db_manager.log_calendar_event(
-                user_id=1,
-                summary=event['summary'],
-                start=event['start'],
-                end=event['end'],
-                description=event['description']
-            )
-            document = f"Summary: {event['summary']}\nStart: {event['start']}\nEnd: {event['end']}\nDescription: {event['description']}"
-            self.chroma_db.add_documents("calendar_events", [document], [event], [event['id']])
-        self.db_manager.update_last_synced_calendar_date(
-            max(event['end'] for event in new_events) if new_events else last_synced_date)
+        """Synchronize calendar events changed since the last sync."""
+        with self.db_manager.SessionLocal() as db:
+            states = load_sync_states(db)
+            results = await self.caldav_client.sync_calendars(states)
+            for calendar_url, result in results.items():
+                apply_sync_result(db, self.chroma_db, calendar_url, result, settings.caldav_user_id)
 
     async def sync_github(self):
-        """Synchronize GitHub data."""
-        last_synced_date = self.db_manager.get_last_synced_github_date()
-        new_activities = await self.github_client.get_user_activities(since=last_synced_date)
-        for activity in new_activities:
-            self.db_manager.log_github_activity(
-                user_id=1,
-                activity_type=activity['type'],
-                repo=activity['repo']['name'],
-                details=activity['payload']
-            )
-            document = f"Type: {activity['type']}\nRepo: {activity['repo']['name']}\nDetails: {activity['payload']}"
-            self.chroma_db.add_documents("github_activities", [document], [activity], [activity['id']])
-        self.db_manager.update_last_synced_github_date(
-            max(activity['created_at'] for activity in new_activities) if new_activities else last_synced_date)
+        """Poll GitHub activity as a fallback for webhook deliveries that did not arrive."""
+        with self.db_manager.SessionLocal() as db:
+            await poll_activities(db, self.github_client, self.chroma_db)
 
     async def sync_offline_actions(self):
         """Synchronize actions performed while offline."""
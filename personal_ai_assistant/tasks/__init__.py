@@ -1,5 +1,6 @@
 from .email_tasks import check_and_process_new_emails, clean_up_old_emails
 from .calendar_tasks import sync_calendar_events
+from .github_tasks import process_github_webhook, index_github_activities, reconcile_github_activity
 from .general_tasks import (
     update_task_statuses,
     generate_daily_summary,
@@ -11,6 +12,9 @@ __all__ = [
     'check_and_process_new_emails',
     'clean_up_old_emails',
     'sync_calendar_events',
+    'process_github_webhook',
+    'index_github_activities',
+    'reconcile_github_activity',
     'update_task_statuses',
     'generate_daily_summary',
     'check_for_updates',
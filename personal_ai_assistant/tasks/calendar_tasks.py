@@ -1,30 +1,35 @@
 from personal_ai_assistant.celery_app import app
 from personal_ai_assistant.calendar.caldav_client import CalDAVClient
-from personal_ai_assistant.database.db_manager import DatabaseManager
+from personal_ai_assistant.calendar.sync import apply_sync_result, load_sync_states
+from personal_ai_assistant.database.db_manager import db_manager
+from personal_ai_assistant.vector_db.chroma_db import ChromaDBManager
 from personal_ai_assistant.config import settings
-from datetime import datetime, timedelta
+from typing import List, Optional
+import asyncio
+import logging
 
+logger = logging.getLogger(__name__)
 
-@app.task
-def sync_calendar_events():
-    caldav_client = CalDAVClient(settings.caldav_url, settings.caldav_username, settings.caldav_password)
-    db_manager = DatabaseManager(settings.database_url)
 
-    # Fetch events from CalDAV server
-    start_date = datetime.now()
-    end_date = start_date + timedelta(days=30)  # Sync events for the next 30 days
-    events = caldav_client.get_events(start_date, end_date)
+@app.task
+def sync_calendar_events(calendar_names: Optional[List[str]] = None):
+    """Apply the CalDAV changes since the last run to the database and vector store, one commit per calendar."""
+    caldav_client = CalDAVClient(settings.caldav_url, settings.caldav_username,
+                                 settings.caldav_password.get_secret_value())
+    chroma_db = ChromaDBManager()
+    changed = deleted = 0
 
-    # Update local database with fetched events
-    for event in events:
-        db_manager.update_or_create_event(
-            event_id=event['id'],
-            title=event['summary'],
-            start_time=event['start'],
-            end_time=event['end'],
-            description=event.get('description', ''),
-            location=event.get('location', '')
-        )
+    with db_manager.SessionLocal() as db:
+        states = load_sync_states(db)
+        results = asyncio.run(caldav_client.sync_calendars(states, calendar_names))
+        for calendar_url, result in results.items():
+            try:
+                apply_sync_result(db, chroma_db, calendar_url, result, settings.caldav_user_id)
+            except Exception:
+                db.rollback()
+                raise
+            changed += len(result.changed)
+            deleted += len(result.deleted)
 
-    # Remove events from local database that no longer exist on the CalDAV server
-    db_manager.remove_non_existent_events([event['id'] for event in events], start_date, end_date)
+    logger.info(f"Calendar sync: {changed} changed and {deleted} deleted events across {len(results)} calendars")
+    return {"status": "success", "calendars": len(results), "changed": changed, "deleted": deleted}
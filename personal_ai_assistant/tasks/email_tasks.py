@@ -1,59 +1,147 @@
 from celery import shared_task
-from personal_ai_assistant.email.imap_client import EmailClient
+from sqlalchemy import select, delete, func, tuple_
+from typing import Any, Dict, Iterator, List
+from personal_ai_assistant.email.imap_client import INBOX, EmailClient
 from personal_ai_assistant.vector_db.chroma_db import ChromaDBManager
 from personal_ai_assistant.database.db_manager import db_manager
+from personal_ai_assistant.database.bulk import dialect_insert
 from personal_ai_assistant.models.email import Email
+from personal_ai_assistant.config import settings
 from datetime import datetime, timedelta
+import asyncio
+import logging
 
+logger = logging.getLogger(__name__)
 
-@shared_task
-def check_and_process_new_emails():
-    email_client = EmailClient()
-    chroma_db = ChromaDBManager()
-    
-    with db_manager.SessionLocal() as db:
-        new_emails = email_client.fetch_new_emails()
-        for email in new_emails:
-            # Process and store email in the database
-            db_email = Email(
-                subject=email['subject'],
-                sender=email['from'],
-                recipient=email['to'],
-                body=email['body'],
-                timestamp=email['date']
-            )
-            db.add(db_email)
-            db.commit()
-            db.refresh(db_email)
-
-            # Add email to vector database for semantic search
-            chroma_db.add_documents(
-                collection_name="emails",
-                documents=[email['body']],
-                metadatas=[{"subject": email['subject'], "date": str(email['date'])}],
-                ids=[str(db_email.id)]
-            )
 
+def store_email_batch(db, chroma_db: ChromaDBManager, emails: List[Dict[str, Any]]) -> int:
+    """Insert a batch of fetched emails and index the new ones, committing once; returns the new row count.
 
-@shared_task
-def clean_up_old_emails():
+    Rows are keyed by (mailbox, UIDVALIDITY, uid), so re-running a batch
+    neither duplicates rows nor documents, and mail arriving after a
+    UIDVALIDITY reset is stored next to the old rows instead of being
+    mistaken for them.
+    """
+    rows = [
+        {
+            "mailbox": email['mailbox'],
+            "uidvalidity": email['uidvalidity'],
+            "uid": email['uid'],
+            "subject": email['subject'],
+            "sender": email['from'],
+            "recipient": email.get('to'),
+            "body": email['body'],
+            "timestamp": email['date'],
+        }
+        for email in emails
+    ]
+    key = tuple_(Email.mailbox, Email.uidvalidity, Email.uid)
+    stored = set(db.execute(
+        select(Email.mailbox, Email.uidvalidity, Email.uid).where(key.in_([_email_key(row) for row in rows]))
+    ).all())
+    new_rows = {}
+    for row in rows:
+        if _email_key(row) not in stored:
+            new_rows.setdefault(_email_key(row), row)
+    if not new_rows:
+        return 0
+    rows = list(new_rows.values())
+    db.execute(dialect_insert(db, Email.__table__).values(rows)
+               .on_conflict_do_nothing(index_elements=["mailbox", "uidvalidity", "uid"]))
+    ids_by_key = {
+        (mailbox, uidvalidity, uid): email_id
+        for mailbox, uidvalidity, uid, email_id in db.execute(
+            select(Email.mailbox, Email.uidvalidity, Email.uid, Email.id).where(key.in_(list(new_rows)))
+        ).all()
+    }
+
+    # Index before committing: if Chroma fails the rows roll back and the retry starts clean.
+    # Only this call's rows are indexed, so an existing email's document is never rewritten.
+    chroma_db.upsert_documents(
+        collection_name="emails",
+        documents=[row["body"] for row in rows],
+        metadatas=[{"subject": row["subject"], "date": str(row["timestamp"])} for row in rows],
+        ids=[str(ids_by_key[_email_key(row)]) for row in rows]
+    )
+    db.commit()
+    return len(rows)
+
+
+def _email_key(row: Dict[str, Any]):
+    return row["mailbox"], row["uidvalidity"], row["uid"]
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+def check_and_process_new_emails(self, batch_size: int = None):
+    email_client = EmailClient(
+        imap_server=settings.email_host,
+        smtp_server=settings.smtp_host,
+        username=settings.email_username,
+        password=settings.email_password.get_secret_value(),
+        use_ssl=settings.email_use_ssl,
+        smtp_use_tls=settings.smtp_use_tls,
+        imap_port=settings.email_imap_port,
+        smtp_port=settings.smtp_port
+    )
     chroma_db = ChromaDBManager()
+    batch_size = batch_size or settings.email_ingest_batch_size
+    processed = 0
 
     with db_manager.SessionLocal() as db:
-        # Define the cutoff date (e.g., emails older than 30 days)
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
+        # Resume from the newest UIDVALIDITY seen; the client starts over if the server has moved on
+        uidvalidity = db.execute(
+            select(Email.uidvalidity).where(Email.mailbox == INBOX).order_by(Email.id.desc()).limit(1)
+        ).scalar()
+        last_uid = db.execute(
+            select(func.max(Email.uid)).where(Email.mailbox == INBOX, Email.uidvalidity == uidvalidity)
+        ).scalar() or 0
+        new_emails = asyncio.run(email_client.fetch_new_emails(last_uid, uidvalidity))
+        for start in range(0, len(new_emails), batch_size):
+            try:
+                processed += store_email_batch(db, chroma_db, new_emails[start:start + batch_size])
+            except Exception:
+                db.rollback()
+                raise
+
+    logger.info(f"Stored {processed} new emails")
+    return {"status": "success", "processed": processed}
 
-        # Query for old emails
-        old_emails = db.query(Email).filter(Email.timestamp < cutoff_date).all()
 
-        for email in old_emails:
-            # Remove from the database
-            db.delete(email)
+def iter_expired_email_ids(db, cutoff_date: datetime, batch_size: int) -> Iterator[List[int]]:
+    """Yield ids of emails older than cutoff_date in keyset-paged batches."""
+    last_id = 0
+    while True:
+        ids = db.execute(
+            select(Email.id)
+            .where(Email.timestamp < cutoff_date, Email.id > last_id)
+            .order_by(Email.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
 
-            # Remove from the vector database
-            chroma_db.delete_documents(
-                collection_name="emails",
-                filter={"id": str(email.id)}
+
+@shared_task
+def clean_up_old_emails(retention_days: int = None, batch_size: int = None):
+    chroma_db = ChromaDBManager()
+    retention_days = retention_days or settings.email_retention_days
+    batch_size = batch_size or settings.email_retention_batch_size
+    cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = 0
+
+    with db_manager.SessionLocal() as db:
+        for ids in iter_expired_email_ids(db, cutoff_date, batch_size):
+            # Vector store first: a failure leaves the rows in place, so the next run retries both
+            chroma_db.delete_documents_by_ids("emails", [str(email_id) for email_id in ids])
+            db.execute(
+                delete(Email)
+                .where(Email.id.in_(ids))
+                .execution_options(synchronize_session=False)
             )
+            db.commit()
+            deleted += len(ids)
 
-        db.commit()
+    logger.info(f"Deleted {deleted} emails older than {cutoff_date.isoformat()}")
+    return {"status": "success", "deleted": deleted}
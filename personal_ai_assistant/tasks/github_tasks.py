@@ -0,0 +1,41 @@
+from personal_ai_assistant.celery_app import app
+from personal_ai_assistant.database.db_manager import db_manager
+from personal_ai_assistant.github.activity import (
+    activity_from_webhook, index_pending_activities, poll_activities, record_activities
+)
+from personal_ai_assistant.github.github_client import GitHubClient
+from personal_ai_assistant.vector_db.chroma_db import ChromaDBManager
+from personal_ai_assistant.config import settings
+from typing import Any, Dict
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+def process_github_webhook(self, delivery_id: str, event: str, payload: Dict[str, Any]):
+    """Store one webhook delivery; redeliveries of the same delivery id are dropped."""
+    with db_manager.SessionLocal() as db:
+        recorded = record_activities(db, [activity_from_webhook(delivery_id, event, payload)])
+    if recorded:
+        # Deliveries arriving before this runs are indexed together
+        index_github_activities.apply_async(countdown=settings.github_index_delay)
+    return {"status": "success", "duplicate": not recorded}
+
+
+@app.task
+def index_github_activities():
+    with db_manager.SessionLocal() as db:
+        indexed = index_pending_activities(db, ChromaDBManager())
+    logger.info(f"Indexed {indexed} GitHub activities")
+    return {"status": "success", "indexed": indexed}
+
+
+@app.task
+def reconcile_github_activity(force: bool = False):
+    """Poll for activity that webhooks may have missed; a no-op while deliveries keep arriving."""
+    github_client = GitHubClient(settings.github_token.get_secret_value())
+    with db_manager.SessionLocal() as db:
+        recorded = asyncio.run(poll_activities(db, github_client, ChromaDBManager(), force=force))
+    return {"status": "success", "recorded": recorded}
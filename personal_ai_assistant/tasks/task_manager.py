@@ -1,16 +1,20 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import base64
 from personal_ai_assistant.calendar.caldav_client import CalDAVClient
 from personal_ai_assistant.email.imap_client import EmailClient
 from personal_ai_assistant.llm.text_processor import TextProcessor
 from personal_ai_assistant.web.scraper import WebScraper
 from personal_ai_assistant.github.github_client import GitHubClient
+from personal_ai_assistant.github.scheduler import BACKGROUND, github_priority
 from personal_ai_assistant.models.task import Task
-from sqlalchemy.orm import Session
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import load_only
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class TaskManager:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
     async def create_task(self, title: str, description: str) -> Task:
@@ -20,26 +24,46 @@ class TaskManager:
         await self.db.refresh(new_task)
         return new_task
 
-    async def get_all_tasks(self) -> List[Task]:
-        return await self.db.query(Task).all()
+    async def get_all_tasks(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        completed: Optional[bool] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Task]:
+        query = select(Task).order_by(Task.created_at, Task.id).limit(limit)
+        if fields:
+            unknown = set(fields) - set(Task.FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown task fields: {', '.join(sorted(unknown))}")
+            # created_at and id are always loaded because the next cursor is built from them
+            columns = {"id", "created_at", *fields}
+            query = query.options(load_only(*[getattr(Task, column) for column in columns]))
+        if completed is not None:
+            query = query.where(Task.completed == completed)
+        if cursor:
+            created_at, task_id = decode_task_cursor(cursor)
+            query = query.where(_after_cursor(created_at, task_id, self.db.bind.dialect.name))
+        result = await self.db.execute(query)
+        return result.scalars().all()
 
     async def get_task(self, task_id: int) -> Task:
-        return self.db.query(Task).filter(Task.id == task_id).first()
+        return await self.db.get(Task, task_id)
 
     async def update_task(self, task_id: int, title: str, description: str) -> Task:
         task = await self.get_task(task_id)
         if task:
             task.title = title
             task.description = description
-            self.db.commit()
-            self.db.refresh(task)
+            await self.db.commit()
+            await self.db.refresh(task)
         return task
 
     async def delete_task(self, task_id: int) -> bool:
         task = await self.get_task(task_id)
         if task:
-            self.db.delete(task)
-            self.db.commit()
+            await self.db.delete(task)
+            await self.db.commit()
             return True
         return False
 
@@ -48,11 +72,36 @@ class TaskManager:
         if task:
             task.completed = True
             task.completed_at = datetime.utcnow()
-            self.db.commit()
-            self.db.refresh(task)
+            await self.db.commit()
+            await self.db.refresh(task)
         return task
 
 
+def _after_cursor(created_at: Optional[datetime], task_id: int, dialect: str):
+    """Rows after the cursor in (created_at, id) order, including rows whose created_at is NULL."""
+    # ORDER BY puts NULLs last on PostgreSQL and Oracle and first elsewhere
+    nulls_first = dialect not in ("postgresql", "oracle")
+    if created_at is None:
+        after = and_(Task.created_at.is_(None), Task.id > task_id)
+        return or_(after, Task.created_at.isnot(None)) if nulls_first else after
+    after = or_(Task.created_at > created_at, and_(Task.created_at == created_at, Task.id > task_id))
+    return after if nulls_first else or_(after, Task.created_at.is_(None))
+
+
+def encode_task_cursor(task: Task) -> str:
+    created_at = task.created_at.isoformat() if task.created_at is not None else ""
+    raw = f"{created_at}|{task.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_task_cursor(cursor: str):
+    try:
+        created_at, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(created_at) if created_at else None), int(task_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid task cursor")
+
+
 class ScheduledTask(Task):
     def __init__(self, title: str, description: str, start_time: datetime, end_time: Optional[datetime] = None):
         super().__init__(title, description)
@@ -161,11 +210,12 @@ class GitHubPRReviewTask(Task):
         self.github_client = github_client
 
     async def execute(self) -> Dict[str, Any]:
-        review_result = await self.github_client.review_pr(self.repo_name, self.pr_number)
-        action_logs = await self.github_client.parse_action_logs(self.repo_name, self.pr_number)
-        suggested_fixes = await self.github_client.suggest_fixes(self.repo_name, self.pr_number)
-        auto_update_result = await self.github_client.auto_update_pr(self.repo_name, self.pr_number)
-        auto_respond_result = await self.github_client.auto_respond_to_pr_comments(self.repo_name, self.pr_number)
+        with github_priority(BACKGROUND):
+            review_result = await self.github_client.review_pr(self.repo_name, self.pr_number)
+            action_logs = await self.github_client.parse_action_logs(self.repo_name, self.pr_number)
+            suggested_fixes = await self.github_client.suggest_fixes(self.repo_name, self.pr_number)
+            auto_update_result = await self.github_client.auto_update_pr(self.repo_name, self.pr_number)
+            auto_respond_result = await self.github_client.auto_respond_to_pr_comments(self.repo_name, self.pr_number)
         return {
             "status": "success",
             "message": f"Completed review and automated actions for PR #{self.pr_number} in {self.repo_name}",
@@ -0,0 +1,12 @@
+"""Local stand-ins for the external services, for repeatable load and throughput tests."""
+from .base import Latency
+from .caldav_server import CalDAVServer, CalendarStore
+from .github_server import GitHubServer, GitHubStore
+from .imap_server import IMAPServer, Mailbox
+from .services import FakeServices
+from .smtp_server import SMTPServer
+
+__all__ = [
+    'Latency', 'CalDAVServer', 'CalendarStore', 'GitHubServer', 'GitHubStore',
+    'IMAPServer', 'Mailbox', 'FakeServices', 'SMTPServer',
+]
@@ -0,0 +1,60 @@
+"""Run the local stand-in servers until interrupted.
+
+    python -m personal_ai_assistant.testing --emails 5000 --latency 0.02 > .env.fake
+
+Prints the environment variables that point the app at them.
+"""
+import argparse
+import asyncio
+from personal_ai_assistant.testing.base import Latency
+from personal_ai_assistant.testing.services import FakeServices
+
+
+async def serve(args):
+    services = FakeServices(
+        emails=args.emails,
+        events=args.events,
+        calendars=args.calendars,
+        repositories=args.repositories,
+        issues_per_repository=args.issues,
+        pulls_per_repository=args.pulls,
+        owner=args.owner,
+        latency=Latency(args.latency, args.jitter, seed=args.seed),
+        host=args.host,
+        ports={"imap": args.imap_port, "smtp": args.smtp_port, "caldav": args.caldav_port, "github": args.github_port},
+        github_rate_limit=args.github_rate_limit,
+        seed=args.seed,
+    )
+    async with services:
+        for key, value in services.settings_overrides().items():
+            print(f"{key}={value}", flush=True)
+        await asyncio.Event().wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--imap-port", type=int, default=1143)
+    parser.add_argument("--smtp-port", type=int, default=1025)
+    parser.add_argument("--caldav-port", type=int, default=5232)
+    parser.add_argument("--github-port", type=int, default=8089)
+    parser.add_argument("--emails", type=int, default=100)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--calendars", nargs="+", default=["personal", "work"])
+    parser.add_argument("--repositories", type=int, default=5)
+    parser.add_argument("--issues", type=int, default=50, help="Issues per repository")
+    parser.add_argument("--pulls", type=int, default=20, help="Pull requests per repository")
+    parser.add_argument("--owner", default="octocat")
+    parser.add_argument("--github-rate-limit", type=int, default=5000, help="Requests per hour per token")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency varies uniformly by +/- this much")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import asyncio
+import random
+from typing import Optional
+from aiohttp import web
+
+
+class Latency:
+    """Per-request delay injected by the stand-in servers: ``mean`` seconds +/- ``jitter``."""
+
+    def __init__(self, mean: float = 0.0, jitter: float = 0.0, seed: Optional[int] = None):
+        self.mean = mean
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+
+    def delay(self) -> float:
+        if self.jitter:
+            return max(0.0, self._rng.uniform(self.mean - self.jitter, self.mean + self.jitter))
+        return self.mean
+
+    async def wait(self):
+        delay = self.delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class StandInServer:
+    """Base for the local servers: bind on ``port`` (0 picks a free one), async start/stop."""
+
+    scheme = "tcp"
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: Optional[Latency] = None):
+        self.host = host
+        self.port = port
+        self.latency = latency or Latency()
+
+    @property
+    def url(self) -> str:
+        return f"{self.scheme}://{self.host}:{self.port}"
+
+    async def start(self):
+        raise NotImplementedError
+
+    async def stop(self):
+        raise NotImplementedError
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+class StreamServer(StandInServer):
+    """A line-oriented protocol server built on asyncio streams."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._server = None
+        self._connections = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            await self.handle(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled by stop(); end the connection quietly
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        raise NotImplementedError
+
+
+class HTTPServer(StandInServer):
+    """An aiohttp application server."""
+
+    scheme = "http"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._runner = None
+
+    def make_app(self):
+        raise NotImplementedError
+
+    async def start(self):
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
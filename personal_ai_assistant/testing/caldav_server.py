@@ -0,0 +1,435 @@
+"""A small CalDAV/WebDAV server over in-memory calendars.
+
+Covers the discovery and data paths the caldav library walks: PROPFIND for
+the principal, calendar home and calendars (with getctag and sync-token),
+REPORT calendar-query (VEVENT time-range and UID text-match),
+calendar-multiget and sync-collection, and GET/PUT/DELETE of .ics objects
+with ETag preconditions. Recurring events match any time range after their
+first occurrence; there is no expansion and no timezone handling (floating
+and TZID times are read as UTC).
+"""
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+from aiohttp import BasicAuth, web
+from personal_ai_assistant.testing.base import HTTPServer
+
+DAV = "DAV:"
+CALDAV = "urn:ietf:params:xml:ns:caldav"
+CALSERVER = "http://calendarserver.org/ns/"
+ET.register_namespace("d", DAV)
+ET.register_namespace("c", CALDAV)
+ET.register_namespace("cs", CALSERVER)
+
+PRINCIPAL_PATH = "/principal/"
+HOME_PATH = "/calendars/"
+SYNC_TOKEN_PREFIX = "http://mypia.local/sync/"
+
+
+def _tag(namespace: str, name: str) -> str:
+    return f"{{{namespace}}}{name}"
+
+
+class CalendarObject:
+    __slots__ = ("name", "data", "etag", "revision")
+
+    def __init__(self, name: str, data: str, revision: int):
+        self.name = name
+        self.data = data
+        self.etag = '"' + hashlib.md5(data.encode()).hexdigest() + '"'
+        self.revision = revision
+
+
+class Calendar:
+    """One calendar collection; every change bumps ``revision``, which doubles as ctag and sync token."""
+
+    def __init__(self, name: str, display_name: Optional[str] = None):
+        self.name = name
+        self.display_name = display_name or name
+        self.objects: Dict[str, CalendarObject] = {}
+        self.revision = 0
+        # resource name -> revision it was deleted at
+        self.tombstones: Dict[str, int] = {}
+
+    @property
+    def ctag(self) -> str:
+        return str(self.revision)
+
+    @property
+    def sync_token(self) -> str:
+        return f"{SYNC_TOKEN_PREFIX}{self.revision}"
+
+    def put(self, name: str, data: str) -> CalendarObject:
+        self.revision += 1
+        obj = CalendarObject(name, data, self.revision)
+        self.objects[name] = obj
+        self.tombstones.pop(name, None)
+        return obj
+
+    def delete(self, name: str):
+        self.revision += 1
+        del self.objects[name]
+        self.tombstones[name] = self.revision
+
+    def changes_since(self, revision: int) -> Tuple[List[CalendarObject], List[str]]:
+        changed = [obj for obj in self.objects.values() if obj.revision > revision]
+        deleted = [name for name, at in self.tombstones.items() if at > revision]
+        return changed, deleted
+
+
+class CalendarStore:
+    def __init__(self, calendars: Optional[Dict[str, Dict[str, str]]] = None):
+        """``calendars`` maps calendar name to {uid: iCalendar text}, as made by dataset.make_events."""
+        self.calendars: Dict[str, Calendar] = {}
+        for name, events in (calendars or {}).items():
+            calendar = self.add_calendar(name)
+            for uid, data in events.items():
+                calendar.put(f"{uid}.ics", data)
+
+    def add_calendar(self, name: str, display_name: Optional[str] = None) -> Calendar:
+        calendar = self.calendars[name] = Calendar(name, display_name)
+        return calendar
+
+
+def _unfold(data: str) -> str:
+    return re.sub(r"\r?\n[ \t]", "", data)
+
+
+def _parse_ical_time(value: str) -> datetime:
+    if "T" not in value:
+        day = date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    return datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+
+
+def _event_span(data: str) -> Optional[Tuple[datetime, datetime, bool]]:
+    """(start, end, recurring) of the first VEVENT, or None when there is no VEVENT."""
+    text = _unfold(data)
+    block = re.search(r"BEGIN:VEVENT(.*?)END:VEVENT", text, re.S)
+    if not block:
+        return None
+    fields = {}
+    for line in block.group(1).splitlines():
+        key, _, value = line.partition(":")
+        fields.setdefault(key.split(";", 1)[0].upper(), value.strip())
+    if "DTSTART" not in fields:
+        return None
+    start = _parse_ical_time(fields["DTSTART"])
+    if "DTEND" in fields:
+        end = _parse_ical_time(fields["DTEND"])
+    else:
+        end = start + (timedelta(days=1) if "T" not in fields["DTSTART"] else timedelta(0))
+    return start, end, "RRULE" in fields
+
+
+def _event_uid(data: str) -> Optional[str]:
+    match = re.search(r"^UID:(.*)$", _unfold(data), re.M)
+    return match.group(1).strip() if match else None
+
+
+class CalDAVServer(HTTPServer):
+    def __init__(self, store: Optional[CalendarStore] = None, users: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store if store is not None else CalendarStore({"personal": {}})
+        # None accepts any credentials
+        self.users = users
+
+    def make_app(self):
+        @web.middleware
+        async def stand_in(request, handler):
+            await self.latency.wait()
+            if self.users is not None and not self._authorized(request):
+                return web.Response(status=401, headers={"WWW-Authenticate": 'Basic realm="stand-in"'})
+            return await handler(request)
+
+        app = web.Application(middlewares=[stand_in])
+        app.router.add_route("*", "/{path:.*}", self.dispatch)
+        return app
+
+    def _authorized(self, request) -> bool:
+        header = request.headers.get("Authorization")
+        if not header:
+            return False
+        try:
+            auth = BasicAuth.decode(header)
+        except ValueError:
+            return False
+        return self.users.get(auth.login) == auth.password
+
+    async def dispatch(self, request):
+        handler = getattr(self, f"do_{request.method.lower()}", None)
+        if handler is None:
+            return web.Response(status=405)
+        return await handler(request, *self._resolve(unquote(request.path)))
+
+    def _resolve(self, path: str) -> Tuple[Optional[Calendar], Optional[str]]:
+        """Map a path to (calendar, object name); both None for the non-calendar resources."""
+        if not path.startswith(HOME_PATH):
+            return None, None
+        parts = [p for p in path[len(HOME_PATH):].split("/") if p]
+        calendar = self.store.calendars.get(parts[0]) if parts else None
+        return calendar, (parts[1] if len(parts) > 1 else None)
+
+    # -- responses -------------------------------------------------------
+
+    @staticmethod
+    def _multistatus(responses: Iterable[ET.Element], sync_token: Optional[str] = None):
+        root = ET.Element(_tag(DAV, "multistatus"))
+        root.extend(responses)
+        if sync_token is not None:
+            ET.SubElement(root, _tag(DAV, "sync-token")).text = sync_token
+        body = ET.tostring(root, encoding="utf-8", xml_declaration=True)
+        return web.Response(status=207, body=body, content_type="application/xml", charset="utf-8")
+
+    @staticmethod
+    def _response(href: str, found: List[ET.Element], missing: Iterable[str] = ()) -> ET.Element:
+        response = ET.Element(_tag(DAV, "response"))
+        ET.SubElement(response, _tag(DAV, "href")).text = href
+        for elements, status in ((found, "200 OK"), ([ET.Element(t) for t in missing], "404 Not Found")):
+            if not elements:
+                continue
+            propstat = ET.SubElement(response, _tag(DAV, "propstat"))
+            ET.SubElement(propstat, _tag(DAV, "prop")).extend(elements)
+            ET.SubElement(propstat, _tag(DAV, "status")).text = f"HTTP/1.1 {status}"
+        return response
+
+    @staticmethod
+    def _href_element(name: str, href: str) -> ET.Element:
+        element = ET.Element(name)
+        ET.SubElement(element, _tag(DAV, "href")).text = href
+        return element
+
+    def _properties(self, path: str, calendar: Optional[Calendar], obj: Optional[CalendarObject]) -> Dict[str, object]:
+        """The live properties of a resource: tag -> text, or a builder returning an element."""
+        def resourcetype(*kinds):
+            def build():
+                element = ET.Element(_tag(DAV, "resourcetype"))
+                for namespace, kind in kinds:
+                    ET.SubElement(element, _tag(namespace, kind))
+                return element
+            return build
+
+        principal = {
+            _tag(DAV, "current-user-principal"): lambda: self._href_element(
+                _tag(DAV, "current-user-principal"), PRINCIPAL_PATH),
+            _tag(CALDAV, "calendar-home-set"): lambda: self._href_element(
+                _tag(CALDAV, "calendar-home-set"), HOME_PATH),
+            _tag(DAV, "principal-URL"): lambda: self._href_element(_tag(DAV, "principal-URL"), PRINCIPAL_PATH),
+        }
+        if obj is not None:
+            return {
+                _tag(DAV, "resourcetype"): resourcetype(),
+                _tag(DAV, "getetag"): obj.etag,
+                _tag(DAV, "getcontenttype"): "text/calendar; charset=utf-8; component=VEVENT",
+                _tag(DAV, "getcontentlength"): str(len(obj.data.encode())),
+                _tag(CALDAV, "calendar-data"): obj.data,
+            }
+        if calendar is not None:
+            def components():
+                element = ET.Element(_tag(CALDAV, "supported-calendar-component-set"))
+                ET.SubElement(element, _tag(CALDAV, "comp"), name="VEVENT")
+                return element
+            return {
+                **principal,
+                _tag(DAV, "resourcetype"): resourcetype((DAV, "collection"), (CALDAV, "calendar")),
+                _tag(DAV, "displayname"): calendar.display_name,
+                _tag(CALSERVER, "getctag"): calendar.ctag,
+                _tag(DAV, "sync-token"): calendar.sync_token,
+                _tag(CALDAV, "supported-calendar-component-set"): components,
+            }
+        kinds = [(DAV, "collection")]
+        if path == PRINCIPAL_PATH:
+            kinds.append((DAV, "principal"))
+        return {**principal, _tag(DAV, "resourcetype"): resourcetype(*kinds), _tag(DAV, "displayname"): "stand-in"}
+
+    def _propstat(self, href: str, properties: Dict[str, object], requested: Optional[List[str]]) -> ET.Element:
+        found, missing = [], []
+        for name in requested if requested is not None else properties:
+            value = properties.get(name)
+            if value is None:
+                missing.append(name)
+            elif callable(value):
+                found.append(value())
+            else:
+                element = ET.Element(name)
+                element.text = value
+                found.append(element)
+        return self._response(href, found, missing)
+
+    @staticmethod
+    def _requested_properties(root: Optional[ET.Element]) -> Optional[List[str]]:
+        """Tags under <prop>, or None for allprop/empty bodies."""
+        if root is None:
+            return None
+        prop = root.find(_tag(DAV, "prop"))
+        if prop is None:
+            return None
+        return [child.tag for child in prop]
+
+    @staticmethod
+    async def _body(request) -> Optional[ET.Element]:
+        body = await request.read()
+        return ET.fromstring(body) if body.strip() else None
+
+    # -- methods ---------------------------------------------------------
+
+    async def do_options(self, request, calendar, name):
+        return web.Response(headers={
+            "DAV": "1, 2, 3, calendar-access",
+            "Allow": "OPTIONS, GET, PUT, DELETE, PROPFIND, REPORT, MKCALENDAR",
+        })
+
+    async def do_propfind(self, request, calendar, name):
+        path = request.path
+        if path.startswith(HOME_PATH) and path.rstrip("/") != HOME_PATH.rstrip("/") and calendar is None:
+            return web.Response(status=404)
+        obj = calendar.objects.get(name) if calendar is not None and name else None
+        if name and obj is None:
+            return web.Response(status=404)
+        requested = self._requested_properties(await self._body(request))
+        responses = [self._propstat(path, self._properties(path, calendar, obj), requested)]
+        if request.headers.get("Depth", "0") != "0":
+            if calendar is None and path.rstrip("/") == HOME_PATH.rstrip("/"):
+                for child in self.store.calendars.values():
+                    href = f"{HOME_PATH}{child.name}/"
+                    responses.append(self._propstat(href, self._properties(href, child, None), requested))
+            elif calendar is not None and obj is None:
+                for child in calendar.objects.values():
+                    href = f"{HOME_PATH}{calendar.name}/{child.name}"
+                    responses.append(self._propstat(href, self._properties(href, calendar, child), requested))
+        return self._multistatus(responses)
+
+    async def do_report(self, request, calendar, name):
+        if calendar is None:
+            return web.Response(status=404)
+        root = await self._body(request)
+        if root is None:
+            return web.Response(status=400)
+        requested = self._requested_properties(root)
+        if requested is None:
+            requested = [_tag(DAV, "getetag"), _tag(CALDAV, "calendar-data")]
+
+        def propstat(obj):
+            href = f"{HOME_PATH}{calendar.name}/{obj.name}"
+            return self._propstat(href, self._properties(href, calendar, obj), requested)
+
+        if root.tag == _tag(CALDAV, "calendar-multiget"):
+            responses = []
+            for href in root.iter(_tag(DAV, "href")):
+                obj = calendar.objects.get(unquote(href.text).rstrip("/").rsplit("/", 1)[-1])
+                if obj is None:
+                    missing = ET.Element(_tag(DAV, "response"))
+                    ET.SubElement(missing, _tag(DAV, "href")).text = href.text
+                    ET.SubElement(missing, _tag(DAV, "status")).text = "HTTP/1.1 404 Not Found"
+                    responses.append(missing)
+                else:
+                    responses.append(propstat(obj))
+            return self._multistatus(responses)
+
+        if root.tag == _tag(CALDAV, "calendar-query"):
+            matches = self._query_filter(root.find(_tag(CALDAV, "filter")))
+            return self._multistatus(propstat(obj) for obj in calendar.objects.values() if matches(obj))
+
+        if root.tag == _tag(DAV, "sync-collection"):
+            token = (root.findtext(_tag(DAV, "sync-token")) or "").strip()
+            if not token:
+                changed, deleted = list(calendar.objects.values()), []
+            else:
+                revision = token[len(SYNC_TOKEN_PREFIX):] if token.startswith(SYNC_TOKEN_PREFIX) else ""
+                if not revision.isdigit() or int(revision) > calendar.revision:
+                    error = ET.Element(_tag(DAV, "error"))
+                    ET.SubElement(error, _tag(DAV, "valid-sync-token"))
+                    return web.Response(status=403, body=ET.tostring(error), content_type="application/xml")
+                changed, deleted = calendar.changes_since(int(revision))
+            responses = [propstat(obj) for obj in changed]
+            for gone in deleted:
+                response = ET.Element(_tag(DAV, "response"))
+                ET.SubElement(response, _tag(DAV, "href")).text = f"{HOME_PATH}{calendar.name}/{gone}"
+                ET.SubElement(response, _tag(DAV, "status")).text = "HTTP/1.1 404 Not Found"
+                responses.append(response)
+            return self._multistatus(responses, sync_token=calendar.sync_token)
+
+        return web.Response(status=501)
+
+    @staticmethod
+    def _query_filter(filter_element: Optional[ET.Element]):
+        """Build a predicate from a calendar-query filter (VEVENT time-range and UID text-match)."""
+        if filter_element is None:
+            return lambda obj: True
+        time_range = next(filter_element.iter(_tag(CALDAV, "time-range")), None)
+        bounds = time_range.attrib if time_range is not None else {}
+        start = _parse_ical_time(bounds["start"]) if bounds.get("start") else None
+        end = _parse_ical_time(bounds["end"]) if bounds.get("end") else None
+        uid = None
+        for prop_filter in filter_element.iter(_tag(CALDAV, "prop-filter")):
+            if prop_filter.get("name", "").upper() == "UID":
+                uid = (prop_filter.findtext(_tag(CALDAV, "text-match")) or "").strip()
+        wants_events = any(
+            c.get("name", "").upper() == "VEVENT" for c in filter_element.iter(_tag(CALDAV, "comp-filter"))
+        )
+
+        def matches(obj: CalendarObject) -> bool:
+            if uid is not None and _event_uid(obj.data) != uid:
+                return False
+            span = _event_span(obj.data)
+            if span is None:
+                return not wants_events
+            event_start, event_end, recurring = span
+            if end is not None and event_start >= end:
+                return False
+            if start is not None and not recurring:
+                # Zero-length events match when they fall inside the range, others when they overlap it
+                if event_end > event_start:
+                    return event_end > start
+                return event_start >= start
+            return True
+
+        return matches
+
+    async def do_get(self, request, calendar, name):
+        obj = calendar.objects.get(name) if calendar is not None and name else None
+        if obj is None:
+            return web.Response(status=404)
+        return web.Response(text=obj.data, content_type="text/calendar", charset="utf-8",
+                            headers={"ETag": obj.etag})
+
+    async def do_put(self, request, calendar, name):
+        if calendar is None or not name:
+            return web.Response(status=409)
+        existing = calendar.objects.get(name)
+        if request.headers.get("If-None-Match") == "*" and existing is not None:
+            return web.Response(status=412)
+        if_match = request.headers.get("If-Match")
+        if if_match and (existing is None or if_match not in ("*", existing.etag)):
+            return web.Response(status=412)
+        obj = calendar.put(name, await request.text())
+        return web.Response(status=204 if existing else 201, headers={"ETag": obj.etag})
+
+    async def do_delete(self, request, calendar, name):
+        if calendar is None:
+            return web.Response(status=404)
+        if not name:
+            del self.store.calendars[calendar.name]
+            return web.Response(status=204)
+        existing = calendar.objects.get(name)
+        if existing is None:
+            return web.Response(status=404)
+        if_match = request.headers.get("If-Match")
+        if if_match and if_match not in ("*", existing.etag):
+            return web.Response(status=412)
+        calendar.delete(name)
+        return web.Response(status=204)
+
+    async def do_mkcalendar(self, request, calendar, name):
+        parts = [p for p in unquote(request.path)[len(HOME_PATH):].split("/") if p]
+        if not request.path.startswith(HOME_PATH) or len(parts) != 1:
+            return web.Response(status=403)
+        if calendar is not None:
+            return web.Response(status=405)
+        root = await self._body(request)
+        display_name = root.findtext(f".//{_tag(DAV, 'displayname')}") if root is not None else None
+        self.store.add_calendar(parts[0], display_name)
+        return web.Response(status=201)
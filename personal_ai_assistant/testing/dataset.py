@@ -0,0 +1,152 @@
+"""Deterministic fixture data for the local stand-in servers and benchmarks.
+
+Every generator takes a seed so two runs (or two commits) see identical input.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from email.mime.text import MIMEText
+from email.utils import format_datetime
+from typing import Any, Dict, List
+
+WORDS = (
+    "meeting budget invoice project deadline review release customer report schedule agenda "
+    "update design incident follow-up contract proposal roadmap travel launch feedback"
+).split()
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_raw_emails(count: int, body_words: int = 200, seed: int = 42) -> List[bytes]:
+    """RFC822 messages one minute apart, starting at EPOCH."""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        msg = MIMEText(make_text(rng, body_words))
+        msg["Subject"] = make_text(rng, 6)
+        msg["From"] = f"sender{i % 17}@example.com"
+        msg["To"] = "me@example.com"
+        msg["Date"] = format_datetime(EPOCH + timedelta(minutes=i))
+        messages.append(msg.as_bytes())
+    return messages
+
+
+def format_ical_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def make_ical_event(uid: str, summary: str, start: datetime, end: datetime,
+                    description: str = "", location: str = "", rrule: str = None) -> str:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//mypia//stand-in//EN",
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{format_ical_datetime(EPOCH)}",
+        f"DTSTART:{format_ical_datetime(start)}",
+        f"DTEND:{format_ical_datetime(end)}",
+        f"SUMMARY:{summary}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{description}")
+    if location:
+        lines.append(f"LOCATION:{location}")
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    lines += ["END:VEVENT", "END:VCALENDAR"]
+    return "\r\n".join(lines) + "\r\n"
+
+
+def make_events(count: int, calendars: List[str], seed: int = 42,
+                days: int = 90, recurring_ratio: float = 0.05) -> Dict[str, Dict[str, str]]:
+    """Return {calendar name: {uid: iCalendar text}} spread over ``days`` days from EPOCH."""
+    rng = random.Random(seed)
+    result = {name: {} for name in calendars}
+    for i in range(count):
+        start = EPOCH + timedelta(days=rng.randrange(days), hours=rng.randrange(8, 18),
+                                  minutes=rng.choice((0, 15, 30, 45)))
+        end = start + timedelta(minutes=rng.choice((15, 30, 45, 60, 90)))
+        uid = f"event-{i}@mypia.local"
+        rrule = "FREQ=WEEKLY;COUNT=10" if rng.random() < recurring_ratio else None
+        calendar = calendars[i % len(calendars)]
+        result[calendar][uid] = make_ical_event(
+            uid, make_text(rng, 4), start, end,
+            description=make_text(rng, 20), location=rng.choice(("Room A", "Room B", "Online", "")),
+            rrule=rrule,
+        )
+    return result
+
+
+def make_repositories(owner: str, repos: int, issues_per_repo: int, pulls_per_repo: int,
+                      seed: int = 42) -> Dict[str, Dict[str, Any]]:
+    """Return {full name: {"repo": ..., "issues": [...], "pulls": [...]}} as plain dicts."""
+    rng = random.Random(seed)
+    result = {}
+    for r in range(repos):
+        name = f"repo-{r}"
+        created = EPOCH + timedelta(days=r)
+        issues = []
+        for n in range(1, issues_per_repo + 1):
+            opened = created + timedelta(hours=n)
+            issues.append({
+                "number": n,
+                "title": make_text(rng, 6),
+                "body": make_text(rng, 40),
+                "state": "closed" if rng.random() < 0.4 else "open",
+                "created_at": opened,
+                "updated_at": opened + timedelta(hours=rng.randrange(1, 240)),
+                "user": f"contributor{rng.randrange(10)}",
+            })
+        pulls = []
+        for n in range(issues_per_repo + 1, issues_per_repo + pulls_per_repo + 1):
+            opened = created + timedelta(hours=n)
+            pulls.append({
+                "number": n,
+                "title": make_text(rng, 6),
+                "body": make_text(rng, 40),
+                "state": "closed" if rng.random() < 0.5 else "open",
+                "created_at": opened,
+                "updated_at": opened + timedelta(hours=rng.randrange(1, 240)),
+                "user": f"contributor{rng.randrange(10)}",
+            })
+        result[f"{owner}/{name}"] = {
+            "repo": {
+                "name": name,
+                "description": make_text(rng, 8),
+                "stargazers_count": rng.randrange(500),
+                "forks_count": rng.randrange(50),
+                "created_at": created,
+                "updated_at": created + timedelta(days=rng.randrange(60)),
+            },
+            "issues": issues,
+            "pulls": pulls,
+        }
+    return result
+
+
+def make_pdf(text: str) -> bytes:
+    """A one-page PDF with ``text`` on a single line, enough for PdfReader.extract_text()."""
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    stream = f"BT /F1 10 Tf 36 750 Td ({escaped}) Tj ET".encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
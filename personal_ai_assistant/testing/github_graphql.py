@@ -0,0 +1,180 @@
+"""Just enough GraphQL for the GitHub stand-in.
+
+Parses queries with variables, aliases, arguments and nested selections
+(no fragments or directives) and resolves them against objects whose fields
+are plain values or callables taking the field's arguments.
+"""
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+TOKEN = re.compile(r'\s*(?:(\.\.\.)|([{}()\[\]:!=$@,])|("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?)|([_A-Za-z]\w*))')
+
+
+class GraphQLError(Exception):
+    pass
+
+
+class Field:
+    __slots__ = ("alias", "name", "arguments", "selections")
+
+    def __init__(self, alias: str, name: str, arguments: Dict[str, Any], selections: Optional[List["Field"]]):
+        self.alias = alias
+        self.name = name
+        self.arguments = arguments
+        self.selections = selections
+
+
+class Variable:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def tokenize(source: str) -> List[str]:
+    tokens, position = [], 0
+    source = re.sub(r"#[^\n]*", "", source).rstrip()
+    while position < len(source):
+        match = TOKEN.match(source, position)
+        if match is None:
+            raise GraphQLError(f"Unexpected character at {position}")
+        tokens.append(next(group for group in match.groups() if group is not None))
+        position = match.end()
+    return [token for token in tokens if token != ","]
+
+
+class Parser:
+    def __init__(self, source: str):
+        self.tokens = tokenize(source)
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise GraphQLError(f"Expected {expected or 'a token'}, got {token}")
+        self.position += 1
+        return token
+
+    def document(self) -> List[Field]:
+        if self.peek() == "query":
+            self.take()
+            if self.peek() not in ("(", "{"):
+                self.take()
+            if self.peek() == "(":
+                self.skip_variable_definitions()
+        elif self.peek() != "{":
+            raise GraphQLError("Only queries are supported")
+        return self.selection_set()
+
+    def skip_variable_definitions(self):
+        depth = 0
+        while True:
+            token = self.take()
+            depth += token == "("
+            depth -= token == ")"
+            if depth == 0:
+                return
+
+    def selection_set(self) -> List[Field]:
+        self.take("{")
+        fields = []
+        while self.peek() != "}":
+            if self.peek() == "...":
+                raise GraphQLError("Fragments are not supported")
+            alias = name = self.take()
+            if self.peek() == ":":
+                self.take()
+                name = self.take()
+            arguments = self.arguments() if self.peek() == "(" else {}
+            selections = self.selection_set() if self.peek() == "{" else None
+            fields.append(Field(alias, name, arguments, selections))
+        self.take("}")
+        return fields
+
+    def arguments(self) -> Dict[str, Any]:
+        self.take("(")
+        arguments = {}
+        while self.peek() != ")":
+            name = self.take()
+            self.take(":")
+            arguments[name] = self.value()
+        self.take(")")
+        return arguments
+
+    def value(self) -> Any:
+        token = self.take()
+        if token == "$":
+            return Variable(self.take())
+        if token == "[":
+            values = []
+            while self.peek() != "]":
+                values.append(self.value())
+            self.take("]")
+            return values
+        if token == "{":
+            values = {}
+            while self.peek() != "}":
+                name = self.take()
+                self.take(":")
+                values[name] = self.value()
+            self.take("}")
+            return values
+        if token.startswith('"'):
+            return json.loads(token)
+        if re.fullmatch(r"-?\d+", token):
+            return int(token)
+        if re.fullmatch(r"-?\d+\.\d+", token):
+            return float(token)
+        return {"true": True, "false": False, "null": None}.get(token, token)
+
+
+def _bind(value: Any, variables: Dict[str, Any]) -> Any:
+    if isinstance(value, Variable):
+        return variables.get(value.name)
+    if isinstance(value, list):
+        return [_bind(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: _bind(v, variables) for k, v in value.items()}
+    return value
+
+
+def resolve(obj: Dict[str, Any], fields: List[Field], variables: Dict[str, Any]) -> Dict[str, Any]:
+    result = {}
+    for field in fields:
+        if field.name not in obj:
+            raise GraphQLError(f"Cannot query field '{field.name}'")
+        value = obj[field.name]
+        if callable(value):
+            value = value(**{k: _bind(v, variables) for k, v in field.arguments.items()})
+        if field.selections is not None and value is not None:
+            if isinstance(value, list):
+                value = [resolve(item, field.selections, variables) for item in value]
+            else:
+                value = resolve(value, field.selections, variables)
+        result[field.alias] = value
+    return result
+
+
+def execute(root: Dict[str, Any], query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    try:
+        fields = Parser(query).document()
+        return {"data": resolve(root, fields, variables or {})}
+    except GraphQLError as e:
+        return {"data": None, "errors": [{"message": str(e)}]}
+
+
+def connection(items: List[Any], first: int = 30, after: Optional[str] = None,
+               node: Callable[[Any], Dict[str, Any]] = lambda item: item) -> Dict[str, Any]:
+    """A cursor connection over ``items``; cursors are offsets."""
+    start = int(after) if after else 0
+    page = items[start:start + min(first, 100)]
+    end = start + len(page)
+    return {
+        "totalCount": len(items),
+        "nodes": [node(item) for item in page],
+        "pageInfo": {"hasNextPage": end < len(items), "endCursor": str(end) if page else after},
+    }
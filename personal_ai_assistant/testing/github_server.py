@@ -0,0 +1,441 @@
+"""A subset of the GitHub REST API over in-memory repositories.
+
+Serves users, repositories, issues (including pull requests, as GitHub does)
+and pulls with ``state``/``since`` filtering and Link-header pagination, plus
+issue creation. Responses carry ETags and answer If-None-Match with 304, and
+every token gets a core rate limit that is reported in the X-RateLimit-*
+headers and /rate_limit; conditional hits do not count against it, as on
+GitHub. /graphql answers queries over users, repositories and their open
+issues and pull requests (see github_graphql) under a separate graphql
+rate limit. Workflow runs can be listed by head commit, and their logs are
+served as a zip archive behind a redirect, like GitHub's signed download
+URLs.
+"""
+import hashlib
+import io
+import itertools
+import json
+import time
+import zipfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Union
+from aiohttp import web
+from personal_ai_assistant.testing.base import HTTPServer
+from personal_ai_assistant.testing.github_graphql import connection, execute
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _head_sha(item: Dict[str, Any]) -> str:
+    return hashlib.sha1(str(item["id"]).encode()).hexdigest()
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class RateLimiter:
+    """A fixed-window request budget per token, mirroring GitHub's core limit."""
+
+    def __init__(self, limit: int = 5000, window: float = 3600.0, resource: str = "core"):
+        self.limit = limit
+        self.window = window
+        self.resource = resource
+        self._windows: Dict[str, List[float]] = {}
+
+    def _state(self, token: str) -> List[float]:
+        now = time.time()
+        state = self._windows.get(token)
+        if state is None or now >= state[0]:
+            state = self._windows[token] = [now + self.window, 0]
+        return state
+
+    def consume(self, token: str) -> bool:
+        state = self._state(token)
+        if state[1] >= self.limit:
+            return False
+        state[1] += 1
+        return True
+
+    def headers(self, token: str) -> Dict[str, str]:
+        reset, used = self._state(token)
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, self.limit - used)),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Reset": str(int(reset)),
+            "X-RateLimit-Resource": self.resource,
+        }
+
+
+class GitHubStore:
+    """Repositories keyed by full name, in the shape dataset.make_repositories returns."""
+
+    def __init__(self, repositories: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.repositories = repositories or {}
+        self._ids = itertools.count(1)
+        for data in self.repositories.values():
+            self._assign_ids(data)
+
+    def _assign_ids(self, data):
+        data["repo"].setdefault("id", next(self._ids))
+        for item in itertools.chain(data["issues"], data["pulls"]):
+            item.setdefault("id", next(self._ids))
+
+    def owners(self) -> List[str]:
+        return sorted({name.split("/", 1)[0] for name in self.repositories})
+
+    def add_workflow_run(self, full_name: str, pr_number: int, name: str, conclusion: str,
+                         logs: Dict[str, Union[str, Iterable[str]]]) -> Dict[str, Any]:
+        """Record a run on a pull request's head; ``logs`` maps archive paths to text or lines."""
+        data = self.repositories[full_name]
+        pull = next(p for p in data["pulls"] if p["number"] == pr_number)
+        run = {"id": next(self._ids), "name": name, "head_sha": _head_sha(pull), "status": "completed",
+               "conclusion": conclusion, "logs": logs}
+        data.setdefault("runs", []).append(run)
+        return run
+
+    def create_issue(self, full_name: str, title: str, body: str, user: str) -> Dict[str, Any]:
+        data = self.repositories[full_name]
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        number = max((i["number"] for i in itertools.chain(data["issues"], data["pulls"])), default=0) + 1
+        issue = {"id": next(self._ids), "number": number, "title": title, "body": body, "state": "open",
+                 "created_at": now, "updated_at": now, "user": user}
+        data["issues"].append(issue)
+        return issue
+
+
+class GitHubServer(HTTPServer):
+    def __init__(self, store: Optional[GitHubStore] = None, rate_limit: int = 5000,
+                 rate_limit_window: float = 3600.0, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store if store is not None else GitHubStore()
+        self.rate_limiter = RateLimiter(rate_limit, rate_limit_window)
+        self.graphql_rate_limiter = RateLimiter(rate_limit, rate_limit_window, resource="graphql")
+        self.request_count = 0
+
+    def make_app(self):
+        @web.middleware
+        async def stand_in(request, handler):
+            await self.latency.wait()
+            self.request_count += 1
+            token = request.headers.get("Authorization", "anonymous").split(" ")[-1]
+            request["token"] = token
+            conditional = "If-None-Match" in request.headers
+            limiter = self.graphql_rate_limiter if request.path == "/graphql" else self.rate_limiter
+            metered = request.path != "/rate_limit" and not request.path.startswith("/_downloads/")
+            if not conditional and metered and not limiter.consume(token):
+                response = web.json_response(
+                    {"message": "API rate limit exceeded", "documentation_url": "https://docs.github.com/rest"},
+                    status=403,
+                )
+            else:
+                response = await handler(request)
+            response.headers.update(limiter.headers(token))
+            return response
+
+        app = web.Application(middlewares=[stand_in])
+        app.router.add_get("/rate_limit", self.rate_limit)
+        app.router.add_get("/users/{owner}", self.get_user)
+        app.router.add_get("/users/{owner}/repos", self.list_user_repos)
+        app.router.add_get("/repos/{owner}/{repo}", self.get_repo)
+        app.router.add_get("/repos/{owner}/{repo}/issues", self.list_issues)
+        app.router.add_post("/repos/{owner}/{repo}/issues", self.create_issue)
+        app.router.add_get("/repos/{owner}/{repo}/issues/{number}", self.get_issue)
+        app.router.add_get("/repos/{owner}/{repo}/pulls", self.list_pulls)
+        app.router.add_get("/repos/{owner}/{repo}/pulls/{number}", self.get_pull)
+        app.router.add_get("/repos/{owner}/{repo}/actions/runs", self.list_workflow_runs)
+        app.router.add_get("/repos/{owner}/{repo}/actions/runs/{run_id}/logs", self.download_run_logs)
+        app.router.add_get("/_downloads/runs/{run_id}.zip", self.run_logs_archive)
+        app.router.add_post("/graphql", self.graphql)
+        return app
+
+    # -- serialisation ---------------------------------------------------
+
+    def _api(self, path: str) -> str:
+        return f"{self.url}{path}"
+
+    def _user(self, login: str) -> Dict[str, Any]:
+        return {
+            "login": login,
+            "id": int(hashlib.md5(login.encode()).hexdigest()[:8], 16),
+            "type": "User",
+            "url": self._api(f"/users/{login}"),
+            "html_url": f"https://github.com/{login}",
+            "repos_url": self._api(f"/users/{login}/repos"),
+        }
+
+    def _repo(self, full_name: str) -> Dict[str, Any]:
+        data = self.store.repositories[full_name]
+        repo = data["repo"]
+        owner = full_name.split("/", 1)[0]
+        return {
+            "id": repo["id"],
+            "name": repo["name"],
+            "full_name": full_name,
+            "owner": self._user(owner),
+            "private": False,
+            "fork": False,
+            "description": repo["description"],
+            "html_url": f"https://github.com/{full_name}",
+            "url": self._api(f"/repos/{full_name}"),
+            "created_at": _timestamp(repo["created_at"]),
+            "updated_at": _timestamp(repo["updated_at"]),
+            "pushed_at": _timestamp(repo["updated_at"]),
+            "stargazers_count": repo["stargazers_count"],
+            "watchers_count": repo["stargazers_count"],
+            "forks_count": repo["forks_count"],
+            "open_issues_count": sum(1 for i in data["issues"] + data["pulls"] if i["state"] == "open"),
+            "default_branch": "main",
+        }
+
+    def _issue(self, full_name: str, item: Dict[str, Any], pull: bool = False) -> Dict[str, Any]:
+        kind = "pull" if pull else "issues"
+        issue = {
+            "id": item["id"],
+            "number": item["number"],
+            "title": item["title"],
+            "body": item["body"],
+            "state": item["state"],
+            "user": self._user(item["user"]),
+            "labels": [],
+            "comments": 0,
+            "created_at": _timestamp(item["created_at"]),
+            "updated_at": _timestamp(item["updated_at"]),
+            "closed_at": _timestamp(item["updated_at"]) if item["state"] == "closed" else None,
+            "html_url": f"https://github.com/{full_name}/{kind}/{item['number']}",
+            "url": self._api(f"/repos/{full_name}/issues/{item['number']}"),
+            "repository_url": self._api(f"/repos/{full_name}"),
+        }
+        if pull:
+            issue["pull_request"] = {
+                "url": self._api(f"/repos/{full_name}/pulls/{item['number']}"),
+                "html_url": issue["html_url"],
+            }
+        return issue
+
+    def _pull(self, full_name: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        pull = self._issue(full_name, item, pull=True)
+        del pull["pull_request"]
+        pull.update({
+            "url": self._api(f"/repos/{full_name}/pulls/{item['number']}"),
+            "merged_at": None,
+            "head": {"ref": f"feature-{item['number']}", "sha": _head_sha(item)},
+            "base": {"ref": "main"},
+        })
+        return pull
+
+    def _node(self, full_name: str, item: Dict[str, Any], pull: bool = False) -> Dict[str, Any]:
+        return {
+            "id": str(item["id"]),
+            "number": item["number"],
+            "title": item["title"],
+            "body": item["body"],
+            "state": item["state"].upper(),
+            "createdAt": _timestamp(item["created_at"]),
+            "updatedAt": _timestamp(item["updated_at"]),
+            "url": f"https://github.com/{full_name}/{'pull' if pull else 'issues'}/{item['number']}",
+        }
+
+    def _repository_node(self, full_name: str) -> Dict[str, Any]:
+        data = self.store.repositories[full_name]
+        repo = self._repo(full_name)
+
+        def items(pull: bool):
+            def resolve(first: int = 30, after: Optional[str] = None, states: Optional[List[str]] = None,
+                        orderBy: Optional[Dict[str, str]] = None):
+                selected = [i for i in data["pulls" if pull else "issues"]
+                            if states is None or i["state"].upper() in states]
+                if orderBy is not None:
+                    key = "updated_at" if orderBy.get("field") == "UPDATED_AT" else "created_at"
+                    selected.sort(key=lambda i: i[key], reverse=orderBy.get("direction") == "DESC")
+                return connection(selected, first, after, lambda i: self._node(full_name, i, pull))
+            return resolve
+
+        return {
+            "id": str(repo["id"]),
+            "name": repo["name"],
+            "nameWithOwner": full_name,
+            "description": repo["description"],
+            "url": repo["html_url"],
+            "stargazerCount": repo["stargazers_count"],
+            "forkCount": repo["forks_count"],
+            "issues": items(pull=False),
+            "pullRequests": items(pull=True),
+        }
+
+    def _graphql_root(self, token: str) -> Dict[str, Any]:
+        def user(login: str):
+            if login not in self.store.owners():
+                return None
+            names = sorted(name for name in self.store.repositories if name.split("/", 1)[0] == login)
+            return {
+                "login": login,
+                "repositories": lambda first=30, after=None, **_: connection(
+                    names, first, after, self._repository_node),
+            }
+
+        def repository(owner: str, name: str):
+            full_name = f"{owner}/{name}"
+            return self._repository_node(full_name) if full_name in self.store.repositories else None
+
+        headers = self.graphql_rate_limiter.headers(token)
+        reset_at = _timestamp(datetime.fromtimestamp(int(headers["X-RateLimit-Reset"]), timezone.utc))
+        rate_limit = {"limit": int(headers["X-RateLimit-Limit"]), "remaining": int(headers["X-RateLimit-Remaining"]),
+                      "cost": 1, "resetAt": reset_at}
+        return {"user": user, "repository": repository, "rateLimit": rate_limit}
+
+    # -- response helpers --------------------------------------------------
+
+    @staticmethod
+    def _json(request, payload, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode()
+        etag = 'W/"' + hashlib.md5(body).hexdigest() + '"'
+        headers = {"ETag": etag, **(headers or {})}
+        if status == 200 and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(status=status, body=body, content_type="application/json", headers=headers)
+
+    def _paginate(self, request, items: List[Any]):
+        page = max(1, int(request.query.get("page", 1)))
+        per_page = min(100, max(1, int(request.query.get("per_page", 30))))
+        last = max(1, -(-len(items) // per_page))
+        links = []
+        for rel, number in (("prev", page - 1), ("next", page + 1), ("first", 1), ("last", last)):
+            if 1 <= number <= last and number != page:
+                url = request.url.update_query(page=number, per_page=per_page)
+                links.append(f'<{self.url}{url.path_qs}>; rel="{rel}"')
+        headers = {"Link": ", ".join(links)} if links else None
+        return self._json(request, items[(page - 1) * per_page:page * per_page], headers=headers)
+
+    def _repository(self, request) -> str:
+        full_name = f"{request.match_info['owner']}/{request.match_info['repo']}"
+        if full_name not in self.store.repositories:
+            raise web.HTTPNotFound(text=json.dumps({"message": "Not Found"}), content_type="application/json")
+        return full_name
+
+    @staticmethod
+    def _filter(request, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        state = request.query.get("state", "open")
+        if state != "all":
+            items = [i for i in items if i["state"] == state]
+        if "since" in request.query:
+            since = _parse_timestamp(request.query["since"])
+            items = [i for i in items if i["updated_at"] >= since]
+        key = "updated_at" if request.query.get("sort") == "updated" else "created_at"
+        return sorted(items, key=lambda i: i[key], reverse=request.query.get("direction", "desc") == "desc")
+
+    # -- handlers ----------------------------------------------------------
+
+    async def rate_limit(self, request):
+        headers = self.rate_limiter.headers(request["token"])
+        core = {
+            "limit": int(headers["X-RateLimit-Limit"]),
+            "remaining": int(headers["X-RateLimit-Remaining"]),
+            "used": int(headers["X-RateLimit-Used"]),
+            "reset": int(headers["X-RateLimit-Reset"]),
+        }
+        return web.json_response({"resources": {"core": core}, "rate": core})
+
+    async def get_user(self, request):
+        owner = request.match_info["owner"]
+        if owner not in self.store.owners():
+            raise web.HTTPNotFound(text=json.dumps({"message": "Not Found"}), content_type="application/json")
+        return self._json(request, self._user(owner))
+
+    async def list_user_repos(self, request):
+        owner = request.match_info["owner"]
+        names = sorted(name for name in self.store.repositories if name.split("/", 1)[0] == owner)
+        return self._paginate(request, [self._repo(name) for name in names])
+
+    async def get_repo(self, request):
+        return self._json(request, self._repo(self._repository(request)))
+
+    async def list_issues(self, request):
+        full_name = self._repository(request)
+        data = self.store.repositories[full_name]
+        items = [(i, False) for i in data["issues"]] + [(p, True) for p in data["pulls"]]
+        kinds = {id(item): pull for item, pull in items}
+        selected = self._filter(request, [item for item, _ in items])
+        return self._paginate(request, [self._issue(full_name, i, kinds[id(i)]) for i in selected])
+
+    async def get_issue(self, request):
+        full_name = self._repository(request)
+        data = self.store.repositories[full_name]
+        number = int(request.match_info["number"])
+        for pull, items in ((False, data["issues"]), (True, data["pulls"])):
+            for item in items:
+                if item["number"] == number:
+                    return self._json(request, self._issue(full_name, item, pull))
+        raise web.HTTPNotFound(text=json.dumps({"message": "Not Found"}), content_type="application/json")
+
+    async def create_issue(self, request):
+        full_name = self._repository(request)
+        payload = await request.json()
+        if not payload.get("title"):
+            return web.json_response({"message": "Validation Failed"}, status=422)
+        login = self.store.owners()[0] if self.store.owners() else "stand-in"
+        issue = self.store.create_issue(full_name, payload["title"], payload.get("body") or "", login)
+        return self._json(request, self._issue(full_name, issue), status=201)
+
+    async def list_pulls(self, request):
+        full_name = self._repository(request)
+        selected = self._filter(request, self.store.repositories[full_name]["pulls"])
+        return self._paginate(request, [self._pull(full_name, p) for p in selected])
+
+    async def graphql(self, request):
+        payload = await request.json()
+        result = execute(self._graphql_root(request["token"]), payload.get("query", ""), payload.get("variables"))
+        return web.json_response(result)
+
+    async def get_pull(self, request):
+        full_name = self._repository(request)
+        number = int(request.match_info["number"])
+        for item in self.store.repositories[full_name]["pulls"]:
+            if item["number"] == number:
+                return self._json(request, self._pull(full_name, item))
+        raise web.HTTPNotFound(text=json.dumps({"message": "Not Found"}), content_type="application/json")
+
+    def _run(self, full_name: str, run: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": run["id"],
+            "name": run["name"],
+            "head_sha": run["head_sha"],
+            "status": run["status"],
+            "conclusion": run["conclusion"],
+            "html_url": f"https://github.com/{full_name}/actions/runs/{run['id']}",
+            "logs_url": self._api(f"/repos/{full_name}/actions/runs/{run['id']}/logs"),
+        }
+
+    def _find_run(self, run_id: int) -> Dict[str, Any]:
+        for data in self.store.repositories.values():
+            for run in data.get("runs", []):
+                if run["id"] == run_id:
+                    return run
+        raise web.HTTPNotFound(text=json.dumps({"message": "Not Found"}), content_type="application/json")
+
+    async def list_workflow_runs(self, request):
+        full_name = self._repository(request)
+        runs = self.store.repositories[full_name].get("runs", [])
+        if "head_sha" in request.query:
+            runs = [run for run in runs if run["head_sha"] == request.query["head_sha"]]
+        return self._json(request, {"total_count": len(runs), "workflow_runs": [self._run(full_name, r) for r in runs]})
+
+    async def download_run_logs(self, request):
+        self._repository(request)
+        run = self._find_run(int(request.match_info["run_id"]))
+        raise web.HTTPFound(f"{self.url}/_downloads/runs/{run['id']}.zip")
+
+    async def run_logs_archive(self, request):
+        run = self._find_run(int(request.match_info["run_id"]))
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, content in run["logs"].items():
+                with archive.open(name, "w") as entry:
+                    for line in ([content] if isinstance(content, str) else content):
+                        entry.write(line.encode())
+        return web.Response(body=buffer.getvalue(), content_type="application/zip")
@@ -0,0 +1,385 @@
+"""A small IMAP4rev1 server over a single in-memory INBOX.
+
+Implements what the assistant's clients use: LOGIN, SELECT/EXAMINE, SEARCH and
+UID SEARCH, FETCH and UID FETCH, STORE, EXPUNGE, APPEND and IDLE (new mail is
+pushed as an untagged EXISTS). Not a conformant server: one mailbox, no
+partial fetches, and only a handful of SEARCH keys.
+"""
+import asyncio
+import re
+import time
+from email.utils import formatdate
+from typing import Dict, Iterable, List, Optional, Tuple
+from personal_ai_assistant.testing.base import StreamServer
+
+CAPABILITIES = "IMAP4rev1 IDLE UIDPLUS LITERAL+"
+SYSTEM_FLAGS = r"\Answered \Flagged \Deleted \Seen \Draft"
+
+_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|(\((?:[^()]|\([^()]*\))*\))|(\S+)')
+_FETCH_ITEM = re.compile(r"BODY(?:\.PEEK)?\[[^\]]*\](?:<[\d.]+>)?|[^\s()]+", re.IGNORECASE)
+_LITERAL = re.compile(rb"\{(\d+)\+?\}\r\n$")
+
+
+class Message:
+    __slots__ = ("uid", "raw", "flags", "internal_date")
+
+    def __init__(self, uid: int, raw: bytes, flags: Iterable[str] = (), internal_date: Optional[float] = None):
+        self.uid = uid
+        self.raw = raw
+        self.flags = set(flags)
+        self.internal_date = internal_date or time.time()
+
+    def header(self) -> bytes:
+        end = self.raw.find(b"\r\n\r\n")
+        separator = 4
+        if end < 0:
+            end, separator = self.raw.find(b"\n\n"), 2
+        return self.raw if end < 0 else self.raw[:end + separator]
+
+    def text(self) -> bytes:
+        return self.raw[len(self.header()):]
+
+
+class Mailbox:
+    """The INBOX shared by the IMAP server and, for delivery, the SMTP server.
+
+    Mutate it from the event loop the servers run on; IDLE sessions are woken
+    through asyncio events.
+    """
+
+    def __init__(self, messages: Iterable[bytes] = (), uidvalidity: int = 1):
+        self.uidvalidity = uidvalidity
+        self.messages: List[Message] = []
+        self.next_uid = 1
+        self._listeners = set()
+        for raw in messages:
+            self.append(raw)
+
+    def __len__(self):
+        return len(self.messages)
+
+    def append(self, raw: bytes, flags: Iterable[str] = ()) -> int:
+        if not raw.endswith(b"\n"):
+            raw += b"\r\n"
+        message = Message(self.next_uid, raw, flags)
+        self.next_uid += 1
+        self.messages.append(message)
+        for event in self._listeners:
+            event.set()
+        return message.uid
+
+    def expunge(self) -> List[int]:
+        """Remove \\Deleted messages, returning their sequence numbers in the order EXPUNGE reports them."""
+        removed = []
+        for seq in range(len(self.messages), 0, -1):
+            if r"\Deleted" in self.messages[seq - 1].flags:
+                del self.messages[seq - 1]
+                removed.append(seq)
+        return removed
+
+    def subscribe(self) -> asyncio.Event:
+        event = asyncio.Event()
+        self._listeners.add(event)
+        return event
+
+    def unsubscribe(self, event: asyncio.Event):
+        self._listeners.discard(event)
+
+
+def parse_sequence_set(text: str, largest: int) -> List[Tuple[int, int]]:
+    """Turn "1:4,7,9:*" into inclusive (low, high) ranges; ``*`` is the largest value present."""
+    ranges = []
+    for part in text.split(","):
+        bounds = [largest if b == "*" else int(b) for b in part.split(":", 1)]
+        low, high = min(bounds), max(bounds)
+        ranges.append((low, high))
+    return ranges
+
+
+def in_ranges(value: int, ranges: List[Tuple[int, int]]) -> bool:
+    return any(low <= value <= high for low, high in ranges)
+
+
+def _next_argument(arguments, key: str) -> str:
+    value = next(arguments, None)
+    if value is None:
+        raise ValueError(f"{key} needs an argument")
+    return value
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for quoted, parenthesized, atom in _TOKEN.findall(text):
+        if parenthesized:
+            tokens.append(parenthesized)
+        elif atom:
+            tokens.append(atom)
+        else:
+            tokens.append(quoted.replace('\\"', '"').replace("\\\\", "\\"))
+    return tokens
+
+
+class IMAPServer(StreamServer):
+    scheme = "imap"
+
+    def __init__(self, mailbox: Optional[Mailbox] = None, users: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.mailbox = mailbox if mailbox is not None else Mailbox()
+        # None accepts any credentials
+        self.users = users
+
+    async def handle(self, reader, writer):
+        session = _Session(self, reader, writer)
+        await session.run()
+
+
+class _Session:
+    def __init__(self, server: IMAPServer, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.server = server
+        self.mailbox = server.mailbox
+        self.reader = reader
+        self.writer = writer
+        self.authenticated = False
+        self.selected = False
+        self.read_only = False
+
+    async def send(self, *lines):
+        for line in lines:
+            self.writer.write(line if isinstance(line, bytes) else line.encode() + b"\r\n")
+        await self.writer.drain()
+
+    async def read_command(self) -> Optional[Tuple[str, List[str], List[bytes]]]:
+        """Read one command line, pulling in any literals the client sends with it."""
+        line = await self.reader.readline()
+        if not line:
+            return None
+        text, literals = b"", []
+        while True:
+            match = _LITERAL.search(line)
+            if not match:
+                text += line.rstrip(b"\r\n")
+                break
+            text += line[:match.start()] + b"{}"
+            if b"+" not in match.group(0):
+                await self.send("+ Ready for literal data")
+            literals.append(await self.reader.readexactly(int(match.group(1))))
+            line = await self.reader.readline()
+        tag, _, rest = text.decode(errors="replace").partition(" ")
+        return tag, tokenize(rest), literals
+
+    async def run(self):
+        await self.send(f"* OK [CAPABILITY {CAPABILITIES}] stand-in IMAP ready")
+        while True:
+            command = await self.read_command()
+            if command is None:
+                return
+            tag, tokens, literals = command
+            if not tokens:
+                await self.send(f"{tag} BAD empty command")
+                continue
+            name, args = tokens[0].upper(), tokens[1:]
+            uid = False
+            if name == "UID" and args:
+                uid, name, args = True, args[0].upper(), args[1:]
+            await self.server.latency.wait()
+            handler = getattr(self, f"cmd_{name.lower()}", None)
+            if handler is None:
+                await self.send(f"{tag} BAD unknown command {name}")
+                continue
+            try:
+                keep_going = await handler(tag, args, literals, uid)
+            except (ValueError, IndexError) as e:
+                await self.send(f"{tag} BAD {name}: {e}")
+                continue
+            if keep_going is False:
+                return
+
+    def _require_selected(self):
+        if not self.selected:
+            raise ValueError("no mailbox selected")
+
+    async def cmd_capability(self, tag, args, literals, uid):
+        await self.send(f"* CAPABILITY {CAPABILITIES}", f"{tag} OK CAPABILITY completed")
+
+    async def cmd_noop(self, tag, args, literals, uid):
+        if self.selected:
+            await self.send(f"* {len(self.mailbox)} EXISTS")
+        await self.send(f"{tag} OK NOOP completed")
+
+    async def cmd_logout(self, tag, args, literals, uid):
+        await self.send("* BYE logging out", f"{tag} OK LOGOUT completed")
+        return False
+
+    async def cmd_login(self, tag, args, literals, uid):
+        values = iter(literals)
+        username, password = [next(values, b"").decode() if a == "{}" else a for a in args[:2]]
+        users = self.server.users
+        if users is not None and users.get(username) != password:
+            await self.send(f"{tag} NO [AUTHENTICATIONFAILED] invalid credentials")
+            return
+        self.authenticated = True
+        await self.send(f"{tag} OK [CAPABILITY {CAPABILITIES}] LOGIN completed")
+
+    async def cmd_select(self, tag, args, literals, uid, read_only=False):
+        if not self.authenticated:
+            await self.send(f"{tag} NO not authenticated")
+            return
+        if args[0].upper() != "INBOX":
+            await self.send(f"{tag} NO [NONEXISTENT] only INBOX exists")
+            return
+        self.selected, self.read_only = True, read_only
+        unseen = next((seq for seq, m in enumerate(self.mailbox.messages, 1) if r"\Seen" not in m.flags), None)
+        lines = [
+            f"* FLAGS ({SYSTEM_FLAGS})",
+            f"* {len(self.mailbox)} EXISTS",
+            "* 0 RECENT",
+            f"* OK [UIDVALIDITY {self.mailbox.uidvalidity}] UIDs valid",
+            f"* OK [UIDNEXT {self.mailbox.next_uid}] predicted next UID",
+        ]
+        if unseen:
+            lines.append(f"* OK [UNSEEN {unseen}] first unseen")
+        mode = "READ-ONLY" if read_only else "READ-WRITE"
+        await self.send(*lines, f"{tag} OK [{mode}] {'EXAMINE' if read_only else 'SELECT'} completed")
+
+    async def cmd_examine(self, tag, args, literals, uid):
+        await self.cmd_select(tag, args, literals, uid, read_only=True)
+
+    async def cmd_close(self, tag, args, literals, uid):
+        if self.selected and not self.read_only:
+            self.mailbox.expunge()
+        self.selected = False
+        await self.send(f"{tag} OK CLOSE completed")
+
+    def _select_messages(self, sequence_set: str, uid: bool) -> List[Tuple[int, Message]]:
+        messages = self.mailbox.messages
+        if uid:
+            largest = messages[-1].uid if messages else 0
+            ranges = parse_sequence_set(sequence_set, largest)
+            return [(seq, m) for seq, m in enumerate(messages, 1) if in_ranges(m.uid, ranges)]
+        ranges = parse_sequence_set(sequence_set, len(messages))
+        return [(seq, m) for seq, m in enumerate(messages, 1) if in_ranges(seq, ranges)]
+
+    async def cmd_search(self, tag, args, literals, uid):
+        self._require_selected()
+        matches = list(enumerate(self.mailbox.messages, 1))
+        keys = iter(args)
+        for key in keys:
+            upper = key.upper()
+            if upper == "CHARSET":
+                _next_argument(keys, key)
+            elif upper == "ALL":
+                continue
+            elif upper == "UID":
+                selected = {id(m) for _, m in self._select_messages(_next_argument(keys, key), uid=True)}
+                matches = [(seq, m) for seq, m in matches if id(m) in selected]
+            elif upper in ("SEEN", "UNSEEN", "DELETED", "UNDELETED", "FLAGGED", "UNFLAGGED"):
+                flag = "\\" + upper.replace("UN", "", 1).capitalize()
+                wanted = not upper.startswith("UN")
+                matches = [(seq, m) for seq, m in matches if (flag in m.flags) == wanted]
+            elif upper[0].isdigit() or upper[0] == "*":
+                selected = {id(m) for _, m in self._select_messages(key, uid=False)}
+                matches = [(seq, m) for seq, m in matches if id(m) in selected]
+            else:
+                raise ValueError(f"unsupported search key {key}")
+        found = " ".join(str(m.uid if uid else seq) for seq, m in matches)
+        await self.send(f"* SEARCH {found}".rstrip(), f"{tag} OK SEARCH completed")
+
+    async def cmd_fetch(self, tag, args, literals, uid):
+        self._require_selected()
+        sequence_set, items = args[0], " ".join(args[1:])
+        if items.startswith("(") and items.endswith(")"):
+            items = items[1:-1]
+        names = [i.upper() for i in _FETCH_ITEM.findall(items)]
+        if names == ["ALL"] or names == ["FAST"]:
+            names = ["FLAGS", "INTERNALDATE", "RFC822.SIZE"]
+        if uid and "UID" not in names:
+            names.insert(0, "UID")
+        out = []
+        for seq, message in self._select_messages(sequence_set, uid):
+            parts = []
+            for name in names:
+                if name == "UID":
+                    parts.append(f"UID {message.uid}".encode())
+                elif name == "FLAGS":
+                    parts.append(f"FLAGS ({' '.join(sorted(message.flags))})".encode())
+                elif name == "RFC822.SIZE":
+                    parts.append(f"RFC822.SIZE {len(message.raw)}".encode())
+                elif name == "INTERNALDATE":
+                    parts.append(f'INTERNALDATE "{formatdate(message.internal_date)}"'.encode())
+                else:
+                    payload = self._fetch_payload(name, message)
+                    if payload is None:
+                        raise ValueError(f"unsupported fetch item {name}")
+                    label = name.replace(".PEEK", "")
+                    parts.append(f"{label} {{{len(payload)}}}\r\n".encode() + payload)
+                    if ".PEEK" not in name and name not in ("RFC822.HEADER",) and not self.read_only:
+                        message.flags.add(r"\Seen")
+            out.append(f"* {seq} FETCH (".encode() + b" ".join(parts) + b")\r\n")
+        await self.send(*out, f"{tag} OK FETCH completed")
+
+    @staticmethod
+    def _fetch_payload(name: str, message: Message) -> Optional[bytes]:
+        section = name.replace(".PEEK", "")
+        if section in ("RFC822", "BODY[]"):
+            return message.raw
+        if section in ("RFC822.HEADER", "BODY[HEADER]"):
+            return message.header()
+        if section in ("RFC822.TEXT", "BODY[TEXT]"):
+            return message.text()
+        return None
+
+    async def cmd_store(self, tag, args, literals, uid):
+        self._require_selected()
+        sequence_set, action, flags = args[0], args[1].upper(), args[2].strip("()").split()
+        silent = action.endswith(".SILENT")
+        action = action.replace(".SILENT", "")
+        out = []
+        for seq, message in self._select_messages(sequence_set, uid):
+            if action == "+FLAGS":
+                message.flags.update(flags)
+            elif action == "-FLAGS":
+                message.flags.difference_update(flags)
+            elif action == "FLAGS":
+                message.flags = set(flags)
+            else:
+                raise ValueError(f"unsupported store action {action}")
+            if not silent:
+                uid_part = f"UID {message.uid} " if uid else ""
+                out.append(f"* {seq} FETCH ({uid_part}FLAGS ({' '.join(sorted(message.flags))}))")
+        await self.send(*out, f"{tag} OK STORE completed")
+
+    async def cmd_expunge(self, tag, args, literals, uid):
+        self._require_selected()
+        await self.send(*[f"* {seq} EXPUNGE" for seq in self.mailbox.expunge()], f"{tag} OK EXPUNGE completed")
+
+    async def cmd_append(self, tag, args, literals, uid):
+        if not literals:
+            raise ValueError("APPEND needs a message literal")
+        flags = next((a.strip("()").split() for a in args[1:] if a.startswith("(")), ())
+        new_uid = self.mailbox.append(literals[0], flags)
+        await self.send(f"{tag} OK [APPENDUID {self.mailbox.uidvalidity} {new_uid}] APPEND completed")
+
+    async def cmd_idle(self, tag, args, literals, uid):
+        self._require_selected()
+        event = self.mailbox.subscribe()
+        known = len(self.mailbox)
+        await self.send("+ idling")
+        done = asyncio.ensure_future(self.reader.readline())
+        try:
+            while True:
+                woken = asyncio.ensure_future(event.wait())
+                await asyncio.wait({done, woken}, return_when=asyncio.FIRST_COMPLETED)
+                if done.done():
+                    woken.cancel()
+                    break
+                event.clear()
+                if len(self.mailbox) != known:
+                    known = len(self.mailbox)
+                    await self.send(f"* {known} EXISTS")
+        finally:
+            self.mailbox.unsubscribe(event)
+            if not done.done():
+                done.cancel()
+        if not done.result():
+            return False
+        await self.send(f"{tag} OK IDLE terminated")
@@ -0,0 +1,76 @@
+from typing import Dict, List, Optional
+from personal_ai_assistant.testing.base import Latency
+from personal_ai_assistant.testing.caldav_server import CalDAVServer, CalendarStore
+from personal_ai_assistant.testing.dataset import make_events, make_raw_emails, make_repositories
+from personal_ai_assistant.testing.github_server import GitHubServer, GitHubStore
+from personal_ai_assistant.testing.imap_server import IMAPServer, Mailbox
+from personal_ai_assistant.testing.smtp_server import SMTPServer
+
+
+class FakeServices:
+    """Starts the IMAP, SMTP, CalDAV and GitHub stand-ins on one event loop.
+
+    SMTP delivers into the IMAP inbox. ``settings_overrides()`` gives the
+    environment variables that point the app's clients at the running servers.
+
+        async with FakeServices(emails=1000, latency=Latency(0.02)) as services:
+            client = EmailClient(**services.email_client_kwargs())
+    """
+
+    def __init__(self, emails: int = 100, events: int = 200, calendars: Optional[List[str]] = None,
+                 repositories: int = 5, issues_per_repository: int = 50, pulls_per_repository: int = 20,
+                 owner: str = "octocat", latency: Optional[Latency] = None, host: str = "127.0.0.1",
+                 ports: Optional[Dict[str, int]] = None, github_rate_limit: int = 5000, seed: int = 42):
+        ports = ports or {}
+        self.owner = owner
+        self.mailbox = Mailbox(make_raw_emails(emails, seed=seed))
+        self.imap = IMAPServer(self.mailbox, host=host, port=ports.get("imap", 0), latency=latency)
+        self.smtp = SMTPServer(self.mailbox, host=host, port=ports.get("smtp", 0), latency=latency)
+        self.caldav = CalDAVServer(
+            CalendarStore(make_events(events, calendars or ["personal", "work"], seed=seed)),
+            host=host, port=ports.get("caldav", 0), latency=latency,
+        )
+        self.github = GitHubServer(
+            GitHubStore(make_repositories(owner, repositories, issues_per_repository, pulls_per_repository, seed=seed)),
+            host=host, port=ports.get("github", 0), latency=latency, rate_limit=github_rate_limit,
+        )
+        self.servers = [self.imap, self.smtp, self.caldav, self.github]
+
+    async def start(self):
+        for server in self.servers:
+            await server.start()
+
+    async def stop(self):
+        for server in reversed(self.servers):
+            await server.stop()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def settings_overrides(self) -> Dict[str, str]:
+        return {
+            "EMAIL_HOST": self.imap.host,
+            "EMAIL_IMAP_PORT": str(self.imap.port),
+            "EMAIL_USE_SSL": "false",
+            "SMTP_HOST": self.smtp.host,
+            "SMTP_PORT": str(self.smtp.port),
+            "SMTP_USE_TLS": "false",
+            "CALDAV_URL": f"{self.caldav.url}/",
+            "GITHUB_API_URL": self.github.url,
+        }
+
+    def email_client_kwargs(self) -> Dict[str, object]:
+        return {
+            "imap_server": self.imap.host,
+            "smtp_server": self.smtp.host,
+            "username": "me@example.com",
+            "password": "secret",
+            "use_ssl": False,
+            "smtp_use_tls": False,
+            "imap_port": self.imap.port,
+            "smtp_port": self.smtp.port,
+        }
@@ -0,0 +1,148 @@
+"""A small ESMTP server that accepts everything and records what it was sent.
+
+Supports EHLO/HELO, AUTH PLAIN and LOGIN, MAIL, RCPT, DATA, RSET, NOOP and
+QUIT. No STARTTLS, so point clients at it with TLS disabled. When given a
+Mailbox, accepted messages are also delivered there, so a send shows up on
+the IMAP stand-in (and wakes its IDLE sessions).
+"""
+import asyncio
+import base64
+from typing import Dict, List, NamedTuple, Optional
+from personal_ai_assistant.testing.base import StreamServer
+from personal_ai_assistant.testing.imap_server import Mailbox
+
+
+class Envelope(NamedTuple):
+    sender: str
+    recipients: List[str]
+    data: bytes
+
+
+class SMTPServer(StreamServer):
+    scheme = "smtp"
+
+    def __init__(self, mailbox: Optional[Mailbox] = None, users: Optional[Dict[str, str]] = None,
+                 max_message_size: int = 10 * 1024 * 1024, **kwargs):
+        super().__init__(**kwargs)
+        self.mailbox = mailbox
+        # None accepts any credentials
+        self.users = users
+        self.max_message_size = max_message_size
+        self.received: List[Envelope] = []
+
+    def _check_credentials(self, username: str, password: str) -> bool:
+        return self.users is None or self.users.get(username) == password
+
+    async def handle(self, reader, writer):
+        await _Session(self, reader, writer).run()
+
+
+class _Session:
+    def __init__(self, server: SMTPServer, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.sender: Optional[str] = None
+        self.recipients: List[str] = []
+
+    async def reply(self, *lines):
+        self.writer.write("".join(f"{line}\r\n" for line in lines).encode())
+        await self.writer.drain()
+
+    async def read_line(self) -> str:
+        return (await self.reader.readline()).decode(errors="replace").rstrip("\r\n")
+
+    async def run(self):
+        await self.reply("220 localhost stand-in ESMTP ready")
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            verb, _, argument = line.decode(errors="replace").rstrip("\r\n").partition(" ")
+            verb = verb.upper()
+            await self.server.latency.wait()
+            handler = getattr(self, f"cmd_{verb.lower()}", None)
+            if handler is None:
+                await self.reply(f"502 {verb} not implemented")
+            elif await handler(argument) is False:
+                return
+
+    async def cmd_ehlo(self, argument):
+        await self.reply("250-localhost", "250-AUTH PLAIN LOGIN", f"250-SIZE {self.server.max_message_size}",
+                         "250-8BITMIME", "250 PIPELINING")
+
+    async def cmd_helo(self, argument):
+        await self.reply("250 localhost")
+
+    async def cmd_auth(self, argument):
+        mechanism, _, initial = argument.partition(" ")
+        mechanism = mechanism.upper()
+        if mechanism == "PLAIN":
+            if not initial:
+                await self.reply("334 ")
+                initial = await self.read_line()
+            _, username, password = base64.b64decode(initial).decode().split("\0")
+        elif mechanism == "LOGIN":
+            if initial:
+                username = base64.b64decode(initial).decode()
+            else:
+                await self.reply("334 VXNlcm5hbWU6")
+                username = base64.b64decode(await self.read_line()).decode()
+            await self.reply("334 UGFzc3dvcmQ6")
+            password = base64.b64decode(await self.read_line()).decode()
+        else:
+            await self.reply("504 unrecognized authentication mechanism")
+            return
+        if self.server._check_credentials(username, password):
+            await self.reply("235 authentication succeeded")
+        else:
+            await self.reply("535 authentication credentials invalid")
+
+    async def cmd_mail(self, argument):
+        self.sender, self.recipients = _address(argument), []
+        await self.reply("250 OK")
+
+    async def cmd_rcpt(self, argument):
+        if self.sender is None:
+            await self.reply("503 need MAIL first")
+            return
+        self.recipients.append(_address(argument))
+        await self.reply("250 OK")
+
+    async def cmd_data(self, argument):
+        if not self.recipients:
+            await self.reply("503 need RCPT first")
+            return
+        await self.reply("354 end data with <CR><LF>.<CR><LF>")
+        data = await self._read_data()
+        self.server.received.append(Envelope(self.sender, self.recipients, data))
+        if self.server.mailbox is not None:
+            self.server.mailbox.append(data)
+        self.sender, self.recipients = None, []
+        await self.reply(f"250 OK queued as {len(self.server.received)}")
+
+    async def cmd_rset(self, argument):
+        self.sender, self.recipients = None, []
+        await self.reply("250 OK")
+
+    async def cmd_noop(self, argument):
+        await self.reply("250 OK")
+
+    async def cmd_quit(self, argument):
+        await self.reply("221 bye")
+        return False
+
+    async def _read_data(self) -> bytes:
+        lines = []
+        while True:
+            line = await self.reader.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                break
+            # Undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b"..") else line)
+        return b"".join(lines)
+
+
+def _address(argument: str) -> str:
+    _, _, value = argument.partition(":")
+    return value.strip().split(" ", 1)[0].strip("<>")
@@ -1,28 +1,406 @@
+import asyncio
+import fnmatch
+import inspect
+import json
+import logging
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from functools import wraps
-from personal_ai_assistant.database.db_manager import DatabaseManager
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from personal_ai_assistant.config import settings
-import json
+from personal_ai_assistant.utils.exceptions import ConfigurationError
 
+logger = logging.getLogger(__name__)
 
-class Cache:
+_MISSING = object()
+
+# Delete the lock only if it still holds our token, so an overrunning computation never frees another process's lock
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class PickleSerializer:
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class MsgpackSerializer:
     def __init__(self):
-        self.db_manager = DatabaseManager(settings.database_url)
+        try:
+            import msgpack
+        except ImportError:
+            raise ConfigurationError("cache_serializer is 'msgpack' but the msgpack package is not installed")
+        self._msgpack = msgpack
+
+    def dumps(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+
+SERIALIZERS = {
+    "pickle": PickleSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+def get_serializer(name: str):
+    try:
+        return SERIALIZERS[name]()
+    except KeyError:
+        raise ConfigurationError(f"Unknown cache serializer: {name}")
+
+
+class LocalCache:
+    """Thread-safe per-process LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = _MISSING) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, pattern: str) -> List[str]:
+        """Remove the keys matching the glob ``pattern`` and return them."""
+        with self._lock:
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                del self._entries[key]
+            return keys
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Cache:
+    """Two-tier cache: a per-process LRU in front of the shared Redis instance.
+
+    Redis errors never propagate; the cache degrades to its local tier and
+    retries Redis after ``redis_retry_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        serializer: Optional[str] = None,
+        local_maxsize: Optional[int] = None,
+        local_ttl: Optional[float] = None,
+        namespace: str = "mypia:cache:",
+        redis_client=None,
+        redis_retry_interval: float = 30.0
+    ):
+        self.redis_url = redis_url if redis_url is not None else settings.redis_url
+        self.serializer = get_serializer(serializer or settings.cache_serializer)
+        self.local = LocalCache(local_maxsize or settings.cache_local_maxsize)
+        # Local copies live at most this long so invalidations from other processes converge quickly
+        self.local_ttl = local_ttl if local_ttl is not None else settings.cache_local_ttl
+        self.namespace = namespace
+        self.lock_timeout = settings.cache_lock_timeout
+        self.redis_retry_interval = redis_retry_interval
+        self._redis = redis_client
+        self._redis_retry_at = 0.0
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "sets": 0, "redis_errors": 0}
+        self._stats_lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._key_locks_guard = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    # -- Redis tier -------------------------------------------------------
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url and time.monotonic() >= self._redis_retry_at:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        if self._redis is not None and time.monotonic() < self._redis_retry_at:
+            return None
+        return self._redis
+
+    def _redis_failed(self, error: Exception):
+        self._count("redis_errors")
+        self._redis_retry_at = time.monotonic() + self.redis_retry_interval
+        logger.warning(f"Redis cache unavailable, using local tier only for {self.redis_retry_interval}s: {error}")
+
+    def _redis_call(self, method: str, *args, **kwargs):
+        client = self.redis
+        if client is None:
+            return None
+        try:
+            return getattr(client, method)(*args, **kwargs)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+
+    # -- Public API -------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._get(key)
+        return default if value is _MISSING else value
+
+    def _get(self, key: str) -> Any:
+        value = self._get_local(key)
+        if value is not _MISSING:
+            return value
+        return self._get_redis(key)
+
+    async def _get_async(self, key: str) -> Any:
+        value = self._get_local(key)
+        if value is not _MISSING:
+            return value
+        return await self._off_loop(self._get_redis, key)
+
+    def _get_local(self, key: str) -> Any:
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self._count("local_hits")
+        return value
+
+    def _get_redis(self, key: str) -> Any:
+        data = self._redis_call("get", self.namespace + key)
+        if data is not None:
+            try:
+                value = self.serializer.loads(data)
+            except Exception as e:
+                logger.warning(f"Discarding undecodable cache entry {key}: {e}")
+            else:
+                self._count("redis_hits")
+                self.local.set(key, value, self.local_ttl)
+                return value
+        self._count("misses")
+        return _MISSING
+
+    def set(self, key: str, value: Any, ttl: float = 3600):
+        self._count("sets")
+        self.local.set(key, value, min(ttl, self.local_ttl))
+        if self.redis is None:
+            return
+        try:
+            data = self.serializer.dumps(value)
+        except Exception as e:
+            # The value is still served from the local tier; only sharing it through Redis is skipped
+            logger.warning(f"Not caching {key} in Redis, value cannot be serialized: {e}")
+            return
+        self._redis_call("set", self.namespace + key, data, px=int(ttl * 1000))
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        self._redis_call("delete", self.namespace + key)
+
+    def invalidate(self, pattern: str) -> int:
+        """Remove every entry whose key matches the glob ``pattern`` from both tiers."""
+        # A key held in both tiers is one entry, so count distinct keys rather than deletions
+        removed: Set[str] = set(self.local.invalidate(pattern))
+        client = self.redis
+        if client is None:
+            return len(removed)
+        try:
+            batch = []
+            for redis_key in client.scan_iter(match=self.namespace + pattern, count=500):
+                batch.append(redis_key)
+                if len(batch) >= 500:
+                    self._delete_batch(client, batch, removed)
+                    batch = []
+            if batch:
+                self._delete_batch(client, batch, removed)
+        except Exception as e:
+            self._redis_failed(e)
+        return len(removed)
+
+    def _delete_batch(self, client, batch: List[Any], removed: Set[str]):
+        if client.delete(*batch):
+            for redis_key in batch:
+                if isinstance(redis_key, bytes):
+                    redis_key = redis_key.decode()
+                removed.add(redis_key[len(self.namespace):])
+
+    def get_or_set(self, key: str, func: Callable[[], Any], ttl: float = 3600) -> Any:
+        """Return the cached value for key, computing it at most once per key across callers."""
+        value = self._get(key)
+        if value is not _MISSING:
+            return value
+        with self._key_lock(key):
+            value = self._get(key)
+            if value is not _MISSING:
+                return value
+            token = self._acquire_redis_lock(key)
+            if token is None:
+                value = self._wait_for_value(key)
+                if value is not _MISSING:
+                    return value
+            try:
+                value = func()
+                self.set(key, value, ttl)
+                return value
+            finally:
+                self._release_redis_lock(key, token)
+
+    async def get_or_set_async(self, key: str, func: Callable[[], Any], ttl: float = 3600) -> Any:
+        """Async get_or_set; Redis is called from a worker thread so a slow server never stalls the loop."""
+        value = await self._get_async(key)
+        if value is not _MISSING:
+            return value
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            token = await self._off_loop(self._acquire_redis_lock, key)
+            if token is None:
+                value = await self._wait_for_value_async(key)
+            if value is _MISSING:
+                try:
+                    value = await func()
+                    await self._off_loop(self.set, key, value, ttl)
+                finally:
+                    await self._off_loop(self._release_redis_lock, key, token)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure doesn't log "exception never retrieved"
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["local_hits"] + stats["redis_hits"]) / lookups if lookups else 0.0
+        stats["local_size"] = len(self.local)
+        return stats
+
+    # -- Stampede protection ------------------------------------------------
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._key_locks_guard:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+                if len(self._key_locks) > self.local.maxsize:
+                    # Drop locks nobody holds so the map stays bounded
+                    for stale_key in [k for k, v in self._key_locks.items() if not v.locked() and k != key]:
+                        del self._key_locks[stale_key]
+            return lock
+
+    def _acquire_redis_lock(self, key: str) -> Optional[str]:
+        """Take the cross-process recompute lock; returns None only if another process holds it."""
+        token = uuid.uuid4().hex
+        if self.redis is None:
+            return token
+        acquired = self._redis_call("set", f"{self.namespace}lock:{key}", token, nx=True, px=int(self.lock_timeout * 1000))
+        if not acquired and self.redis is not None:
+            return None
+        return token
+
+    def _release_redis_lock(self, key: str, token: Optional[str]):
+        if token is not None:
+            self._redis_call("eval", _RELEASE_LOCK_SCRIPT, 1, f"{self.namespace}lock:{key}", token)
+
+    def _wait_for_value(self, key: str) -> Any:
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = self._get(key)
+            if value is not _MISSING:
+                return value
+        return _MISSING
+
+    async def _wait_for_value_async(self, key: str) -> Any:
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            value = await self._get_async(key)
+            if value is not _MISSING:
+                return value
+        return _MISSING
+
+    async def _off_loop(self, func: Callable, *args) -> Any:
+        # Redis calls can block for up to the socket timeout; without Redis there is nothing to wait for
+        if self.redis is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+
+_default_cache: Optional[Cache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache() -> Cache:
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = Cache()
+    return _default_cache
+
+
+def make_cache_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    return f"{func.__name__}:{json.dumps(args, default=repr)}:{json.dumps(kwargs, sort_keys=True, default=repr)}"
 
 
 def cache(expiration=3600):
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = make_cache_key(func, args, kwargs)
+                return await get_cache().get_or_set_async(cache_key, lambda: func(*args, **kwargs), expiration)
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            cache_key = f"{func.__name__}:{json.dumps(args)}:{json.dumps(kwargs)}"
-            cached_result = Cache().db_manager.get_cached_data(cache_key)
-            if cached_result:
-                return cached_result
-            result = func(*args, **kwargs)
-            Cache().db_manager.cache_data(cache_key, result, expiration)
-            return result
+            cache_key = make_cache_key(func, args, kwargs)
+            return get_cache().get_or_set(cache_key, lambda: func(*args, **kwargs), expiration)
         return wrapper
     return decorator
 
 
-def invalidate_cache(pattern: str):
-    Cache().db_manager.invalidate_cache(pattern)
+def invalidate_cache(pattern: str) -> int:
+    return get_cache().invalidate(pattern)
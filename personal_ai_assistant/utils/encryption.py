@@ -1,8 +1,53 @@
 from cryptography.fernet import Fernet
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import base64
 import bcrypt
 from typing import Optional
 import secrets
+import threading
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils.exceptions import ServiceBusyError
+
+# bcrypt releases the GIL, so a small shared pool hashes in parallel without blocking the event loop
+_bcrypt_executor: Optional[ThreadPoolExecutor] = None
+_bcrypt_lock = threading.Lock()
+_bcrypt_pending = 0
+
+
+def _get_bcrypt_executor() -> ThreadPoolExecutor:
+    global _bcrypt_executor
+    if _bcrypt_executor is None:
+        with _bcrypt_lock:
+            if _bcrypt_executor is None:
+                _bcrypt_executor = ThreadPoolExecutor(
+                    max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt"
+                )
+    return _bcrypt_executor
+
+
+def _release_bcrypt_slot(_future):
+    global _bcrypt_pending
+    with _bcrypt_lock:
+        _bcrypt_pending -= 1
+
+
+async def _run_bcrypt(func, *args):
+    """Run a bcrypt call on the shared pool, refusing work beyond password_hash_max_pending."""
+    global _bcrypt_pending
+    executor = _get_bcrypt_executor()
+    with _bcrypt_lock:
+        if _bcrypt_pending >= settings.password_hash_max_pending:
+            raise ServiceBusyError("Too many password hashing operations in progress")
+        _bcrypt_pending += 1
+    try:
+        future = executor.submit(func, *args)
+    except BaseException:
+        _release_bcrypt_slot(None)
+        raise
+    # Release the slot when the hash actually finishes, even if the awaiting request was cancelled
+    future.add_done_callback(_release_bcrypt_slot)
+    return await asyncio.wrap_future(future)
 
 
 class EncryptionManager:
@@ -28,3 +73,9 @@ class EncryptionManager:
 
     def verify_password(self, password: str, hashed_password: str) -> bool:
         return bcrypt.checkpw(password.encode(), hashed_password.encode())
+
+    async def hash_password_async(self, password: str) -> str:
+        return await _run_bcrypt(self.hash_password, password)
+
+    async def verify_password_async(self, password: str, hashed_password: str) -> bool:
+        return await _run_bcrypt(self.verify_password, password, hashed_password)
@@ -21,3 +21,8 @@ class ConfigurationError(MyPIAException):
 class AuthenticationError(MyPIAException):
     """Raised when authentication fails"""
     pass
+
+
+class ServiceBusyError(MyPIAException):
+    """Raised when a bounded worker pool has no room for more work"""
+    pass
@@ -1,25 +1,86 @@
+import atexit
+import itertools
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
+_listener = None
 
-def setup_logging(log_level=logging.INFO, log_file=None):
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Pass every WARNING-or-above record and roughly ``rate`` of the rest."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+        self._interval = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counter = itertools.count()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        if self._interval == 0:
+            return False
+        return next(self._counter) % self._interval == 0
+
+
+def setup_logging(log_level=logging.INFO, log_file=None, queue_size=10000):
+    """Route root logging through a queue so formatting and I/O happen on a listener thread.
+
+    Safe to call more than once; later calls only adjust the level.
+    """
+    global _listener
     logger = logging.getLogger()
     logger.setLevel(log_level)
+    if _listener is not None:
+        return logger
 
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
+    handlers = []
     if log_file:
         file_handler = RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
 
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    logger.addHandler(NonBlockingQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
 
     return logger
 
 
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        root = logging.getLogger()
+        for handler in [h for h in root.handlers if isinstance(h, NonBlockingQueueHandler)]:
+            root.removeHandler(handler)
+
+
 def get_logger(name):
     return logging.getLogger(name)
 
@@ -0,0 +1,181 @@
+import itertools
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from personal_ai_assistant.config import settings
+
+logger = logging.getLogger(__name__)
+
+# tracemalloc's own bookkeeping and import machinery are noise in every diff
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+_lock = threading.Lock()
+_snapshots: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+_snapshot_ids = itertools.count(1)
+_reporters: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+
+
+def rss_bytes() -> int:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def start_tracing(frames: Optional[int] = None) -> bool:
+    """Start tracemalloc; returns False if it was already running."""
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(frames or settings.tracemalloc_frames)
+    logger.info(f"tracemalloc started with {tracemalloc.get_traceback_limit()} frames per allocation")
+    return True
+
+
+def stop_tracing():
+    """Stop tracemalloc and drop retained snapshots, which hold on to a lot of memory."""
+    tracemalloc.stop()
+    with _lock:
+        _snapshots.clear()
+
+
+def take_snapshot(label: str = "", top: int = 20) -> Dict[str, Any]:
+    """Record a tracemalloc snapshot for later diffing and summarise its largest allocation sites."""
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running; start tracing first")
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    current, peak = tracemalloc.get_traced_memory()
+    entry = {
+        "id": next(_snapshot_ids),
+        "label": label,
+        "taken_at": time.time(),
+        "pid": os.getpid(),
+        "rss_bytes": rss_bytes(),
+        "traced_bytes": current,
+        "traced_peak_bytes": peak,
+    }
+    with _lock:
+        _snapshots[entry["id"]] = {**entry, "snapshot": snapshot}
+        while len(_snapshots) > settings.memory_snapshot_limit:
+            _snapshots.popitem(last=False)
+    return {**entry, "top": _format_stats(snapshot.statistics("lineno")[:top])}
+
+
+def list_snapshots() -> List[Dict[str, Any]]:
+    with _lock:
+        return [{k: v for k, v in entry.items() if k != "snapshot"} for entry in _snapshots.values()]
+
+
+def diff_snapshots(old_id: int, new_id: int, top: int = 20, key_type: str = "lineno") -> Dict[str, Any]:
+    """Compare two snapshots by allocation site, largest growth first."""
+    with _lock:
+        old, new = _snapshots.get(old_id), _snapshots.get(new_id)
+    if old is None or new is None:
+        raise KeyError(f"Unknown snapshot id: {old_id if old is None else new_id}")
+    stats = new["snapshot"].compare_to(old["snapshot"], key_type)
+    return {
+        "old": old_id,
+        "new": new_id,
+        "rss_diff_bytes": new["rss_bytes"] - old["rss_bytes"],
+        "traced_diff_bytes": new["traced_bytes"] - old["traced_bytes"],
+        "top": _format_stats(stats[:top]),
+    }
+
+
+def _format_stats(stats) -> List[Dict[str, Any]]:
+    rows = []
+    for stat in stats:
+        frame = stat.traceback[0]
+        row = {"site": f"{frame.filename}:{frame.lineno}", "size_bytes": stat.size, "count": stat.count}
+        if hasattr(stat, "size_diff"):
+            row["size_diff_bytes"] = stat.size_diff
+            row["count_diff"] = stat.count_diff
+        rows.append(row)
+    return rows
+
+
+def register_memory_reporter(name: str, owner: Any, report: Callable[[Any], Optional[Dict[str, Any]]]):
+    """Include ``report(owner)`` in memory_report() for as long as ``owner`` is alive."""
+    ref = weakref.ref(owner)
+
+    def reporter():
+        obj = ref()
+        return report(obj) if obj is not None else None
+
+    with _lock:
+        _reporters[name] = reporter
+
+
+def memory_report() -> Dict[str, Any]:
+    """RSS, tracemalloc totals and the footprint reported by each loaded model."""
+    report: Dict[str, Any] = {"pid": os.getpid(), "rss_bytes": rss_bytes(), "tracing": tracemalloc.is_tracing()}
+    if report["tracing"]:
+        report["traced_bytes"], report["traced_peak_bytes"] = tracemalloc.get_traced_memory()
+    with _lock:
+        reporters = dict(_reporters)
+    models = {}
+    for name, reporter in reporters.items():
+        try:
+            result = reporter()
+        except Exception as e:
+            logger.warning(f"Memory reporter {name} failed: {str(e)}")
+            continue
+        if result is not None:
+            models[name] = result
+    report["models"] = models
+    return report
+
+
+class MemoryWatcher:
+    """Background thread that logs RSS and the top allocation growth every ``interval`` seconds."""
+
+    def __init__(self, interval: float, top: int = 10):
+        self.interval = interval
+        self.top = top
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-watcher", daemon=True)
+        self._started_tracing = False
+
+    def start(self):
+        self._started_tracing = start_tracing()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        # Tracing slows every allocation; leave it on only if someone else turned it on
+        if self._started_tracing:
+            stop_tracing()
+            self._started_tracing = False
+
+    def _run(self):
+        previous = take_snapshot("watch")
+        while not self._stop.wait(self.interval):
+            current = take_snapshot("watch")
+            diff = diff_snapshots(previous["id"], current["id"], self.top)
+            logger.info(
+                f"RSS {current['rss_bytes'] / 2**20:.1f} MiB ({diff['rss_diff_bytes'] / 2**20:+.1f}), "
+                f"traced {current['traced_bytes'] / 2**20:.1f} MiB ({diff['traced_diff_bytes'] / 2**20:+.1f})"
+            )
+            for row in diff["top"]:
+                if row["size_diff_bytes"] > 0:
+                    logger.info(f"  {row['site']}: {row['size_diff_bytes'] / 1024:+.1f} KiB, {row['count_diff']:+d} blocks")
+            previous = current
@@ -0,0 +1,162 @@
+import inspect
+import logging
+import os
+import time
+from functools import wraps
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    multiprocess, start_http_server
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from personal_ai_assistant.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Buckets span sub-millisecond cache hits up to slow LLM/IMAP calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "mypia_http_request_duration_seconds", "HTTP request latency by route and status",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "mypia_http_requests_in_flight", "HTTP requests currently being served", multiprocess_mode="livesum"
+)
+EXTERNAL_CALL_DURATION = Histogram(
+    "mypia_external_call_duration_seconds", "Latency of calls to external services",
+    ["service", "operation", "outcome"], buckets=LATENCY_BUCKETS
+)
+LLM_GENERATION_DURATION = Histogram(
+    "mypia_llm_generation_duration_seconds", "Wall time of LLM generations", buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("mypia_llm_tokens", "Tokens processed by the LLM", ["kind"])
+LLM_TOKENS_PER_SECOND = Gauge(
+    "mypia_llm_tokens_per_second", "Completion tokens per second of the last generation", multiprocess_mode="max"
+)
+CELERY_TASK_DURATION = Histogram(
+    "mypia_celery_task_duration_seconds", "Celery task run time by task and final state",
+    ["task", "state"], buckets=LATENCY_BUCKETS
+)
+GITHUB_RATE_LIMIT_REMAINING = Gauge(
+    "mypia_github_rate_limit_remaining", "GitHub API requests left in the current rate limit window",
+    ["resource"], multiprocess_mode="livemin"
+)
+GITHUB_REQUESTS_COALESCED = Counter(
+    "mypia_github_requests_coalesced", "GitHub GETs answered by an identical request already in flight"
+)
+
+# Celery queues whose backlog is reported by the collector
+CELERY_QUEUES = ("celery",)
+
+
+def track_call(service: str, operation: Optional[str] = None):
+    """Record the latency and outcome of a sync or async call to an external service."""
+    def decorator(func):
+        op = operation or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                outcome = "error"
+                try:
+                    result = await func(*args, **kwargs)
+                    outcome = "ok"
+                    return result
+                finally:
+                    EXTERNAL_CALL_DURATION.labels(service, op, outcome).observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                EXTERNAL_CALL_DURATION.labels(service, op, outcome).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def observe_llm_generation(duration: float, prompt_tokens: int, completion_tokens: int):
+    LLM_GENERATION_DURATION.observe(duration)
+    LLM_TOKENS.labels("prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels("completion").inc(completion_tokens)
+    if duration > 0:
+        LLM_TOKENS_PER_SECOND.set(completion_tokens / duration)
+
+
+class RuntimeStatsCollector:
+    """Reads queue depths, cache and DB pool stats at scrape time instead of on the hot path."""
+
+    def __init__(self):
+        self._redis = None
+
+    def describe(self):
+        # Without this the registry calls collect() on register, i.e. at import time
+        return []
+
+    def collect(self):
+        yield from self._collect_queue_depths()
+        yield from self._collect_cache_stats()
+        yield from self._collect_pool_stats()
+
+    def _collect_queue_depths(self):
+        depth = GaugeMetricFamily("mypia_celery_queue_depth", "Messages waiting in Celery queues", labels=["queue"])
+        try:
+            if self._redis is None:
+                import redis
+                self._redis = redis.Redis.from_url(settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            for queue in CELERY_QUEUES:
+                depth.add_metric([queue], self._redis.llen(queue))
+        except Exception as e:
+            logger.warning(f"Could not read Celery queue depth: {str(e)}")
+        yield depth
+
+    def _collect_cache_stats(self):
+        from personal_ai_assistant.utils.cache import get_cache
+        stats = get_cache().stats()
+        lookups = CounterMetricFamily("mypia_cache_lookups", "Cache lookups by tier and result", labels=["result"])
+        for result in ("local_hits", "redis_hits", "misses"):
+            lookups.add_metric([result], stats[result])
+        yield lookups
+        yield GaugeMetricFamily("mypia_cache_hit_ratio", "Share of cache lookups served from a cache tier", value=stats["hit_ratio"])
+        yield GaugeMetricFamily("mypia_cache_local_entries", "Entries in the in-process cache tier", value=stats["local_size"])
+
+    def _collect_pool_stats(self):
+        from personal_ai_assistant.database.engine import get_pool_stats
+        try:
+            stats = get_pool_stats()
+        except Exception as e:
+            logger.warning(f"Could not read database pool stats: {str(e)}")
+            return
+        for key in ("size", "checked_in", "checked_out", "overflow"):
+            if key in stats:
+                yield GaugeMetricFamily(f"mypia_db_pool_{key}", f"Database connection pool {key.replace('_', ' ')}", value=stats[key])
+
+
+_runtime_collector = RuntimeStatsCollector()
+REGISTRY.register(_runtime_collector)
+
+
+def get_registry():
+    """Registry to expose; aggregates all worker processes when PROMETHEUS_MULTIPROC_DIR is set."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(_runtime_collector)
+        return registry
+    return REGISTRY
+
+
+def render_metrics():
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int):
+    start_http_server(port, registry=get_registry())
+    logger.info(f"Serving Prometheus metrics on port {port}")
@@ -1,28 +1,268 @@
 import cProfile
+import marshal
+import os
 import pstats
 import io
-from memory_profiler import profile as memory_profile
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
 from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+from personal_ai_assistant.config import settings
 
+PROFILE_FORMATS = ("collapsed", "pstats")
+# Shorter intervals spend more time sampling than the profiled code gets to run
+MIN_PROFILE_INTERVAL = 0.001
 
-def cpu_profile(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        pr = cProfile.Profile()
-        pr.enable()
-        result = func(*args, **kwargs)
-        pr.disable()
-        s = io.StringIO()
-        ps = pstats.Stats(pr, stream=s).sort_stats('cumulative')
-        ps.print_stats()
-        print(s.getvalue())
-        return result
-    return wrapper
-
-
-def memory_profile_decorator(func):
-    @wraps(func)
-    @memory_profile
-    def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
-    return wrapper
+FrameKey = Tuple[str, int, str]
+
+
+def cpu_profile(output_path: Optional[str] = None):
+    """Profile one call with cProfile, dumping pstats to output_path or printing the top entries."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            pr = cProfile.Profile()
+            pr.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                pr.disable()
+                if output_path:
+                    pr.dump_stats(output_path)
+                else:
+                    s = io.StringIO()
+                    pstats.Stats(pr, stream=s).sort_stats('cumulative').print_stats(30)
+                    print(s.getvalue())
+        return wrapper
+    return decorator
+
+
+def memory_profile_decorator(output_path: Optional[str] = None):
+    """Report allocation growth by site across one call using tracemalloc snapshots."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start(settings.tracemalloc_frames)
+            before = tracemalloc.take_snapshot()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                after = tracemalloc.take_snapshot()
+                if started:
+                    tracemalloc.stop()
+                ignore_tracemalloc = [tracemalloc.Filter(False, tracemalloc.__file__)]
+                stats = after.filter_traces(ignore_tracemalloc).compare_to(before.filter_traces(ignore_tracemalloc), "lineno")
+                lines = [str(stat) for stat in stats[:30]]
+                if output_path:
+                    with open(output_path, "w") as f:
+                        f.write("\n".join(lines) + "\n")
+                else:
+                    print("\n".join(lines))
+        return wrapper
+    return decorator
+
+
+class SamplingProfiler:
+    """Statistical profiler that samples every thread's stack from a background thread.
+
+    Overhead is one stack walk per thread per interval, so it is safe to run
+    against a live API or worker.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.stopped_at = time.time()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                # Root first, leaf last
+                self.samples[tuple(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def write_collapsed(self, path: str):
+        """Write Brendan Gregg's collapsed-stack format, ready for flamegraph.pl or speedscope."""
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for filename, line, name in stack)
+                f.write(f"{frames} {count}\n")
+
+    def write_pstats(self, path: str):
+        """Write a file loadable with pstats.Stats / snakeviz; times are sample counts times the interval."""
+        stats: Dict[FrameKey, list] = {}
+        for stack, count in self.samples.items():
+            elapsed = count * self.interval
+            seen = set()
+            for depth, frame in enumerate(stack):
+                entry = stats.setdefault(frame, [0, 0, 0.0, 0.0, {}])
+                if depth == len(stack) - 1:
+                    entry[2] += elapsed
+                # Recursive frames count once towards cumulative time
+                if frame not in seen:
+                    seen.add(frame)
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += elapsed
+                if depth > 0:
+                    caller = stack[depth - 1]
+                    edge = entry[4].setdefault(caller, [0, 0, 0.0, 0.0])
+                    edge[0] += count
+                    edge[1] += count
+                    edge[3] += elapsed
+                    if depth == len(stack) - 1:
+                        edge[2] += elapsed
+        with open(path, "wb") as f:
+            marshal.dump({
+                frame: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+                for frame, (cc, nc, tt, ct, callers) in stats.items()
+            }, f)
+
+    def write(self, path: str, fmt: str):
+        if fmt == "pstats":
+            self.write_pstats(path)
+        else:
+            self.write_collapsed(path)
+
+
+_session_lock = threading.Lock()
+_session: Optional[Dict[str, Any]] = None
+# Descriptions of the last few finished sessions, newest last
+_last_results = []
+
+
+def _output_path(prefix: str, fmt: str) -> str:
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    suffix = "prof" if fmt == "pstats" else "folded"
+    name = f"{prefix}-{os.getpid()}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}.{suffix}"
+    return os.path.join(settings.profile_dir, name)
+
+
+def start_profiling(duration: float = 30.0, fmt: str = "collapsed", interval: float = 0.01) -> Dict[str, Any]:
+    """Start the process-wide sampling profiler; it stops and writes its output after ``duration`` seconds."""
+    global _session
+    if fmt not in PROFILE_FORMATS:
+        raise ValueError(f"Unknown profile format: {fmt}")
+    if interval < MIN_PROFILE_INTERVAL:
+        raise ValueError(f"Sampling interval must be at least {MIN_PROFILE_INTERVAL}s")
+    if duration <= 0:
+        raise ValueError("Profile duration must be positive")
+    duration = min(duration, settings.profile_max_duration)
+    with _session_lock:
+        if _session is not None:
+            raise RuntimeError("A profiling session is already running")
+        profiler = SamplingProfiler(interval)
+        timer = threading.Timer(duration, stop_profiling)
+        timer.daemon = True
+        _session = {
+            "profiler": profiler,
+            "timer": timer,
+            "format": fmt,
+            "duration": duration,
+            "output": _output_path("sample", fmt),
+        }
+        profiler.start()
+        timer.start()
+        return _describe(_session)
+
+
+def stop_profiling() -> Optional[Dict[str, Any]]:
+    """Stop the running session and write its output; returns None if nothing was running."""
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is None:
+        return None
+    session["timer"].cancel()
+    session["profiler"].stop()
+    session["profiler"].write(session["output"], session["format"])
+    _last_results.append(_describe(session))
+    del _last_results[:-10]
+    return _describe(session)
+
+
+def profiling_status() -> Dict[str, Any]:
+    with _session_lock:
+        current = _describe(_session) if _session is not None else None
+    return {"running": current is not None, "current": current, "recent": list(_last_results)}
+
+
+def _describe(session: Dict[str, Any]) -> Dict[str, Any]:
+    profiler = session["profiler"]
+    return {
+        "pid": os.getpid(),
+        "format": session["format"],
+        "duration": session["duration"],
+        "interval": profiler.interval,
+        "started_at": profiler.started_at,
+        "stopped_at": profiler.stopped_at,
+        "samples": profiler.sample_count,
+        "output": session["output"],
+    }
+
+
+class RequestProfiler:
+    """cProfile a single request on demand, writing pstats to the profile directory.
+
+    Only one request is profiled at a time; overlapping requests run unprofiled.
+    On the event loop thread the profile also includes whatever other
+    coroutines ran while the request was in flight.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def try_start(self) -> Optional[Tuple[cProfile.Profile, str]]:
+        """Return (profiler, output path), or None if another request is being profiled."""
+        if not self._lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except Exception:
+            self._lock.release()
+            return None
+        return profiler, _output_path("request", "pstats")
+
+    def finish(self, profiler: cProfile.Profile, path: str):
+        try:
+            profiler.disable()
+            profiler.dump_stats(path)
+        finally:
+            self._lock.release()
+
+
+request_profiler = RequestProfiler()
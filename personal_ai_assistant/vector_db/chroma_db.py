@@ -3,26 +3,35 @@ from chromadb.config import Settings
 from typing import List, Dict, Any
 import logging
 from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils.metrics import track_call
 
 logger = logging.getLogger(__name__)
 
 class ChromaDBManager:
-    def __init__(self):
-        self.client = chromadb.HttpClient(
-            host=settings.chroma_db_host,
-            port=settings.chroma_db_port,
-        )
-        logger.info(f"ChromaDB initialized with host: {settings.chroma_db_host}, port: {settings.chroma_db_port}")
+    def __init__(self, client=None, embedding_function=None):
+        # Pass a client (e.g. chromadb.EphemeralClient()) to run in-process instead of against the server
+        if client is None:
+            client = chromadb.HttpClient(
+                host=settings.chroma_db_host,
+                port=settings.chroma_db_port,
+            )
+            logger.info(f"ChromaDB initialized with host: {settings.chroma_db_host}, port: {settings.chroma_db_port}")
+        self.client = client
+        self.embedding_function = embedding_function
+
+    def _collection_kwargs(self):
+        return {"embedding_function": self.embedding_function} if self.embedding_function is not None else {}
 
     def create_collection(self, collection_name: str):
-        return self.client.create_collection(name=collection_name)
+        return self.client.create_collection(name=collection_name, **self._collection_kwargs())
 
     def get_or_create_collection(self, collection_name: str):
         try:
-            return self.client.get_collection(name=collection_name)
+            return self.client.get_collection(name=collection_name, **self._collection_kwargs())
         except ValueError:
-            return self.client.create_collection(name=collection_name)
+            return self.client.create_collection(name=collection_name, **self._collection_kwargs())
 
+    @track_call("chroma")
     def add_documents(self, collection_name: str, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]):
         collection = self.get_or_create_collection(collection_name)
         logger.info(f"Adding {len(documents)} documents to collection: {collection_name}")
@@ -33,23 +42,33 @@ class ChromaDBManager:
         )
         logger.info(f"Added {len(documents)} documents to collection: {collection_name}")
 
+    @track_call("chroma")
+    def upsert_documents(self, collection_name: str, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]):
+        collection = self.get_or_create_collection(collection_name)
+        collection.upsert(
+            documents=documents,
+            metadatas=metadatas,
+            ids=ids
+        )
+        logger.info(f"Upserted {len(documents)} documents to collection: {collection_name}")
+
+    @track_call("chroma")
     def query(self, collection_name: str, query_texts: List[str], n_results: int = 5):
         collection = self.get_or_create_collection(collection_name)
         logger.info(f"Querying collection: {collection_name}")
-        logger.debug(f"Query texts: {query_texts}")
-        logger.debug(f"Number of results requested: {n_results}")
         results = collection.query(
             query_texts=query_texts,
             n_results=n_results
         )
         logger.info(f"Query returned {len(results['documents'])} results")
-        logger.debug(f"Query results: {results}")
         return results
 
+    @track_call("chroma")
     def get_document(self, collection_name: str, document_id: str):
         collection = self.get_or_create_collection(collection_name)
         return collection.get(ids=[document_id])
 
+    @track_call("chroma")
     def update_document(self, collection_name: str, document_id: str, document: str, metadata: Dict[str, Any]):
         collection = self.get_or_create_collection(collection_name)
         collection.update(
@@ -58,6 +77,7 @@ class ChromaDBManager:
             metadatas=[metadata]
         )
 
+    @track_call("chroma")
     def delete_document(self, collection_name: str, document_id: str):
         collection = self.get_or_create_collection(collection_name)
         collection.delete(ids=[document_id])
@@ -66,7 +86,7 @@ class ChromaDBManager:
         return self.client.list_collections()
 
     def get_collection(self, collection_name: str):
-        return self.client.get_collection(name=collection_name)
+        return self.client.get_collection(name=collection_name, **self._collection_kwargs())
 
     def delete_collection(self, collection_name: str):
         self.client.delete_collection(name=collection_name)
@@ -77,6 +97,7 @@ class ChromaDBManager:
         results = collection.get(limit=1, sort="id", order="desc")
         return results['ids'][0] if results['ids'] else None
 
+    @track_call("chroma")
     def delete_documents(self, collection_name: str, filter: Dict[str, Any] = None):
         collection = self.get_or_create_collection(collection_name)
         if filter:
@@ -86,6 +107,14 @@ class ChromaDBManager:
             # If no filter is provided, delete all documents
             collection.delete()
 
+    @track_call("chroma")
+    def delete_documents_by_ids(self, collection_name: str, ids: List[str]):
+        if not ids:
+            return
+        collection = self.get_or_create_collection(collection_name)
+        collection.delete(ids=ids)
+        logger.info(f"Deleted {len(ids)} documents from collection: {collection_name}")
+
     def get_collection_stats(self, collection_name: str):
         collection = self.get_or_create_collection(collection_name)
         return {
@@ -0,0 +1,88 @@
+"""Per-request overhead of the API's middleware stack, and query latency under logins.
+
+Compares /health on the real app with the same handler on a bare FastAPI
+app, both driven in-process through httpx's ASGI transport. The login mix
+runs the load harness's vector query scenario alone and then interleaved
+with logins, so password hashing that stalls the event loop shows up as a
+gap between the two query latencies.
+"""
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI
+from tests.benchmarks.common import BenchmarkSkipped, latency_stats
+
+LOGIN_MIX_CONCURRENCY = 16
+LOGIN_MIX_SECONDS = 5.0
+
+
+async def _latencies(app, path, iterations, warmup=20):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(warmup):
+            await client.get(path)
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = await client.get(path)
+            samples.append(time.perf_counter() - start)
+            assert response.status_code == 200
+    return samples
+
+
+def _bare_app():
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    return app
+
+
+def bench_request_overhead(ctx):
+    from personal_ai_assistant.api.main import app
+    iterations = ctx["iterations"] * 10
+    full = latency_stats(asyncio.run(_latencies(app, "/health", iterations)))
+    bare = latency_stats(asyncio.run(_latencies(_bare_app(), "/health", iterations)))
+    return {
+        **full,
+        "bare_p50_ms": bare["p50_ms"],
+        "bare_p99_ms": bare["p99_ms"],
+        "overhead_p50_ms": full["p50_ms"] - bare["p50_ms"],
+        "overhead_p99_ms": full["p99_ms"] - bare["p99_ms"],
+    }
+
+
+def bench_login_query_mix(ctx):
+    from tests.load.runner import in_process_client, run_stage
+    from tests.load.scenarios import setup
+
+    async def run():
+        try:
+            client_context = in_process_client(stub_models=True, timeout=30.0)
+            async with client_context as client:
+                shared = await setup(client, ["vector"])
+                alone = await run_stage(client, shared, ["vector"], LOGIN_MIX_CONCURRENCY, LOGIN_MIX_SECONDS, seed=1)
+                mixed = await run_stage(client, shared, ["vector", "login"], LOGIN_MIX_CONCURRENCY,
+                                        LOGIN_MIX_SECONDS, seed=1)
+        except ImportError as e:
+            raise BenchmarkSkipped(f"load harness dependencies are not installed: {e}")
+        except RuntimeError as e:
+            raise BenchmarkSkipped(str(e))
+        return alone, mixed
+
+    alone, mixed = asyncio.run(run())
+    query_alone = alone["endpoints"]["vectordb.query"]
+    query_mixed = mixed["endpoints"]["vectordb.query"]
+    login = mixed["endpoints"].get("auth.token", {})
+    return {
+        "query_p50_ms": query_alone["p50_ms"],
+        "query_p99_ms": query_alone["p99_ms"],
+        "query_with_logins_p50_ms": query_mixed["p50_ms"],
+        "query_with_logins_p99_ms": query_mixed["p99_ms"],
+        "login_p50_ms": login.get("p50_ms", 0.0),
+        "login_p99_ms": login.get("p99_ms", 0.0),
+        "login_busy_rate": login.get("statuses", {}).get("503", 0) / login["n"] if login.get("n") else 0.0,
+        "requests_per_sec": mixed["throughput_rps"],
+    }
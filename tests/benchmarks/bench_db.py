@@ -0,0 +1,95 @@
+"""Task listing from concurrent coroutines: blocking Session vs AsyncSession.
+
+Both variants run the /v1/tasks list query against the same file-backed
+SQLite database. The blocking variant is how the task routes ran before
+they moved to AsyncSession. Loop lag is how late a coroutine sleeping on a
+1ms timer woke up meanwhile, i.e. how long other requests would have
+stalled.
+"""
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from tests.benchmarks.common import BenchmarkSkipped, latency_stats, make_text
+from personal_ai_assistant.database.base import Base
+from personal_ai_assistant.database.db_manager import DatabaseManager
+from personal_ai_assistant.database.engine import get_engine
+from personal_ai_assistant.models.task import Task
+
+CONCURRENCY = 16
+TASKS = 500
+PAGE_SIZE = 50
+
+
+def _seed(database_url: str):
+    rng = random.Random(5)
+    engine = get_engine(database_url)
+    Base.metadata.create_all(engine, tables=[Task.__table__])
+    with Session(engine) as db:
+        db.add_all(Task(title=make_text(rng, 4), description=make_text(rng, 12)) for _ in range(TASKS))
+        db.commit()
+
+
+async def _drive(list_tasks, iterations: int):
+    lags, samples, done = [], [], asyncio.Event()
+
+    async def monitor():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    async def worker():
+        for _ in range(iterations):
+            start = time.perf_counter()
+            rows = await list_tasks()
+            samples.append(time.perf_counter() - start)
+            assert len(rows) == PAGE_SIZE
+
+    monitoring = asyncio.create_task(monitor())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await monitoring
+    return samples, elapsed, lags
+
+
+def _report(prefix: str, samples, elapsed: float, lags):
+    stats = latency_stats(samples)
+    return {
+        f"{prefix}_lists_per_sec": len(samples) / elapsed,
+        f"{prefix}_p50_ms": stats["p50_ms"],
+        f"{prefix}_p99_ms": stats["p99_ms"],
+        f"{prefix}_loop_lag_max_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+def bench_task_list_concurrency(ctx):
+    try:
+        import aiosqlite  # noqa: F401
+    except ImportError:
+        raise BenchmarkSkipped("aiosqlite is not installed")
+    from personal_ai_assistant.tasks.task_manager import TaskManager
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{Path(tmp_dir) / 'tasks.db'}"
+        _seed(database_url)
+        db_manager = DatabaseManager(database_url)
+        query = select(Task).order_by(Task.created_at, Task.id).limit(PAGE_SIZE)
+
+        async def list_blocking():
+            with db_manager.get_db() as db:
+                return db.execute(query).scalars().all()
+
+        async def list_async():
+            async with db_manager.get_async_db() as db:
+                return await TaskManager(db).get_all_tasks(limit=PAGE_SIZE)
+
+        blocking = asyncio.run(_drive(list_blocking, ctx["iterations"]))
+        concurrent = asyncio.run(_drive(list_async, ctx["iterations"]))
+        get_engine(database_url).dispose()
+    return {**_report("blocking", *blocking), **_report("async", *concurrent)}
@@ -0,0 +1,38 @@
+"""Email fetch and parse throughput.
+
+Fetching runs EmailClient against the local IMAP stand-in, so the numbers
+include the real aioimaplib protocol handling over a loopback socket.
+"""
+import asyncio
+import time
+from tests.benchmarks.common import latency_stats, make_raw_emails, measure
+from personal_ai_assistant.email.imap_client import EmailClient
+from personal_ai_assistant.email.parser import parse_email
+from personal_ai_assistant.testing import IMAPServer, Latency, Mailbox
+
+
+def bench_parse(ctx):
+    messages = make_raw_emails(ctx["emails"])
+    samples = measure(lambda: [parse_email(raw, uid) for uid, raw in enumerate(messages, 1)], ctx["iterations"])
+    stats = latency_stats(samples)
+    stats["emails_per_sec"] = len(messages) / (stats["mean_ms"] / 1000)
+    return stats
+
+
+def bench_fetch_and_parse(ctx):
+    messages = make_raw_emails(ctx["emails"])
+
+    async def run():
+        async with IMAPServer(Mailbox(messages), latency=Latency(ctx.get("latency", 0.0))) as server:
+            client = EmailClient(server.host, server.host, "me", "secret", use_ssl=False, imap_port=server.port)
+            samples = []
+            for _ in range(ctx["iterations"]):
+                start = time.perf_counter()
+                fetched = await client.fetch_new_emails(0)
+                samples.append(time.perf_counter() - start)
+                assert len(fetched) == len(messages)
+            return samples
+
+    stats = latency_stats(asyncio.run(run()))
+    stats["emails_per_sec"] = len(messages) / (stats["mean_ms"] / 1000)
+    return stats
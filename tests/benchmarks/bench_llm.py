@@ -0,0 +1,59 @@
+"""Summarization throughput through TextProcessor.
+
+Uses a real GGUF model when ``--model`` points at one (a tiny model keeps
+runs short); otherwise a stub that emits tokens at a fixed simulated rate,
+which isolates the app's own overhead around generation.
+"""
+import asyncio
+import random
+import time
+from tests.benchmarks.common import BenchmarkSkipped, StubLlama, latency_stats, make_text
+
+
+class CountingLlama:
+    """Wraps a model to total the completion tokens it reports."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.completion_tokens = 0
+
+    def __call__(self, prompt, **kwargs):
+        output = self.llm(prompt, **kwargs)
+        self.completion_tokens += output["usage"]["completion_tokens"]
+        return output
+
+    def n_ctx(self):
+        return self.llm.n_ctx()
+
+
+def _text_processor(model_path):
+    try:
+        from llama_cpp import Llama
+        from personal_ai_assistant.llm.llama_cpp_interface import LlamaCppInterface
+        from personal_ai_assistant.llm.text_processor import TextProcessor
+    except ImportError as e:
+        raise BenchmarkSkipped(f"LLM dependencies are not installed: {e}")
+    if model_path:
+        llm, backend = CountingLlama(Llama(model_path=model_path, verbose=False)), "gguf"
+    else:
+        llm, backend, model_path = CountingLlama(StubLlama()), "stub", "stub"
+    return TextProcessor(LlamaCppInterface(model_path, llm=llm)), llm, backend
+
+
+def bench_summarize(ctx):
+    processor, llm, backend = _text_processor(ctx.get("model"))
+    rng = random.Random(3)
+    texts = [make_text(rng, 300) for _ in range(ctx["llm_iterations"])]
+    samples = []
+
+    async def run():
+        for text in texts:
+            start = time.perf_counter()
+            await processor.summarize_text(text, max_length=32)
+            samples.append(time.perf_counter() - start)
+
+    asyncio.run(run())
+    stats = latency_stats(samples)
+    stats["backend"] = backend
+    stats["tokens_per_sec"] = llm.completion_tokens / sum(samples)
+    return stats
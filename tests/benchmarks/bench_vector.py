@@ -0,0 +1,48 @@
+"""Embed+insert throughput and query latency against an in-process Chroma."""
+import random
+import time
+from tests.benchmarks.common import BenchmarkSkipped, HashEmbeddingFunction, latency_stats, make_text, measure
+from personal_ai_assistant.vector_db.chroma_db import ChromaDBManager
+
+BATCH_SIZE = 100
+
+
+def _manager():
+    try:
+        import chromadb
+        from chromadb.config import Settings
+    except ImportError:
+        raise BenchmarkSkipped("chromadb is not installed")
+    client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False, allow_reset=True))
+    client.reset()
+    return ChromaDBManager(client=client, embedding_function=HashEmbeddingFunction())
+
+
+def _documents(count, seed=42):
+    rng = random.Random(seed)
+    return [make_text(rng, 120) for _ in range(count)]
+
+
+def _load(manager, documents):
+    for offset in range(0, len(documents), BATCH_SIZE):
+        chunk = documents[offset:offset + BATCH_SIZE]
+        positions = range(offset, offset + len(chunk))
+        manager.upsert_documents("bench", chunk, [{"position": i} for i in positions], [str(i) for i in positions])
+
+
+def bench_embed_insert(ctx):
+    manager = _manager()
+    documents = _documents(ctx["documents"])
+    start = time.perf_counter()
+    _load(manager, documents)
+    elapsed = time.perf_counter() - start
+    return {"n": len(documents), "batch": BATCH_SIZE, "seconds": elapsed, "docs_per_sec": len(documents) / elapsed}
+
+
+def bench_query(ctx):
+    manager = _manager()
+    _load(manager, _documents(ctx["documents"]))
+    rng = random.Random(1)
+    stats = latency_stats(measure(lambda: manager.query("bench", [make_text(rng, 8)], 5), ctx["iterations"]))
+    stats["collection_size"] = ctx["documents"]
+    return stats
@@ -0,0 +1,75 @@
+"""Shared helpers and offline stand-ins for the benchmark suite."""
+import hashlib
+import random
+import time
+from typing import Any, Callable, Dict, List
+from personal_ai_assistant.testing.dataset import make_raw_emails, make_text  # noqa: F401
+
+
+class BenchmarkSkipped(Exception):
+    """Raised by a benchmark whose dependencies are unavailable in this environment."""
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(q / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """Summarise per-operation durations (seconds) in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 3) -> List[float]:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class HashEmbeddingFunction:
+    """Deterministic bag-of-words embedding so Chroma runs without downloading a model."""
+
+    def __init__(self, dimensions: int = 64):
+        self.dimensions = dimensions
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        embeddings = []
+        for text in input:
+            vector = [0.0] * self.dimensions
+            for word in text.split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dimensions] += 1.0
+            norm = sum(v * v for v in vector) ** 0.5 or 1.0
+            embeddings.append([v / norm for v in vector])
+        return embeddings
+
+
+class StubLlama:
+    """Mimics llama_cpp.Llama's call signature, emitting tokens at a fixed simulated rate."""
+
+    def __init__(self, seconds_per_token: float = 0.0005):
+        self.seconds_per_token = seconds_per_token
+        self.rng = random.Random(7)
+
+    def __call__(self, prompt: str, max_tokens: int = 16, **kwargs):
+        time.sleep(self.seconds_per_token * max_tokens)
+        return {
+            "choices": [{"text": make_text(self.rng, max_tokens)}],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": max_tokens},
+        }
+
+    def n_ctx(self) -> int:
+        return 2048
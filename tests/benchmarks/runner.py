@@ -0,0 +1,138 @@
+"""Run the offline benchmark suite and store results as JSON.
+
+    python -m tests.benchmarks.runner --output bench-results.json
+    python -m tests.benchmarks.runner --only email --compare bench-results.json
+
+Every ``bench_*`` function in the ``bench_*.py`` modules next to this file
+is run with a shared context dict and returns a flat dict of metrics.
+Metrics ending in ``_per_sec`` are better when higher, ``_ms`` when lower;
+``--compare`` flags changes beyond ``--threshold`` in the wrong direction.
+"""
+import argparse
+import importlib
+import json
+import logging
+import pkgutil
+import platform
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+from tests.benchmarks.common import BenchmarkSkipped
+
+
+def discover(only=None):
+    package_dir = Path(__file__).parent
+    for module_info in sorted(pkgutil.iter_modules([str(package_dir)]), key=lambda m: m.name):
+        if not module_info.name.startswith("bench_"):
+            continue
+        group = module_info.name[len("bench_"):]
+        if only and group not in only:
+            continue
+        yield group, f"tests.benchmarks.{module_info.name}"
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(ctx, only=None):
+    results = {}
+    for group, module_name in discover(only):
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            results[group] = {"skipped": f"import failed: {e}"}
+            continue
+        for name in sorted(n for n in dir(module) if n.startswith("bench_")):
+            key = f"{group}.{name[len('bench_'):]}"
+            print(f"running {key}...", file=sys.stderr)
+            try:
+                results[key] = getattr(module, name)(dict(ctx))
+            except BenchmarkSkipped as e:
+                results[key] = {"skipped": str(e)}
+            except Exception as e:
+                traceback.print_exc()
+                results[key] = {"error": str(e)}
+    return results
+
+
+def compare(old, new, threshold):
+    """Return (metric, old, new, change) rows and whether any regressed beyond threshold."""
+    rows = []
+    regressed = False
+    for key, metrics in new.items():
+        for metric, value in metrics.items():
+            previous = old.get(key, {}).get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(previous, (int, float)) or not previous:
+                continue
+            change = (value - previous) / previous
+            if metric.endswith("_per_sec"):
+                worse = change < -threshold
+            elif metric.endswith("_ms"):
+                worse = change > threshold
+            else:
+                continue
+            regressed = regressed or worse
+            rows.append((f"{key}.{metric}", previous, value, change, worse))
+    return rows, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change treated as a regression")
+    parser.add_argument("--only", nargs="*", help="Benchmark groups to run, e.g. email vector llm api")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--llm-iterations", type=int, default=10)
+    parser.add_argument("--model", help="Path to a GGUF model; a stub is used when omitted")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added per stand-in request")
+    args = parser.parse_args(argv)
+
+    # Keep request/access logging from dominating what is being measured
+    logging.disable(logging.INFO)
+    ctx = {
+        "iterations": args.iterations,
+        "emails": args.emails,
+        "documents": args.documents,
+        "llm_iterations": args.llm_iterations,
+        "model": args.model,
+        "latency": args.latency,
+    }
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": ctx,
+        },
+        "results": run(ctx, args.only),
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        rows, regressed = compare(baseline["results"], report["results"], args.threshold)
+        for metric, previous, value, change, worse in rows:
+            flag = "  REGRESSION" if worse else ""
+            print(f"{metric:50} {previous:12.3f} -> {value:12.3f} ({change:+.1%}){flag}", file=sys.stderr)
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import sys
 import os
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, Mock
@@ -66,7 +67,7 @@ def test_user(auth_manager):
     username = f"testuser_{unique_id}"
     email = f"test_{unique_id}@example.com"
     password = "testpassword"
-    user = auth_manager.create_user(username, email, password)
+    user = asyncio.run(auth_manager.create_user(username, email, password))
     return user
 
 
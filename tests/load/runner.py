@@ -0,0 +1,260 @@
+"""Drive concurrent scripted load against the API and report capacity numbers.
+
+    python -m tests.load.runner --scenarios tasks vector --concurrency 1 8 32 --duration 15
+    python -m tests.load.runner --workers 1 2 4 --output load.json
+    python -m tests.load.runner --url http://localhost:8000 --scenarios login
+
+Targets, in order of precedence: ``--url`` (an already running server),
+``--workers`` (spawns ``uvicorn personal_ai_assistant.api.main:app`` once
+per worker count on a free local port), or the app in-process through
+httpx's ASGI transport. For each target the concurrency levels run as
+consecutive stages of ``--duration`` seconds; every virtual user loops over
+the scenario mix until the stage ends. Reports throughput, latency
+percentiles and error rate per stage and per request name.
+
+``--stub-models`` (in-process only) swaps the LLM and Chroma for the
+deterministic stand-ins used by the benchmarks, so summarize/vector load
+measures the app rather than model inference.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import httpx
+from tests.benchmarks.common import percentile
+from tests.load.scenarios import SCENARIOS, Recorder, Session, setup
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"n": 0}
+    return {
+        "n": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p90_ms": percentile(ordered, 90) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def _is_error(status: str) -> bool:
+    return not status.isdigit() or int(status) >= 400
+
+
+def stage_report(recorder: Recorder, concurrency: int, elapsed: float) -> Dict[str, Any]:
+    endpoints = {}
+    all_samples, total, errors = [], 0, 0
+    for name, samples in sorted(recorder.latencies.items()):
+        statuses = dict(recorder.statuses[name])
+        failed = sum(count for status, count in statuses.items() if _is_error(status))
+        endpoints[name] = {
+            **latency_summary(samples),
+            "throughput_rps": len(samples) / elapsed,
+            "error_rate": failed / len(samples),
+            "statuses": statuses,
+        }
+        all_samples += samples
+        total += len(samples)
+        errors += failed
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests": total,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "error_rate": errors / total if total else 0.0,
+        "latency": latency_summary(all_samples),
+        "endpoints": endpoints,
+    }
+
+
+async def run_stage(client: httpx.AsyncClient, shared: Dict[str, Any], scenarios: List[str],
+                    concurrency: int, duration: float, seed: int) -> Dict[str, Any]:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def virtual_user(index: int):
+        rng = random.Random(seed * 1000 + index)
+        session = Session(client, recorder, shared, rng)
+        state: Dict[str, Any] = {}
+        while time.perf_counter() < deadline:
+            await SCENARIOS[rng.choice(scenarios)](session, state)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i) for i in range(concurrency)))
+    return stage_report(recorder, concurrency, time.perf_counter() - start)
+
+
+def _install_model_stubs(app):
+    import chromadb
+    from chromadb.config import Settings
+    from personal_ai_assistant.api import dependencies, vectordb
+    from personal_ai_assistant.llm.llama_cpp_interface import LlamaCppInterface
+    from personal_ai_assistant.vector_db.chroma_db import ChromaDBManager
+    from tests.benchmarks.common import HashEmbeddingFunction, StubLlama
+
+    llm = LlamaCppInterface("stub", llm=StubLlama())
+    chroma = ChromaDBManager(
+        client=chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False)),
+        embedding_function=HashEmbeddingFunction(),
+    )
+    app.dependency_overrides[dependencies.get_llm] = lambda: llm
+    app.dependency_overrides[vectordb.get_chroma_db] = lambda: chroma
+
+
+@asynccontextmanager
+async def in_process_client(stub_models: bool, timeout: float):
+    from personal_ai_assistant.api.main import app
+
+    if stub_models:
+        _install_model_stubs(app)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=timeout) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_healthy(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"uvicorn did not become healthy within {timeout:.0f}s")
+
+
+@asynccontextmanager
+async def uvicorn_client(workers: int, max_connections: int, timeout: float):
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "personal_ai_assistant.api.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    try:
+        await asyncio.to_thread(_wait_until_healthy, url, process)
+        async with remote_client(url, max_connections, timeout) as client:
+            yield client
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@asynccontextmanager
+async def remote_client(url: str, max_connections: int, timeout: float):
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        yield client
+
+
+async def run_target(client_context, label: Dict[str, Any], args) -> List[Dict[str, Any]]:
+    stages = []
+    async with client_context as client:
+        shared = await setup(client, args.scenarios, args.seed_documents)
+        for concurrency in args.concurrency:
+            target = " ".join(f"{key}={value}" for key, value in label.items() if value is not None)
+            print(f"{target} concurrency={concurrency} for {args.duration:.0f}s...", file=sys.stderr)
+            report = await run_stage(client, shared, args.scenarios, concurrency, args.duration, args.seed)
+            report.update(label)
+            stages.append(report)
+            print_stage(report)
+    return stages
+
+
+def print_stage(report: Dict[str, Any]):
+    latency = report["latency"]
+    print(
+        f"  {report['requests']:7d} req  {report['throughput_rps']:9.1f} req/s  "
+        f"p50 {latency.get('p50_ms', 0):8.1f} ms  p95 {latency.get('p95_ms', 0):8.1f} ms  "
+        f"p99 {latency.get('p99_ms', 0):8.1f} ms  errors {report['error_rate']:.2%}",
+        file=sys.stderr,
+    )
+    for name, stats in report["endpoints"].items():
+        print(
+            f"    {name:18} {stats['n']:7d}  {stats['throughput_rps']:9.1f}/s  p50 {stats['p50_ms']:8.1f}  "
+            f"p99 {stats['p99_ms']:8.1f}  errors {stats['error_rate']:.2%}",
+            file=sys.stderr,
+        )
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    max_connections = max(args.concurrency)
+    if args.url:
+        return await run_target(remote_client(args.url, max_connections, args.timeout), {"target": args.url}, args)
+    if args.workers:
+        stages = []
+        for workers in args.workers:
+            context = uvicorn_client(workers, max_connections, args.timeout)
+            stages += await run_target(context, {"target": "uvicorn", "workers": workers}, args)
+        return stages
+    context = in_process_client(args.stub_models, args.timeout)
+    return await run_target(context, {"target": "asgi", "workers": None}, args)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=["tasks", "vector", "login"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16, 64],
+                        help="Virtual users per stage, run in this order")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per stage")
+    parser.add_argument("--url", help="Load an already running server instead")
+    parser.add_argument("--workers", nargs="+", type=int, help="Spawn uvicorn with each of these worker counts")
+    parser.add_argument("--stub-models", action="store_true", help="In-process only: stub the LLM and Chroma")
+    parser.add_argument("--seed-documents", type=int, default=20, help="PDFs uploaded before vector queries")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the report JSON here")
+    args = parser.parse_args(argv)
+
+    # Request logging would otherwise dominate in-process runs
+    logging.disable(logging.INFO)
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "scenarios": args.scenarios,
+            "duration": args.duration,
+        },
+        "stages": asyncio.run(run(args)),
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Scripted user journeys for the load harness.
+
+Each scenario is an ``async def (session, state)`` that issues requests
+through ``session.request(name, ...)`` so every call is timed and counted
+under ``name``. ``state`` is per virtual user and survives across
+iterations; ``session.shared`` holds what setup() prepared (credentials,
+the bearer token).
+"""
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+import httpx
+from personal_ai_assistant.testing.dataset import make_pdf, make_text
+
+LOAD_USER = {"username": "loadtest", "email": "loadtest@example.com", "password": "loadtest-password"}
+VECTOR_COLLECTION = "default_collection"
+
+
+class Recorder:
+    """Per-request-name latencies, status counts and transport errors."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name: str, seconds: float, status: str):
+        self.latencies[name].append(seconds)
+        self.statuses[name][status] += 1
+
+
+class Session:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, shared: Dict[str, Any], rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.shared = shared
+        self.rng = rng
+
+    @property
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.shared['token']}"}
+
+    async def request(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(name, time.perf_counter() - start, type(e).__name__)
+            return None
+        self.recorder.record(name, time.perf_counter() - start, str(response.status_code))
+        return response
+
+
+async def setup(client: httpx.AsyncClient, scenarios: List[str], documents: int = 20) -> Dict[str, Any]:
+    """Create the load-test user, log in once, and seed the vector store for queries."""
+    response = await client.post("/v1/auth/register", json=LOAD_USER)
+    if response.status_code not in (201, 400):
+        raise RuntimeError(f"Could not register the load-test user: {response.status_code} {response.text}")
+    response = await client.post(
+        "/v1/auth/token", data={"username": LOAD_USER["username"], "password": LOAD_USER["password"]})
+    if response.status_code != 200:
+        raise RuntimeError(f"Could not log in as the load-test user: {response.status_code} {response.text}")
+    shared = {"token": response.json()["access_token"]}
+    if "vector" in scenarios:
+        rng = random.Random(11)
+        headers = {"Authorization": f"Bearer {shared['token']}"}
+        for i in range(documents):
+            files = {"file": (f"seed-{i}.pdf", make_pdf(make_text(rng, 80)), "application/pdf")}
+            await client.post("/v1/vectordb/upload", files=files, headers=headers)
+    return shared
+
+
+async def login(session: Session, state: Dict[str, Any]):
+    await session.request("auth.token", "POST", "/v1/auth/token",
+                          data={"username": LOAD_USER["username"], "password": LOAD_USER["password"]})
+
+
+async def task_crud(session: Session, state: Dict[str, Any]):
+    headers = session.auth_headers
+    title = make_text(session.rng, 4)
+    response = await session.request("tasks.create", "POST", "/v1/tasks", headers=headers,
+                                     json={"title": title, "description": make_text(session.rng, 12)})
+    if response is None or response.status_code != 201:
+        return
+    task_id = response.json()["id"]
+    await session.request("tasks.get", "GET", f"/v1/tasks/{task_id}", headers=headers)
+    await session.request("tasks.update", "PUT", f"/v1/tasks/{task_id}", headers=headers,
+                          json={"title": title, "description": make_text(session.rng, 12)})
+    await session.request("tasks.complete", "POST", f"/v1/tasks/{task_id}/complete", headers=headers)
+    await session.request("tasks.list", "GET", "/v1/tasks", headers=headers, params={"limit": 50})
+    await session.request("tasks.delete", "DELETE", f"/v1/tasks/{task_id}", headers=headers)
+
+
+async def vector_query(session: Session, state: Dict[str, Any]):
+    await session.request("vectordb.query", "POST", "/v1/vectordb/query", headers=session.auth_headers, json={
+        "collection_name": VECTOR_COLLECTION,
+        "query_text": make_text(session.rng, 6),
+        "n_results": 5,
+    })
+
+
+async def upload(session: Session, state: Dict[str, Any]):
+    state["uploads"] = state.get("uploads", 0) + 1
+    name = f"load-{id(state)}-{state['uploads']}.pdf"
+    files = {"file": (name, make_pdf(make_text(session.rng, 150)), "application/pdf")}
+    await session.request("vectordb.upload", "POST", "/v1/vectordb/upload", headers=session.auth_headers, files=files)
+
+
+async def summarize(session: Session, state: Dict[str, Any]):
+    await session.request("text.summarize", "POST", "/v1/text/summarize", headers=session.auth_headers,
+                          json={"text": make_text(session.rng, 300), "max_length": 32})
+
+
+SCENARIOS = {
+    "login": login,
+    "tasks": task_crud,
+    "vector": vector_query,
+    "upload": upload,
+    "summarize": summarize,
+}
@@ -1,8 +1,17 @@
+import asyncio
 import pytest
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from personal_ai_assistant.api.main import app
-from personal_ai_assistant.api.dependencies import get_llm, get_auth_manager, get_db
+from personal_ai_assistant.api.middleware import LoggingMiddleware
+from personal_ai_assistant.api.dependencies import get_llm, get_auth_manager, get_current_user, get_db, get_async_db
+from personal_ai_assistant.auth.auth_manager import AuthManager
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils.exceptions import ServiceBusyError
+from personal_ai_assistant.utils.profiling import start_profiling
 
 
 @pytest.fixture
@@ -12,12 +21,13 @@ def client():
             patch('personal_ai_assistant.api.dependencies.SessionLocal') as mock_db:
 
         mock_llm.return_value = MagicMock()
-        mock_auth_manager.return_value = MagicMock()
+        mock_auth_manager.return_value = MagicMock(spec=AuthManager)
         mock_db.return_value = MagicMock()
 
         app.dependency_overrides[get_llm] = lambda: mock_llm.return_value
         app.dependency_overrides[get_auth_manager] = lambda: mock_auth_manager.return_value
         app.dependency_overrides[get_db] = lambda: mock_db.return_value
+        app.dependency_overrides[get_async_db] = lambda: mock_db.return_value
 
         yield TestClient(app)
 
@@ -60,5 +70,156 @@ def test_login(client, test_user):
     assert isinstance(token["access_token"], str)
     assert token["token_type"] == "bearer"
 
+
+def test_busy_password_hashing_returns_503_with_retry_after(client):
+    auth_manager = app.dependency_overrides[get_auth_manager]()
+    auth_manager.authenticate_user = AsyncMock(side_effect=ServiceBusyError("Too many password hashing operations"))
+    auth_manager.create_user = AsyncMock(side_effect=ServiceBusyError("Too many password hashing operations"))
+
+    response = client.post("/v1/auth/token", data={"username": "testuser", "password": "testpassword"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    user_data = {"username": "newuser", "email": "newuser@example.com", "password": "newpassword"}
+    response = client.post("/v1/auth/register", json=user_data)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
 # Add more tests for other endpoints (text processing, email, calendar, tasks, etc.)
 # Make sure to use the correct route prefixes as defined in main.py
+
+
+def test_get_current_user_caches_token_until_user_changes(monkeypatch):
+    monkeypatch.setattr(settings, "secret_key", "test-secret")
+    db_manager = MagicMock()
+
+    @asynccontextmanager
+    async def get_async_db():
+        yield MagicMock(commit=AsyncMock())
+
+    db_manager.get_async_db = get_async_db
+    auth_manager = AuthManager(db_manager, MagicMock())
+    user = MagicMock(id=1, username="testuser", email="test@example.com", is_active=True)
+    token = auth_manager.create_access_token({"sub": "testuser"}, timedelta(minutes=5))
+
+    async def scenario():
+        with patch.object(auth_manager, "_get_user_by_username", AsyncMock(return_value=user)) as lookup:
+            first = await auth_manager.get_current_user(token)
+            second = await auth_manager.get_current_user(token)
+            assert first == second
+            assert first.username == "testuser"
+            assert lookup.await_count == 1
+
+            assert await auth_manager.deactivate_user("testuser")
+            with pytest.raises(HTTPException) as exc_info:
+                await auth_manager.get_current_user(token)
+            assert exc_info.value.status_code == 401
+
+    asyncio.run(scenario())
+
+
+def test_logging_middleware_streams_error_body_and_logs_prefix(caplog):
+    from starlette.applications import Starlette
+    from starlette.responses import StreamingResponse
+    from starlette.routing import Route
+
+    async def failing(request):
+        return StreamingResponse(iter([b"0123456789", b"abcdef"]), status_code=502)
+
+    small_app = Starlette(routes=[Route("/fail", failing)])
+    small_app.add_middleware(LoggingMiddleware, body_limit=12)
+
+    with caplog.at_level("WARNING", logger="personal_ai_assistant.api.middleware"):
+        response = TestClient(small_app).get("/fail")
+
+    assert response.status_code == 502
+    assert response.content == b"0123456789abcdef"
+    assert "GET /fail -> 502" in caplog.text
+    assert "0123456789ab" in caplog.text
+    assert "0123456789abc" not in caplog.text
+
+
+def test_metrics_endpoint_reports_route_latency(client):
+    client.get("/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'mypia_http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert "mypia_http_requests_in_flight" in response.text
+
+
+def test_admin_routes_refuse_users_not_on_the_admin_list(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_usernames", ["admin"])
+    app.dependency_overrides[get_current_user] = lambda: MagicMock(username="someone")
+
+    assert client.post("/v1/admin/profile/start", json={}).status_code == 403
+    assert client.post("/v1/admin/profile/workers/start", json={}).status_code == 403
+    assert client.get("/v1/admin/profile/files/sample.folded").status_code == 403
+    assert client.post("/v1/admin/memory/snapshots", json={}).status_code == 403
+    assert client.get("/v1/admin/memory/diff", params={"old": 1, "new": 2}).status_code == 403
+
+
+def test_admin_profile_start_stop_and_download(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "admin_usernames", ["admin"])
+    app.dependency_overrides[get_current_user] = lambda: MagicMock(username="admin")
+
+    assert client.post("/v1/admin/profile/start", json={"interval": 0}).status_code == 422
+    assert client.post("/v1/admin/profile/start", json={"duration": -1}).status_code == 422
+    with pytest.raises(ValueError):
+        start_profiling(interval=0.0001)
+    with pytest.raises(ValueError):
+        start_profiling(duration=0)
+
+    response = client.post("/v1/admin/profile/start", json={"duration": 60, "format": "collapsed", "interval": 0.001})
+    assert response.status_code == 200
+    assert client.post("/v1/admin/profile/start", json={}).status_code == 409
+
+    response = client.post("/v1/admin/profile/stop")
+    assert response.status_code == 200
+    name = response.json()["output"].rsplit("/", 1)[-1]
+    assert client.get(f"/v1/admin/profile/files/{name}").status_code == 200
+    assert client.get("/v1/admin/profile/files/..%2Fetc%2Fpasswd").status_code == 404
+    assert client.post("/v1/admin/profile/stop").status_code == 404
+
+
+def test_admin_memory_snapshots_and_diff(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_usernames", ["admin"])
+    app.dependency_overrides[get_current_user] = lambda: MagicMock(username="admin")
+    try:
+        client.post("/v1/admin/memory/tracing/start")
+        first = client.post("/v1/admin/memory/snapshots", json={"label": "before"}).json()
+        retained = [bytearray(1024) for _ in range(256)]
+        second = client.post("/v1/admin/memory/snapshots", json={"label": "after"}).json()
+
+        response = client.get("/v1/admin/memory/diff", params={"old": first["id"], "new": second["id"]})
+        assert response.status_code == 200
+        assert response.json()["traced_diff_bytes"] > 0
+        assert client.get("/v1/admin/memory/diff", params={"old": 0, "new": second["id"]}).status_code == 404
+        assert client.get("/v1/admin/memory").json()["rss_bytes"] > 0
+        assert len(retained) == 256
+    finally:
+        client.post("/v1/admin/memory/tracing/stop")
+
+
+def test_github_webhook_checks_signature_and_queues_delivery(client, monkeypatch):
+    import hashlib
+    import hmac
+    from pydantic import SecretStr
+    from personal_ai_assistant.tasks import github_tasks
+
+    monkeypatch.setattr(settings, "github_webhook_secret", SecretStr("hook-secret"))
+    queued = MagicMock()
+    monkeypatch.setattr(github_tasks.process_github_webhook, "delay", queued)
+    body = b'{"action": "opened", "repository": {"full_name": "octocat/repo-0"}}'
+    signature = "sha256=" + hmac.new(b"hook-secret", body, hashlib.sha256).hexdigest()
+
+    def deliver(signature):
+        return client.post("/v1/github/webhook", content=body, headers={
+            "X-GitHub-Event": "issues", "X-GitHub-Delivery": "d-1", "X-Hub-Signature-256": signature,
+            "Content-Type": "application/json"})
+
+    assert deliver("sha256=" + "0" * 64).status_code == 401
+    assert not queued.called
+    response = deliver(signature)
+    assert response.status_code == 202
+    queued.assert_called_once_with("d-1", "issues", {"action": "opened", "repository": {"full_name": "octocat/repo-0"}})
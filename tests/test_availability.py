@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timedelta
+from personal_ai_assistant.calendar.availability import AvailabilityIndex, EventRow, UserIntervals
+
+DAY = datetime(2024, 3, 4)
+
+
+def at(hour: float) -> datetime:
+    return DAY + timedelta(hours=hour)
+
+
+def test_free_busy_and_conflicts_include_recurring_occurrences():
+    intervals = UserIntervals([
+        EventRow(1, "standup", at(9), at(9.5), None),
+        EventRow(2, "review", at(9.25), at(10), None),
+        EventRow(3, "offsite", at(-48), at(-40), None),
+        # Weekly from four weeks earlier, UNTIL in UTC as servers send it
+        EventRow(4, "planning", at(13) - timedelta(weeks=4), at(14) - timedelta(weeks=4),
+                 "FREQ=WEEKLY;UNTIL=20241231T000000Z"),
+        EventRow(5, "lunch", at(12), at(13.5), None),
+    ])
+
+    assert [e.event_id for e in intervals.overlapping(at(8), at(18))] == [1, 2, 5, 4]
+    assert intervals.busy(at(8), at(18)) == [(at(9), at(10)), (at(12), at(14))]
+    assert intervals.free(at(8), at(18), timedelta(minutes=90)) == [(at(10), at(12)), (at(14), at(18))]
+    assert [(a.event_id, b.event_id) for a, b in intervals.conflicts(at(8), at(18))] == [(1, 2), (5, 4)]
+    # The next occurrence is a week later; nothing recurs in between
+    assert [e.start for e in intervals.overlapping(at(14), at(24 * 7 + 13.5))] == [at(24 * 7 + 13)]
+
+
+def test_index_reloads_only_rows_changed_since_last_build():
+    from sqlalchemy import delete, update
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from personal_ai_assistant.database.base import Base
+    from personal_ai_assistant.models import CalendarEvent
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[CalendarEvent.__table__])
+        index = AvailabilityIndex()
+        async with AsyncSession(engine) as db:
+            db.add_all([
+                CalendarEvent(uid=f"e{i}", title=f"event {i}", start_time=at(i), end_time=at(i + 0.5),
+                              user_id=7, updated_at=DAY)
+                for i in range(5)
+            ])
+            await db.commit()
+
+            first = await index.for_user(db, 7)
+            assert await index.for_user(db, 7) is first and index.full_loads == 1
+
+            await db.execute(update(CalendarEvent).where(CalendarEvent.uid == "e1")
+                             .values(end_time=at(2.25), updated_at=DAY + timedelta(seconds=1)))
+            await db.commit()
+            assert [(a.title, b.title) for a, b in (await index.for_user(db, 7)).conflicts(at(0), at(5))] == [
+                ("event 1", "event 2")]
+            assert (index.full_loads, index.incremental_loads) == (1, 1)
+
+            await db.execute(delete(CalendarEvent).where(CalendarEvent.uid == "e2"))
+            await db.commit()
+            assert len((await index.for_user(db, 7)).overlapping(at(0), at(5))) == 4
+            assert index.full_loads == 2
+        await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+from personal_ai_assistant.utils.cache import _MISSING, Cache, LocalCache
+
+
+def make_cache(**kwargs):
+    # An empty redis_url keeps the cache on its local tier
+    return Cache(redis_url="", serializer="pickle", local_maxsize=2, local_ttl=60, **kwargs)
+
+
+def test_local_cache_evicts_least_recently_used_and_expires():
+    local = LocalCache(maxsize=2)
+    local.set("a", 1, ttl=60)
+    local.set("b", 2, ttl=60)
+    local.get("a")
+    local.set("c", 3, ttl=60)
+    assert len(local) == 2
+    assert local.get("a") == 1
+    local.set("short", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert local.get("short") is _MISSING
+
+
+def test_get_or_set_computes_once_and_tracks_stats():
+    cache = make_cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    threads = [threading.Thread(target=cache.get_or_set, args=("key", compute)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert cache.get("key") == "value"
+    stats = cache.stats()
+    assert stats["sets"] == 1
+    assert stats["local_hits"] >= 1
+    assert 0 < stats["hit_ratio"] < 1
+
+
+def test_invalidate_matches_glob_pattern_in_both_tiers():
+    redis_client = MagicMock()
+    redis_client.get.return_value = None
+    redis_client.scan_iter.return_value = [b"mypia:cache:summary:1"]
+    redis_client.delete.return_value = 1
+    cache = make_cache(redis_client=redis_client)
+    cache.set("summary:1", "a")
+    cache.set("embedding:1", "b")
+
+    # summary:1 sits in both tiers but is one entry
+    assert cache.invalidate("summary:*") == 1
+    assert cache.get("summary:1") is None
+    assert cache.get("embedding:1") == "b"
+    redis_client.scan_iter.assert_called_once_with(match="mypia:cache:summary:*", count=500)
+
+
+def test_redis_errors_fall_back_to_local_tier():
+    redis_client = MagicMock()
+    redis_client.get.side_effect = ConnectionError("redis down")
+    cache = make_cache(redis_client=redis_client)
+
+    assert cache.get_or_set("key", lambda: 42) == 42
+    assert cache.get("key") == 42
+    assert cache.stats()["redis_errors"] == 1
+
+
+def test_unserializable_value_stays_in_local_tier():
+    redis_client = MagicMock()
+    cache = make_cache(redis_client=redis_client)
+
+    cache.set("lock", threading.Lock())
+    assert cache.get("lock") is not None
+    redis_client.set.assert_not_called()
+    assert cache.stats()["redis_errors"] == 0
+
+
+def test_async_get_or_set_keeps_slow_redis_off_the_event_loop():
+    redis_client = MagicMock()
+
+    def slow_get(key):
+        time.sleep(0.2)
+        return None
+
+    redis_client.get.side_effect = slow_get
+    redis_client.set.return_value = True
+    cache = make_cache(redis_client=redis_client)
+
+    async def compute():
+        return "value"
+
+    async def scenario():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        assert await cache.get_or_set_async("key", compute) == "value"
+        ticking.cancel()
+        assert len(ticks) > 5 and max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+
+    asyncio.run(scenario())
+    assert cache.get("key") == "value"
+
+
+def test_calendar_list_cache_shares_one_fetch_and_revalidates_by_ctag():
+    from personal_ai_assistant.calendar.caldav_client import CalendarInfo, CalendarListCache, CalendarListing
+
+    cache = CalendarListCache(ttl=60)
+    key = ("https://dav.example.com/", "me")
+    ctags = {"work": "1"}
+    seen_previous = []
+
+    async def fetch(previous):
+        seen_previous.append(previous)
+        await asyncio.sleep(0.01)
+        calendars = {name: CalendarInfo(name, f"https://dav.example.com/{name}/", ctag, None)
+                     for name, ctag in ctags.items()}
+        return CalendarListing("https://dav.example.com/", calendars, time.monotonic() + cache.ttl)
+
+    async def scenario():
+        first = await asyncio.gather(*(cache.get_or_fetch(key, fetch) for _ in range(5)))
+        assert len(seen_previous) == 1 and all(listing is first[0] for listing in first)
+        assert await cache.get_or_fetch(key, fetch) is first[0]
+        assert cache.hits == 1
+
+        await cache.get_or_fetch(key, fetch, refresh=True)
+        assert seen_previous[-1] is first[0] and cache.unchanged == 1
+        ctags["work"] = "2"
+        listing = await cache.get_or_fetch(key, fetch, refresh=True)
+        assert listing.calendars["work"].ctag == "2" and cache.changed == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,7 @@
+from personal_ai_assistant.celery_app import app
+
+
+def test_every_beat_entry_names_a_registered_task():
+    app.loader.import_default_modules()
+    unknown = {name: entry["task"] for name, entry in app.conf.beat_schedule.items() if entry["task"] not in app.tasks}
+    assert unknown == {}
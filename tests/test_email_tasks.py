@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from personal_ai_assistant.database.base import Base
+from personal_ai_assistant.models import Email
+from personal_ai_assistant.tasks import email_tasks
+from personal_ai_assistant.tasks.email_tasks import iter_expired_email_ids, store_email_batch
+
+
+class VectorStore:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.documents = {}
+        self.deleted = []
+
+    def upsert_documents(self, collection_name, documents, metadatas, ids):
+        if self.fail:
+            raise ConnectionError("chroma down")
+        self.documents.update(zip(ids, documents))
+
+    def delete_documents_by_ids(self, collection_name, ids):
+        self.deleted.append(ids)
+        for document_id in ids:
+            self.documents.pop(document_id)
+
+
+def make_email(uid, body, uidvalidity=1, date=datetime(2024, 5, 1)):
+    return {"mailbox": "INBOX", "uidvalidity": uidvalidity, "uid": uid, "subject": f"subject {uid}",
+            "from": "a@example.com", "to": "me@example.com", "body": body, "date": date}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Email.__table__])
+    with Session(engine) as session:
+        yield session
+
+
+def test_retrying_a_batch_stores_each_email_once(db):
+    store = VectorStore()
+    batch = [make_email(1, "first"), make_email(2, "second")]
+    assert store_email_batch(db, store, batch) == 2
+    assert store_email_batch(db, store, batch) == 0
+    assert store_email_batch(db, store, batch + [make_email(3, "third")]) == 1
+    assert [email.uid for email in db.execute(select(Email).order_by(Email.id)).scalars()] == [1, 2, 3]
+    assert sorted(store.documents.values()) == ["first", "second", "third"]
+
+
+def test_vector_store_failure_rolls_the_batch_back(db):
+    with pytest.raises(ConnectionError):
+        store_email_batch(db, VectorStore(fail=True), [make_email(1, "first")])
+    db.rollback()
+    assert db.execute(select(Email)).scalars().all() == []
+    assert store_email_batch(db, VectorStore(), [make_email(1, "first")]) == 1
+
+
+def test_mail_after_a_uidvalidity_reset_does_not_replace_older_mail(db):
+    store = VectorStore()
+    store_email_batch(db, store, [make_email(1, "old message")])
+    assert store_email_batch(db, store, [make_email(1, "new message", uidvalidity=2)]) == 1
+    old, new = db.execute(select(Email).order_by(Email.id)).scalars().all()
+    assert (old.body, new.body) == ("old message", "new message")
+    assert store.documents == {str(old.id): "old message", str(new.id): "new message"}
+
+
+def test_clean_up_deletes_expired_emails_in_batches(db, monkeypatch):
+    store = VectorStore()
+    now = datetime.utcnow()
+    store_email_batch(db, store, [make_email(uid, f"old {uid}", date=now - timedelta(days=60)) for uid in range(1, 6)])
+    store_email_batch(db, store, [make_email(uid, f"new {uid}", date=now - timedelta(days=1)) for uid in range(6, 8)])
+
+    batches = list(iter_expired_email_ids(db, now - timedelta(days=30), batch_size=2))
+    assert [len(ids) for ids in batches] == [2, 2, 1]
+
+    monkeypatch.setattr(email_tasks, "ChromaDBManager", lambda: store)
+    monkeypatch.setattr(email_tasks, "db_manager", SimpleNamespace(SessionLocal=sessionmaker(bind=db.get_bind())))
+    assert email_tasks.clean_up_old_emails(retention_days=30, batch_size=2) == {"status": "success", "deleted": 5}
+    assert store.deleted == [[str(email_id) for email_id in ids] for ids in batches]
+    assert [email.uid for email in db.execute(select(Email).order_by(Email.id)).scalars()] == [6, 7]
+    assert sorted(store.documents.values()) == ["new 6", "new 7"]
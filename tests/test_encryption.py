@@ -0,0 +1,44 @@
+import asyncio
+import threading
+import bcrypt
+import pytest
+from unittest.mock import patch
+from personal_ai_assistant.config import settings
+from personal_ai_assistant.utils import encryption
+from personal_ai_assistant.utils.encryption import EncryptionManager, _run_bcrypt
+from personal_ai_assistant.utils.exceptions import ServiceBusyError
+
+
+def test_async_hash_and_verify_run_on_the_bcrypt_pool():
+    manager = EncryptionManager()
+    threads = []
+    hashpw = bcrypt.hashpw
+
+    def recording_hashpw(password, salt):
+        threads.append(threading.current_thread().name)
+        return hashpw(password, salt)
+
+    with patch.object(encryption.bcrypt, "hashpw", recording_hashpw):
+        hashed = asyncio.run(manager.hash_password_async("secret"))
+    assert threads and threads[0].startswith("bcrypt")
+    assert asyncio.run(manager.verify_password_async("secret", hashed))
+    assert not asyncio.run(manager.verify_password_async("wrong", hashed))
+    assert encryption._bcrypt_pending == 0
+
+
+def test_work_beyond_the_pending_cap_is_refused(monkeypatch):
+    monkeypatch.setattr(settings, "password_hash_max_pending", 1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(_run_bcrypt(release.wait, 5))
+        await asyncio.sleep(0)
+        with pytest.raises(ServiceBusyError):
+            await _run_bcrypt(lambda: None)
+        release.set()
+        assert await running
+
+    asyncio.run(scenario())
+    # The slot is freed once the hash finishes, so the next call is accepted again
+    assert encryption._bcrypt_pending == 0
+    assert asyncio.run(_run_bcrypt(lambda: "done")) == "done"
@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool, QueuePool
+from personal_ai_assistant.database import engine as engine_module
+from personal_ai_assistant.database.engine import dispose_engines, get_async_engine, get_engine
+
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    monkeypatch.setattr(engine_module, "_engines", {})
+    monkeypatch.setattr(engine_module, "_async_engines", {})
+    yield f"sqlite:///{tmp_path / 'test.db'}"
+    dispose_engines()
+
+
+def test_engine_is_cached_per_url_and_uses_wal(database_url, tmp_path):
+    engine = get_engine(database_url)
+    assert get_engine(database_url) is engine
+    assert get_engine(f"sqlite:///{tmp_path / 'other.db'}") is not engine
+    assert isinstance(engine.pool, QueuePool)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+
+def test_async_engine_is_cached_per_url_and_uses_wal(database_url):
+    engine = get_async_engine(database_url)
+    assert get_async_engine(database_url) is engine
+    assert isinstance(engine.pool, NullPool)
+
+    async def journal_mode():
+        async with engine.connect() as connection:
+            return (await connection.execute(text("PRAGMA journal_mode"))).scalar()
+
+    assert asyncio.run(journal_mode()) == "wal"
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from personal_ai_assistant.database.base import Base
+from personal_ai_assistant.github.activity import (
+    activity_from_event, activity_from_webhook, index_pending_activities, poll_activities, record_activities,
+    webhooks_active
+)
+from personal_ai_assistant.models import GitHubActivity
+
+
+class VectorStore:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert_documents(self, collection_name, documents, metadatas, ids):
+        self.upserts.append((collection_name, ids))
+
+
+def test_webhook_and_polled_activity_share_one_deduplicated_batched_path():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[GitHubActivity.__table__])
+    store = VectorStore()
+    payload = {"action": "opened", "repository": {"full_name": "octocat/repo-0"},
+               "issue": {"number": 1, "updated_at": "2024-05-01T10:00:00Z"}}
+
+    with Session(engine) as db:
+        assert not webhooks_active(db)
+        deliveries = [activity_from_webhook(f"d-{i}", "issues", payload) for i in range(5)]
+        assert record_activities(db, deliveries) == 5
+        # A redelivery carries the same delivery id
+        assert record_activities(db, [activity_from_webhook("d-3", "issues", payload)]) == 0
+        assert deliveries[0]["event_type"] == "IssuesEvent"
+        assert deliveries[0]["created_at"] == datetime(2024, 5, 1, 10)
+
+        event = {"id": "42", "type": "PushEvent", "repo": {"name": "octocat/repo-1"}, "payload": {},
+                 "created_at": datetime(2024, 5, 1, 11)}
+        assert record_activities(db, [activity_from_event(event)] * 2) == 1
+
+        assert index_pending_activities(db, store, batch_size=4) == 6
+        assert [len(ids) for _, ids in store.upserts] == [4, 2]
+        assert index_pending_activities(db, store) == 0
+        assert db.execute(select(func.count()).where(GitHubActivity.indexed_at.is_(None))).scalar() == 0
+
+        assert webhooks_active(db)
+        assert not webhooks_active(db, now=datetime.utcnow() + timedelta(hours=2))
+
+
+def test_polling_resumes_after_the_latest_webhook_delivery():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[GitHubActivity.__table__])
+    payload = {"repository": {"full_name": "octocat/repo-0"}, "issue": {"updated_at": "2024-05-01T12:00:00Z"}}
+
+    class Client:
+        since = []
+
+        async def get_user_activities(self, since=None):
+            self.since.append(since)
+            return []
+
+    with Session(engine) as db:
+        event = {"id": "42", "type": "PushEvent", "repo": {"name": "octocat/repo-1"}, "payload": {},
+                 "created_at": datetime(2024, 5, 1, 11)}
+        record_activities(db, [activity_from_event(event), activity_from_webhook("d-1", "issues", payload)])
+        asyncio.run(poll_activities(db, Client(), VectorStore(), force=True))
+    assert Client.since == [datetime(2024, 5, 1, 12)]
@@ -0,0 +1,52 @@
+import asyncio
+import time
+from personal_ai_assistant.github.scheduler import BACKGROUND, INTERACTIVE, RequestScheduler, github_priority
+
+
+def test_interactive_requests_go_first_and_keep_the_reserve():
+    async def scenario():
+        scheduler = RequestScheduler(rate=50, burst=1, reserve=10)
+        await scheduler.acquire()
+        served = []
+
+        async def request(name, priority):
+            await scheduler.acquire(priority)
+            served.append(name)
+
+        background = [asyncio.create_task(request(f"sync-{i}", BACKGROUND)) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request("api", INTERACTIVE))
+        await asyncio.gather(interactive, *background)
+        assert served == ["api", "sync-0", "sync-1", "sync-2"]
+
+        # Near the end of the window only interactive calls get through
+        reset = time.time() + 3600
+        scheduler.update({"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "10",
+                          "X-RateLimit-Reset": str(reset)})
+        with github_priority(BACKGROUND):
+            waiting = asyncio.create_task(scheduler.acquire())
+            await asyncio.sleep(0.1)
+        await asyncio.wait_for(scheduler.acquire(), 1)
+        assert not waiting.done()
+        waiting.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_client_coalesces_identical_requests_and_tracks_the_budget(tmp_path):
+    from personal_ai_assistant.github.github_client import GitHubClient
+    from personal_ai_assistant.testing import GitHubServer, GitHubStore
+    from personal_ai_assistant.testing.dataset import make_repositories
+
+    store = GitHubStore(make_repositories("octocat", repos=3, issues_per_repo=10, pulls_per_repo=5))
+
+    async def scenario():
+        async with GitHubServer(store, rate_limit=100) as server:
+            client = GitHubClient("coalesce", base_url=server.url, cache_dir=str(tmp_path))
+            results = await asyncio.gather(*(client.get_user_repos("octocat") for _ in range(5)))
+            assert all(repos == results[0] for repos in results) and len(results[0]) == 3
+            assert server.request_count == 1
+            assert client.scheduler.budgets["core"].remaining == 99
+            await client.aclose()
+
+    asyncio.run(scenario())
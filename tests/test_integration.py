@@ -2,8 +2,11 @@ import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock, AsyncMock
 from personal_ai_assistant.api.main import app
-from personal_ai_assistant.api.dependencies import get_llm, get_auth_manager, get_db
-from personal_ai_assistant.tasks.task_manager import TaskManager
+from personal_ai_assistant.api.dependencies import get_llm, get_auth_manager, get_db, get_async_db
+from personal_ai_assistant.auth.auth_manager import AuthManager
+from personal_ai_assistant.tasks.task_manager import TaskManager, decode_task_cursor
+from personal_ai_assistant.models.task import Task
+from datetime import datetime
 from personal_ai_assistant.llm.text_processor import TextProcessor
 
 
@@ -15,13 +18,14 @@ def client():
             patch('personal_ai_assistant.tasks.task_manager.TaskManager') as mock_task_manager:
 
         mock_llm.return_value = MagicMock()
-        mock_auth_manager.return_value = MagicMock()
+        mock_auth_manager.return_value = MagicMock(spec=AuthManager)
         mock_db.return_value = MagicMock()
         mock_task_manager.return_value = MagicMock()
 
         app.dependency_overrides[get_llm] = lambda: mock_llm.return_value
         app.dependency_overrides[get_auth_manager] = lambda: mock_auth_manager.return_value
         app.dependency_overrides[get_db] = lambda: mock_db.return_value
+        app.dependency_overrides[get_async_db] = lambda: mock_db.return_value
         app.dependency_overrides[TaskManager] = lambda: mock_task_manager.return_value
 
         yield TestClient(app)
@@ -79,6 +83,27 @@ def test_create_and_list_tasks(client, auth_token):
         assert isinstance(tasks, list)
         assert any(task["id"] == created_task["id"] for task in tasks)
 
+
+def test_list_tasks_pagination_and_fields(client):
+    tasks = [
+        Task(id=task_id, title=f"Task {task_id}", description="", created_at=datetime(2024, 1, 1, 12, 0, task_id))
+        for task_id in (1, 2)
+    ]
+
+    with patch.object(TaskManager, 'get_all_tasks', new_callable=AsyncMock) as mock_get_all:
+        mock_get_all.return_value = tasks
+
+        list_response = client.get(
+            "/v1/tasks",
+            params={"limit": 2, "completed": "false", "fields": "id,title"},
+            headers={"Authorization": "Bearer test-token"}
+        )
+        assert list_response.status_code == 200
+        assert list_response.json() == [{"id": 1, "title": "Task 1"}, {"id": 2, "title": "Task 2"}]
+        mock_get_all.assert_awaited_once_with(limit=2, cursor=None, completed=False, fields=["id", "title"])
+        assert decode_task_cursor(list_response.headers["X-Next-Cursor"]) == (tasks[1].created_at, 2)
+
+
 # Add more integration tests for other functionalities (email, calendar, text processing, etc.)
 # Make sure to use the correct route prefixes as defined in main.py
 
@@ -0,0 +1,19 @@
+import tracemalloc
+from personal_ai_assistant.utils.memory import MemoryWatcher, start_tracing, stop_tracing
+
+
+def test_memory_watcher_stops_only_the_tracing_it_started():
+    watcher = MemoryWatcher(interval=60)
+    watcher.start()
+    assert tracemalloc.is_tracing()
+    watcher.stop()
+    assert not tracemalloc.is_tracing()
+
+    start_tracing()
+    try:
+        watcher = MemoryWatcher(interval=60)
+        watcher.start()
+        watcher.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        stop_tracing()
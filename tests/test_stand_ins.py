@@ -0,0 +1,255 @@
+import asyncio
+from datetime import timedelta
+from personal_ai_assistant.email.imap_client import EmailClient
+from personal_ai_assistant.testing import IMAPServer, Mailbox, SMTPServer
+from personal_ai_assistant.testing.dataset import make_raw_emails
+
+
+def test_email_client_round_trip_through_stand_ins():
+    async def scenario():
+        mailbox = Mailbox(make_raw_emails(5))
+        async with IMAPServer(mailbox) as imap, SMTPServer(mailbox) as smtp:
+            client = EmailClient(imap.host, smtp.host, "me@example.com", "secret", use_ssl=False,
+                                 smtp_use_tls=False, imap_port=imap.port, smtp_port=smtp.port)
+            assert [e["uid"] for e in await client.fetch_emails(limit=2)] == [4, 5]
+            # "6:*" still matches UID 5 on the server; the client must not return it again
+            assert await client.fetch_new_emails(5) == []
+
+            await client.send_email("me@example.com", "stand-in", "hello")
+            new = await client.fetch_new_emails(5)
+            assert [(e["uid"], e["subject"], e["body"].strip()) for e in new] == [(6, "stand-in", "hello")]
+            assert (new[0]["mailbox"], new[0]["uidvalidity"]) == ("INBOX", 1)
+            # UIDs saved under another UIDVALIDITY are meaningless, so everything is new again
+            assert len(await client.fetch_new_emails(6, uidvalidity=7)) == 6
+            assert smtp.received[0].recipients == ["me@example.com"]
+
+    asyncio.run(scenario())
+
+
+def test_watcher_passes_on_mail_arriving_during_idle():
+    async def scenario():
+        mailbox = Mailbox(make_raw_emails(3))
+        async with IMAPServer(mailbox) as imap:
+            client = EmailClient(imap.host, imap.host, "me@example.com", "secret", use_ssl=False,
+                                 imap_port=imap.port)
+            assert await client.get_latest_uid() == 3
+            received = asyncio.Queue()
+            watching = asyncio.create_task(client.watch_for_new_emails(received.put_nowait, interval=30))
+            await asyncio.sleep(0.2)
+            for raw in make_raw_emails(2):
+                mailbox.append(raw)
+            uids = [(await asyncio.wait_for(received.get(), 5))["uid"] for _ in range(2)]
+            assert uids == [4, 5] and received.empty()
+            watching.cancel()
+            await asyncio.gather(watching, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_calendar_sync_fetches_only_changes_and_recovers_from_a_stale_token():
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+    from personal_ai_assistant.calendar.caldav_client import CalDAVClient
+    from personal_ai_assistant.calendar.sync import apply_sync_result, load_sync_states
+    from personal_ai_assistant.database.base import Base
+    from personal_ai_assistant.models import CalendarEvent, CalendarSyncState
+    from personal_ai_assistant.testing import CalDAVServer, CalendarStore
+    from personal_ai_assistant.testing.dataset import EPOCH, make_events, make_ical_event
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[CalendarEvent.__table__, CalendarSyncState.__table__])
+    store = CalendarStore(make_events(20, ["work"]))
+    work = store.calendars["work"]
+
+    class VectorStore:
+        def __init__(self):
+            self.ids = set()
+
+        def upsert_documents(self, collection_name, documents, metadatas, ids):
+            self.ids.update(ids)
+
+        def delete_documents_by_ids(self, collection_name, ids):
+            self.ids.difference_update(ids)
+
+    vectors = VectorStore()
+
+    async def sync(client, db):
+        results = await client.sync_calendars(load_sync_states(db))
+        for calendar_url, result in results.items():
+            apply_sync_result(db, vectors, calendar_url, result, user_id=7)
+        return next(iter(results.values()))
+
+    async def scenario():
+        async with CalDAVServer(store) as server:
+            client = CalDAVClient(f"{server.url}/", "me", "secret")
+            with Session(engine) as db:
+                first = await sync(client, db)
+                assert len(first.changed) == 20 and first.deleted == []
+
+                assert await sync(client, db) == (first.state, {}, [])
+
+                moved_id = db.execute(
+                    select(CalendarEvent.id).where(CalendarEvent.uid == "event-1@mypia.local")).scalar_one()
+                work.put("event-1@mypia.local.ics", make_ical_event(
+                    "event-1@mypia.local", "moved", EPOCH, EPOCH + timedelta(hours=1)))
+                work.delete("event-2@mypia.local.ics")
+                second = await sync(client, db)
+                assert list(second.changed) == ["/calendars/work/event-1@mypia.local.ics"]
+                assert second.deleted == ["/calendars/work/event-2@mypia.local.ics"]
+
+                # A token the server does not recognise falls back to an ETag diff of the full listing
+                state = db.execute(select(CalendarSyncState)).scalar_one()
+                state.sync_token, state.ctag = "http://mypia.local/sync/999", None
+                db.commit()
+                work.delete("event-3@mypia.local.ics")
+                third = await sync(client, db)
+                assert third.changed == {} and third.deleted == ["/calendars/work/event-3@mypia.local.ics"]
+
+                titles = dict(db.execute(select(CalendarEvent.href, CalendarEvent.title)).all())
+                assert len(titles) == 18 and titles["/calendars/work/event-1@mypia.local.ics"] == "moved"
+                assert vectors.ids == set(titles)
+                assert db.execute(select(CalendarEvent.user_id).distinct()).scalars().all() == [7]
+                # Edits update the row in place
+                assert db.execute(select(CalendarEvent.title).where(CalendarEvent.id == moved_id)).scalar() == "moved"
+
+                # An invite copied into another calendar is a second row; neither takes over the other
+                store.add_calendar("shared").put("copy.ics", make_ical_event(
+                    "event-1@mypia.local", "moved", EPOCH, EPOCH + timedelta(hours=1)))
+                await sync(client, db)
+                work.put("event-4@mypia.local.ics", make_ical_event(
+                    "event-4@mypia.local", "touched", EPOCH, EPOCH + timedelta(hours=1)))
+                await sync(client, db)
+                hrefs = db.execute(select(CalendarEvent.href).where(CalendarEvent.uid == "event-1@mypia.local")
+                                   .order_by(CalendarEvent.href)).scalars().all()
+                assert hrefs == ["/calendars/shared/copy.ics", "/calendars/work/event-1@mypia.local.ics"]
+
+    asyncio.run(scenario())
+
+
+def test_events_from_several_calendars_merge_in_start_order():
+    from personal_ai_assistant.calendar.caldav_client import CalDAVClient, event_sort_key
+    from personal_ai_assistant.testing import CalDAVServer, CalendarStore
+    from personal_ai_assistant.testing.dataset import EPOCH, make_events
+
+    store = CalendarStore(make_events(60, ["work", "home", "shared"], recurring_ratio=0))
+
+    async def scenario():
+        async with CalDAVServer(store) as server:
+            client = CalDAVClient(f"{server.url}/", "me", "secret")
+            events = await client.get_events_from_calendars(EPOCH, EPOCH + timedelta(days=90), max_parallel=2)
+            assert len(events) == 60
+            assert [event_sort_key(e) for e in events] == sorted(event_sort_key(e) for e in events)
+            assert {e['calendar'] for e in events} == {"work", "home", "shared"}
+
+            only = await client.get_events_from_calendars(EPOCH, EPOCH + timedelta(days=90), ["home"])
+            assert len(only) == 20 and {e['calendar'] for e in only} == {"home"}
+
+    asyncio.run(scenario())
+
+
+def test_github_client_revalidates_with_etags_and_lists_incrementally(tmp_path):
+    from personal_ai_assistant.github.github_client import GitHubClient
+    from personal_ai_assistant.testing import GitHubServer, GitHubStore
+    from personal_ai_assistant.testing.dataset import make_repositories
+
+    store = GitHubStore(make_repositories("octocat", repos=2, issues_per_repo=150, pulls_per_repo=30))
+
+    async def scenario():
+        async with GitHubServer(store) as server:
+            client = GitHubClient("token", base_url=server.url, cache_dir=str(tmp_path))
+            issues = await client.get_repo_issues("octocat/repo-0")
+            assert len(issues) == 180 and server.rate_limiter.headers("token")["X-RateLimit-Used"] == "2"
+
+            # Unchanged pages come back as 304s, which cost no quota
+            assert await client.get_repo_issues("octocat/repo-0") == issues
+            assert server.rate_limiter.headers("token")["X-RateLimit-Used"] == "2"
+
+            latest = max(issue["updated_at"] for issue in issues)
+            recent = await client.get_pull_requests("octocat/repo-0", since=latest - timedelta(hours=48))
+            assert recent and all(pr["updated_at"] >= latest - timedelta(hours=48) for pr in recent)
+            assert len(recent) < 30
+            await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_github_overview_reads_many_repositories_in_few_queries(tmp_path):
+    from personal_ai_assistant.github.github_client import GitHubClient
+    from personal_ai_assistant.testing import GitHubServer, GitHubStore
+    from personal_ai_assistant.testing.dataset import make_repositories
+
+    repositories = make_repositories("octocat", repos=120, issues_per_repo=20, pulls_per_repo=5)
+    repositories.update(make_repositories("octocat", repos=1, issues_per_repo=400, pulls_per_repo=0, seed=7))
+    store = GitHubStore(repositories)
+
+    async def scenario():
+        async with GitHubServer(store) as server:
+            client = GitHubClient("overview", base_url=server.url, cache_dir=str(tmp_path))
+            overview = await client.get_repositories_overview("octocat")
+            # Three pages of repositories, then the rest of repo-0's ~240 open issues in pages of 100
+            assert server.request_count == 5 and len(overview) == 120
+
+            rest = await client.get_repo_issues("octocat/repo-7", state="open")
+            assert overview["octocat/repo-7"]["issues"] == [i for i in rest if "/issues/" in i["url"]]
+            assert overview["octocat/repo-7"]["repo"] == next(
+                r for r in await client.get_user_repos("octocat") if r["name"] == "repo-7")
+            assert len(overview["octocat/repo-0"]["issues"]) == sum(
+                1 for i in repositories["octocat/repo-0"]["issues"] if i["state"] == "open")
+
+            items = await client.get_open_items(["octocat/repo-3", "octocat/missing"])
+            assert items["octocat/repo-3"]["pull_requests"] == overview["octocat/repo-3"]["pull_requests"]
+            assert items["octocat/missing"] == {"issues": [], "pull_requests": []}
+            await client.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_action_logs_are_scanned_as_a_stream_and_only_errors_reach_the_llm(tmp_path):
+    from personal_ai_assistant.github.github_client import GitHubClient
+    from personal_ai_assistant.testing import GitHubServer, GitHubStore
+    from personal_ai_assistant.testing.dataset import make_repositories
+
+    store = GitHubStore(make_repositories("octocat", repos=1, issues_per_repo=1, pulls_per_repo=1))
+    noise = [f"2024-05-01T10:00:00.0000000Z building module {i}\n" for i in range(100000)]
+    store.add_workflow_run("octocat/repo-0", 2, "tests", "failure", {
+        "test/1_Set up job.txt": "2024-05-01T10:00:00.0000000Z Runner version 2.316.0\n",
+        "test/3_Run pytest.txt": noise[:60000] + [
+            "tests/test_app.py::test_login FAILED\n",
+            "E   AssertionError: assert 422 == 200\n",
+        ] + noise[60000:] + ["##[error]Process completed with exit code 1.\n"],
+        "test.txt": noise,
+    })
+    store.add_workflow_run("octocat/repo-0", 2, "lint", "success", {"lint/1_flake8.txt": "ok\n"})
+
+    class Explainer:
+        prompts = []
+
+        async def generate_text(self, prompt, max_length=100):
+            self.prompts.append(prompt)
+            return "The login test gets a 422."
+
+    async def scenario():
+        async with GitHubServer(store) as server:
+            client = GitHubClient("logs", text_processor=Explainer(), base_url=server.url, cache_dir=str(tmp_path))
+            result = await client.parse_action_logs("octocat/repo-0", 2)
+            await client.aclose()
+        return result
+
+    result = asyncio.run(scenario())
+    [run] = result["runs"]
+    assert run["name"] == "tests" and run["analysis"] == "The login test gets a 422."
+    assert [(e["file"], e["line"]) for e in run["errors"]] == [
+        ("test/3_Run pytest.txt", 59996), ("test/3_Run pytest.txt", 99998)]
+    assert run["errors"][0]["text"].splitlines()[5:7] == [
+        "tests/test_app.py::test_login FAILED", "E   AssertionError: assert 422 == 200"]
+    assert len(Explainer.prompts) == 1 and len(Explainer.prompts[0]) < 2000
+
+
+def test_a_run_of_failure_lines_is_split_into_bounded_windows():
+    from personal_ai_assistant.github.action_logs import scan_lines
+
+    lines = ["setup\n"] * 3 + [f"E   AssertionError: case {i}\n" for i in range(10)] + ["teardown\n"] * 3
+    windows = scan_lines(lines, "test.txt", context=2, max_windows=10)
+    assert [window.line for window in windows] == [2, 7, 12]
+    assert all(len(window.text.splitlines()) <= 5 for window in windows)
+    assert windows[-1].text.splitlines()[-1] == "teardown"
@@ -0,0 +1,71 @@
+import asyncio
+from sqlalchemy import insert, select
+from personal_ai_assistant.database.base import Base
+from personal_ai_assistant.database.db_manager import DatabaseManager
+from personal_ai_assistant.database.engine import get_engine
+from personal_ai_assistant.models.task import Task
+from personal_ai_assistant.tasks.task_manager import TaskManager, decode_task_cursor, encode_task_cursor
+
+
+def test_task_manager_on_an_async_sqlite_session(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'tasks.db'}"
+    Base.metadata.create_all(get_engine(database_url), tables=[Task.__table__])
+    db_manager = DatabaseManager(database_url)
+
+    async def create(i):
+        # One session per coroutine, as each request gets its own
+        async with db_manager.get_async_db() as db:
+            return await TaskManager(db).create_task(f"task {i}", f"description {i}")
+
+    async def scenario():
+        created = await asyncio.gather(*(create(i) for i in range(5)))
+        assert len({task.id for task in created}) == 5
+
+        async with db_manager.get_async_db() as db:
+            manager = TaskManager(db)
+            first = await manager.get_all_tasks(limit=3)
+            rest = await manager.get_all_tasks(limit=3, cursor=encode_task_cursor(first[-1]))
+            assert [task.id for task in first + rest] == sorted(task.id for task in created)
+
+            done = await manager.complete_task(first[0].id)
+            assert done.completed and done.completed_at is not None
+            assert [task.id for task in await manager.get_all_tasks(completed=True)] == [first[0].id]
+
+            updated = await manager.update_task(first[1].id, "renamed", "changed")
+            assert updated.title == "renamed"
+            assert await manager.delete_task(first[2].id)
+            assert await manager.get_task(first[2].id) is None
+            assert not await manager.delete_task(first[2].id)
+
+            projected = await manager.get_all_tasks(fields=["title"])
+            assert projected[1].to_dict(["id", "title"]) == {"id": first[1].id, "title": "renamed"}
+
+    asyncio.run(scenario())
+    with db_manager.get_db() as db:
+        assert len(db.execute(select(Task)).scalars().all()) == 4
+    get_engine(database_url).dispose()
+
+
+def test_cursor_pages_past_tasks_without_created_at(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'tasks.db'}"
+    engine = get_engine(database_url)
+    Base.metadata.create_all(engine, tables=[Task.__table__])
+    with engine.begin() as connection:
+        connection.execute(insert(Task.__table__), [{"title": "legacy", "created_at": None}] * 2)
+    db_manager = DatabaseManager(database_url)
+
+    async def scenario():
+        async with db_manager.get_async_db() as db:
+            manager = TaskManager(db)
+            await manager.create_task("new", "")
+            seen, cursor = [], None
+            while True:
+                page = await manager.get_all_tasks(limit=1, cursor=cursor)
+                if not page:
+                    return seen
+                seen.append(page[0].id)
+                cursor = encode_task_cursor(page[0])
+
+    assert asyncio.run(scenario()) == [1, 2, 3]
+    assert decode_task_cursor(encode_task_cursor(Task(id=1, created_at=None))) == (None, 1)
+    engine.dispose()